@@ -1,37 +1,55 @@
-from openpyxl.styles.fills import PatternFill, Color
-from openpyxl.comments import Comment
-
 #########################
 # Typing setup
 #########################
-from typing import List
+from typing import Iterable
+from typing import TYPE_CHECKING
 from SaltError import SaltError
 from employee import Employee
-from openpyxl.cell.cell import Cell
+if TYPE_CHECKING:
+    from openpyxl.cell.cell import Cell
 
-SaltErrorList = List[SaltError]
+SaltErrorIterable = Iterable[SaltError]
 
 
 class ErrorProcessor:
+    """Marks each SaltError on the workbook: highlights its cell and adds a comment with the message.
+
+    openpyxl's styles and comments are imported on the first error, so a clean log never loads them.
+    """
 
-    def __init__(self, salt_errors: SaltErrorList):
+    def __init__(self, salt_errors: SaltErrorIterable):
         self.salt_errors = salt_errors
+        self._fill = None
+        self._comment_class = None
 
-    def process_errors(self):
+    def process_errors(self) -> int:
+        # salt_errors may be a generator (e.g. LogChecker.iter_checks()), so it is only walked once
+        count = 0
         for error in self.salt_errors:
-            employee: Employee = error.employee
-            cell: Cell = error.cell
-            message: str = error.message
-
-            self.set_highlight(cell)
-            self.add_comment(cell, message)
-
-    def set_highlight(self, cell: Cell) -> None:
-        cell.fill = PatternFill(fill_type='solid', fgColor=Color(rgb='FFFFF200', type='rgb'),
-                                bgColor=Color(rgb='FFFFFF00', type='rgb'))
-
-    def add_comment(self, cell: Cell, message: str) -> None:
-        comment = Comment(message, 'Salt Log Checker')
+            self.process_error(error)
+            count += 1
+        return count
+
+    def process_error(self, error: SaltError) -> None:
+        employee: Employee = error.employee
+        cell: 'Cell' = error.cell
+        message: str = error.message
+
+        self.set_highlight(cell)
+        self.add_comment(cell, message)
+
+    def set_highlight(self, cell: 'Cell') -> None:
+        if self._fill is None:
+            from openpyxl.styles.fills import PatternFill, Color
+            self._fill = PatternFill(fill_type='solid', fgColor=Color(rgb='FFFFF200', type='rgb'),
+                                     bgColor=Color(rgb='FFFFFF00', type='rgb'))
+        cell.fill = self._fill
+
+    def add_comment(self, cell: 'Cell', message: str) -> None:
+        if self._comment_class is None:
+            from openpyxl.comments import Comment
+            self._comment_class = Comment
+        comment = self._comment_class(message, 'Salt Log Checker')
         cell.comment = comment
 
 
@@ -0,0 +1,52 @@
+import csv
+
+#########################
+# Typing setup
+#########################
+from typing import Iterable
+from typing import Iterator
+from typing import TextIO
+from SaltError import SaltError
+
+SaltErrorIterable = Iterable[SaltError]
+SaltErrorIter = Iterator[SaltError]
+
+
+class ErrorReport:
+    """Writes SaltErrors out as CSV rows (cell, employee, message) as they arrive.
+
+    Rows are written one error at a time, so a report can be produced from LogChecker.iter_checks() without
+    collecting the errors first. tap() writes each error and passes it along, which lets the same stream feed
+    both the report and the ErrorProcessor.
+
+    A report covering several workbooks (e.g. an archive) starts each row with the workbook's name; pass
+    `workbook_column=True` and give the name with each row.
+    """
+
+    header = ['cell', 'employee', 'message']
+
+    def __init__(self, stream: TextIO, workbook_column: bool = False):
+        self.writer = csv.writer(stream)
+        self.workbook_column: bool = workbook_column
+        self.writer.writerow(['workbook'] + self.header if workbook_column else self.header)
+        self.count: int = 0
+
+    def write_error(self, error: SaltError, workbook: str = '') -> None:
+        coordinate = error.cell.coordinate if error.cell is not None else ''
+        employee = error.employee.name if error.employee is not None else ''
+        self.write_row(coordinate, employee, error.message, workbook)
+
+    def write_row(self, coordinate: str, employee: str, message: str, workbook: str = '') -> None:
+        row = [coordinate, employee, message]
+        self.writer.writerow([workbook] + row if self.workbook_column else row)
+        self.count += 1
+
+    def write_errors(self, salt_errors: SaltErrorIterable) -> int:
+        for error in salt_errors:
+            self.write_error(error)
+        return self.count
+
+    def tap(self, salt_errors: SaltErrorIterable) -> SaltErrorIter:
+        for error in salt_errors:
+            self.write_error(error)
+            yield error
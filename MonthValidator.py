@@ -2,13 +2,18 @@
 # Typing setup
 ####################
 from typing import List
+from typing import Iterator
+from typing import Iterable
+from typing import Optional
 from salt_log import SaltLog
 from week import SaltWeek
 from SaltError import SaltError
 from employee import Employee
+from rules import RuleRunner
 
 EmployeeList = List[Employee]
 SaltErrorList = List[SaltError]
+SaltErrorIter = Iterator[SaltError]
 WeekList = List[SaltWeek]
 
 ####################
@@ -17,9 +22,21 @@ WeekList = List[SaltWeek]
 from datetime import timedelta
 import re
 
-class MonthValidator:
+class MonthValidator(RuleRunner):
 
-    def __init__(self, log: SaltLog):
+    valid_sort_code = r'2DA'
+    valid_building_code = r'Wing C'
+    valid_posi_code = r'(?:[Pp]osi ?)?[1-7] ?(?:[Nn]orth|[Nn]|[Ss]outh|[Ss])'
+
+    # Rule name -> method name; see Validator for how rules are selected and accounted for
+    employee_rules = {
+        'training_drill': 'check_training_drill',
+    }
+    log_rules = {
+        'operation_name': 'check_operation_name',
+    }
+
+    def __init__(self, log: SaltLog, disabled_rules: Optional[Iterable[str]] = None):
         self.log: SaltLog = log
         self.employee_list: EmployeeList = log.employee_list
         self.weeks: WeekList = log.weeks
@@ -29,25 +46,37 @@ class MonthValidator:
 
         self.not_present_results = ['vacation', 'disability', 'not in area', 'off', 'not employed']
 
-        self.valid_sort_code = r'2DA'
-        self.valid_building_code = r'Wing C'
-        self.valid_posi_code = r'(?:[Pp]osi ?)?[1-7] ?(?:[Nn]orth|[Nn]|[Ss]outh|[Ss])'
-
-        self.salt_errors = list()
+        super().__init__(disabled_rules)
+        self._active_employee_rules = self._activate_rules(self.employee_rules)
+        self._active_log_rules = self._activate_rules(self.log_rules)
 
     def run_checks(self) -> SaltErrorList:
-        for employee in self.employee_list:
-            self.check_training_drill(employee)
+        self.salt_errors = list(self.iter_checks())
+        return self.salt_errors
 
-        self.check_operation_name()
+    def iter_checks(self) -> SaltErrorIter:
+        yield from self.iter_employee_checks(self.employee_list)
+        yield from self.iter_log_checks()
 
-        return self.salt_errors
+    def iter_employee_checks(self, employee_list: EmployeeList) -> SaltErrorIter:
+        for employee in employee_list:
+            for name, rule in self._active_employee_rules:
+                self._run_rule(name, rule, employee)
+            yield from self._drain_errors()
+
+    def iter_log_checks(self) -> SaltErrorIter:
+        for name, rule in self._active_log_rules:
+            self._run_rule(name, rule)
+        yield from self._drain_errors()
 
     def check_training_drill(self, employee: Employee):
 
         # Check whether employee drill date is empty
-        drill_date_cell = self.log.xl_log.cell(row=employee.row, column=self.drill_date_col)
-        drill_result_cell = self.log.xl_log.cell(row=employee.row, column=self.drill_result_col)
+        if employee.ordinal is not None:
+            drill_date_cell, drill_result_cell = self.log.employee_index.drill_cells[employee.ordinal]
+        else:
+            drill_date_cell = self.log.xl_log.cell(row=employee.row, column=self.drill_date_col)
+            drill_result_cell = self.log.xl_log.cell(row=employee.row, column=self.drill_result_col)
 
         # Make sure that the employee.valid_drill_dates is populated; if it is, check it
         if drill_date_cell.value is None:
@@ -77,20 +106,25 @@ class MonthValidator:
                                                   f'Monthly training drill result must be "P"'))
 
     def check_operation_name(self):
+        self.salt_errors.extend(self.operation_name_errors(self.log.operation_name, self.log.operation_name_cell))
 
-        if self.log.operation_name is None:
-            self.salt_errors.append(SaltError(None, self.log.operation_name_cell, 'Operation name shouldn\'t be empty'))
-            return None
+    @classmethod
+    def operation_name_errors(cls, operation_name: str, operation_name_cell) -> SaltErrorList:
+        # Also used by QuickCheck, which doesn't build a SaltLog
+        if operation_name is None:
+            return [SaltError(None, operation_name_cell, 'Operation name shouldn\'t be empty')]
 
-        if re.search(self.valid_sort_code, self.log.operation_name) is None:
-            self.salt_errors.append(SaltError(None, self.log.operation_name_cell, 'Operation name must be 2DA'))
+        salt_errors = list()
+        if re.search(cls.valid_sort_code, operation_name) is None:
+            salt_errors.append(SaltError(None, operation_name_cell, 'Operation name must be 2DA'))
 
-        if re.search(self.valid_building_code, self.log.operation_name) is None:
-            self.salt_errors.append(SaltError(None, self.log.operation_name_cell, 'Building must be Wing C'))
+        if re.search(cls.valid_building_code, operation_name) is None:
+            salt_errors.append(SaltError(None, operation_name_cell, 'Building must be Wing C'))
 
-        if re.search(self.valid_posi_code, self.log.operation_name) is None:
-            self.salt_errors.append(SaltError(None, self.log.operation_name_cell,
-                                              'Must include posi, e.g. "Posi 7 North" or "Posi 6S"'))
+        if re.search(cls.valid_posi_code, operation_name) is None:
+            salt_errors.append(SaltError(None, operation_name_cell,
+                                         'Must include posi, e.g. "Posi 7 North" or "Posi 6S"'))
+        return salt_errors
 
     def set_valid_employee_dates(self, employee: Employee):
         for week in self.weeks:
@@ -1,9 +1,15 @@
-from openpyxl.cell.cell import Cell
+from typing import List
+from typing import Optional
+from typing import TYPE_CHECKING
 from employee import Employee
+if TYPE_CHECKING:
+    from openpyxl.cell.cell import Cell
 
 class SaltError:
 
-    def __init__(self, employee: Employee, cell: Cell, message: str):
+    def __init__(self, employee: Employee, cell: 'Cell', message: str, suggestions: Optional[List[str]] = None):
         self.employee = employee
         self.cell = cell
-        self.message = message
\ No newline at end of file
+        self.message = message
+        # Likely corrections for the cell's value, best first, when the check that raised the error has any
+        self.suggestions: List[str] = suggestions or list()
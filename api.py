@@ -0,0 +1,105 @@
+import io
+from log_checker import LogChecker
+from rules import RuleSelection
+from rules import RuleStatsDict
+from roster import Roster
+from reference_catalog import ReferenceCatalog
+
+#########################
+# Typing setup
+#########################
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Union
+from typing import BinaryIO
+from SaltError import SaltError
+
+SaltErrorList = List[SaltError]
+WorkbookData = Union[bytes, bytearray, memoryview, BinaryIO]
+
+
+class ValidationResult:
+    """What SaltLogChecker.check() found: the SaltErrors, plus the marked-up workbook if one was asked for.
+
+    The SaltErrors' cells belong to the workbook loaded for this call, so they stay valid (and hold on to it) for
+    as long as the result is kept.
+    """
+
+    __slots__ = ('salt_errors', 'marked_workbook', 'rule_stats')
+
+    def __init__(self, salt_errors: SaltErrorList, marked_workbook: Optional[bytes], rule_stats: RuleStatsDict):
+        self.salt_errors: SaltErrorList = salt_errors
+        self.marked_workbook: Optional[bytes] = marked_workbook
+        self.rule_stats: RuleStatsDict = rule_stats
+
+    @property
+    def error_count(self) -> int:
+        return len(self.salt_errors)
+
+    @property
+    def passed(self) -> bool:
+        return len(self.salt_errors) == 0
+
+
+class SaltLogChecker:
+    """In-memory entry point for checking salt logs, for callers like the web tier that never have a file path.
+
+    Build one SaltLogChecker with the run options and reuse it for every upload: the rule configuration is
+    checked and frozen once, up front, and check() takes the workbook as bytes or a binary file-like object and
+    hands back a ValidationResult--no temp files, no printing. With `mark=True` the workbook is also marked up
+    as main.py would and returned as bytes.
+
+    A SaltLogChecker holds no per-call state (each check() loads its own workbook and builds its own SaltLog and
+    validators), so one instance can be shared by a thread pool. The same goes for a `roster`, which is only
+    read, apart from its memo of resolved names, and a reference `catalog` (see ReferenceCatalog), which is only
+    read.
+    """
+
+    def __init__(self, disabled_rules: Optional[Iterable[str]] = None, rule_selection: Optional[RuleSelection] = None,
+                 max_errors: Optional[int] = None, fail_fast: bool = False, roster: Optional[Roster] = None,
+                 roster_station: Optional[str] = None, catalog: Optional[ReferenceCatalog] = None):
+        self.disabled_rules: frozenset = frozenset(disabled_rules or ())
+        LogChecker._check_rule_names(self.disabled_rules)
+        if rule_selection is not None:
+            LogChecker._check_rule_names(rule_selection.rule_names())
+        self.rule_selection: Optional[RuleSelection] = rule_selection
+        self.max_errors: Optional[int] = max_errors
+        self.fail_fast: bool = fail_fast
+        self.roster: Optional[Roster] = roster
+        self.roster_station: Optional[str] = roster_station
+        self.catalog: Optional[ReferenceCatalog] = catalog
+
+    def check(self, workbook_data: WorkbookData, mark: bool = False) -> ValidationResult:
+        from openpyxl import load_workbook
+        from salt_log import SaltLog
+
+        workbook = load_workbook(self._as_stream(workbook_data))
+        checker = LogChecker(SaltLog(workbook, catalog=self.catalog), max_errors=self.max_errors,
+                             fail_fast=self.fail_fast, disabled_rules=self.disabled_rules,
+                             rule_selection=self.rule_selection, roster=self.roster,
+                             roster_station=self.roster_station)
+        salt_errors = checker.run_checks()
+
+        marked_workbook = None
+        if mark:
+            from ErrorProcessor import ErrorProcessor
+            ErrorProcessor(salt_errors).process_errors()
+            marked = io.BytesIO()
+            workbook.save(marked)
+            marked_workbook = marked.getvalue()
+        return ValidationResult(salt_errors, marked_workbook, checker.rule_stats)
+
+    @staticmethod
+    def _as_stream(workbook_data: WorkbookData) -> BinaryIO:
+        if isinstance(workbook_data, (bytes, bytearray, memoryview)):
+            return io.BytesIO(workbook_data)
+        # The xlsx reader needs to seek, so a non-seekable stream (e.g. a request body) is read into memory
+        if not (hasattr(workbook_data, 'seekable') and workbook_data.seekable()):
+            return io.BytesIO(workbook_data.read())
+        return workbook_data
+
+
+def validate(workbook_data: WorkbookData, mark: bool = False, **options) -> ValidationResult:
+    """One-off check of a workbook held in memory; see SaltLogChecker for the options."""
+    return SaltLogChecker(**options).check(workbook_data, mark=mark)
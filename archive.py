@@ -0,0 +1,154 @@
+import io
+import multiprocessing
+import posixpath
+import tarfile
+import threading
+import zipfile
+from ErrorReport import ErrorReport
+
+#########################
+# Typing setup
+#########################
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+Member = Tuple[str, bytes]
+# (cell coordinate, employee name, message)--plain values, since SaltErrors can't leave the worker process
+ErrorRecord = Tuple[str, str, str]
+# (member name, marked workbook bytes or None, error records, failure message or None)
+MemberResult = Tuple[str, Optional[bytes], List[ErrorRecord], Optional[str]]
+
+# Checker options for _check_member(), set once per worker process by _set_worker_options() so that a large
+# option (e.g. an HR roster) isn't pickled with every member
+_worker_options: dict = dict()
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+WORKBOOK_SUFFIXES = ('.xlsx', '.xlsm')
+
+
+def is_archive(path) -> bool:
+    return str(path).lower().endswith(ARCHIVE_SUFFIXES)
+
+
+class ArchiveChecker:
+    """Checks every salt log in a zip or tar archive without extracting anything to disk.
+
+    Each workbook member is read into memory and loaded from there, checked and marked up as main.py would, and
+    saved back to bytes. The marked logs (named like main.py's, '<name>_marked.xlsx') and one combined error
+    report, `report_name`, with a leading workbook column, are written straight into the output zip.
+
+    With `workers` > 1 the members are checked in a process pool. At most twice that many members are read
+    ahead, so memory use stays bounded however large the archive is. A member that can't be checked at all is
+    left out of the output archive and gets a single row in the report saying why.
+    """
+
+    report_name = 'errors.csv'
+
+    def __init__(self, archive_file, workers: int = 1, checker_options: Optional[dict] = None):
+        self.archive_file = archive_file
+        self.workers: int = workers
+        self.checker_options: dict = checker_options or dict()
+        self.workbooks_checked: int = 0
+        self.workbooks_failed: int = 0
+
+    def iter_members(self) -> Iterator[Member]:
+        """Yields (name, contents) for each workbook in the archive, in archive order."""
+        if zipfile.is_zipfile(self.archive_file):
+            with zipfile.ZipFile(self.archive_file) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir() and self._is_workbook(info.filename):
+                        yield info.filename, archive.read(info)
+        else:
+            if hasattr(self.archive_file, 'seek'):
+                self.archive_file.seek(0)
+                archive = tarfile.open(fileobj=self.archive_file, mode='r:*')
+            else:
+                archive = tarfile.open(self.archive_file, mode='r:*')
+            with archive:
+                for info in archive:
+                    if info.isfile() and self._is_workbook(info.name):
+                        yield info.name, archive.extractfile(info).read()
+
+    @staticmethod
+    def _is_workbook(name: str) -> bool:
+        base_name = posixpath.basename(name)
+        # Skip Office lock files and macOS resource forks
+        return name.lower().endswith(WORKBOOK_SUFFIXES) and not base_name.startswith(('~$', '._')) and \
+            not name.startswith('__MACOSX/')
+
+    def run(self, output_file) -> int:
+        """Checks the archive, writes the output zip, and returns the total number of errors found."""
+        report_text = io.StringIO()
+        report = ErrorReport(report_text, workbook_column=True)
+
+        with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED) as output:
+            for name, marked, records, failure in self._iter_results():
+                if failure is not None:
+                    self.workbooks_failed += 1
+                    report.write_row('', '', f'Could not check workbook: {failure}', name)
+                    continue
+                self.workbooks_checked += 1
+                for coordinate, employee, message in records:
+                    report.write_row(coordinate, employee, message, name)
+                # The workbook is already compressed, so it's stored as is
+                output.writestr(self.marked_name(name), marked, compress_type=zipfile.ZIP_STORED)
+            output.writestr(self.report_name, report_text.getvalue())
+
+        return report.count - self.workbooks_failed
+
+    @staticmethod
+    def output_name(archive_name: str) -> str:
+        """'bundle.tar.gz' -> 'bundle_marked.zip'"""
+        for suffix in ARCHIVE_SUFFIXES:
+            if archive_name.lower().endswith(suffix):
+                archive_name = archive_name[:-len(suffix)]
+                break
+        return archive_name + '_marked.zip'
+
+    @staticmethod
+    def marked_name(name: str) -> str:
+        stem, suffix = posixpath.splitext(name)
+        return stem + '_marked' + suffix
+
+    def _iter_results(self) -> Iterator[MemberResult]:
+        tasks = self.iter_members()
+        if self.workers <= 1:
+            _set_worker_options(self.checker_options)
+            yield from map(_check_member, tasks)
+            return
+
+        # Pool.imap() reads its input as fast as it can; the semaphore holds the reader to 2 members per worker
+        read_ahead = threading.BoundedSemaphore(2 * self.workers)
+
+        def throttled():
+            for task in tasks:
+                read_ahead.acquire()
+                yield task
+
+        with multiprocessing.Pool(self.workers, initializer=_set_worker_options,
+                                  initargs=(self.checker_options,)) as pool:
+            for result in pool.imap(_check_member, throttled()):
+                read_ahead.release()
+                yield result
+
+
+def _set_worker_options(checker_options: dict) -> None:
+    global _worker_options
+    _worker_options = checker_options
+
+
+def _check_member(member: Member) -> MemberResult:
+    from api import SaltLogChecker
+
+    name, data = member
+    try:
+        result = SaltLogChecker(**_worker_options).check(data, mark=True)
+    except Exception as e:
+        return name, None, list(), f'{type(e).__name__}: {e}'
+
+    records = [(error.cell.coordinate if error.cell is not None else '',
+                error.employee.name if error.employee is not None else '', error.message)
+               for error in result.salt_errors]
+    return name, result.marked_workbook, records, None
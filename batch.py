@@ -0,0 +1,260 @@
+import argparse
+import csv
+import multiprocessing
+import os
+import time
+from functools import partial
+
+#########################
+# Typing setup
+#########################
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+StageCallback = Callable[[str], None]
+# task(path, on_stage) -> number of errors found
+WorkbookTask = Callable[[str, StageCallback], int]
+
+_page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+class WorkbookResult:
+    """Outcome of one workbook in a batch run.
+
+    `status` is 'ok', 'error' (the task raised), 'timeout', 'memory' (over the RSS ceiling) or 'crashed' (the
+    worker died without reporting back). `stage` is the last stage the worker reported, e.g. 'read log'.
+    """
+
+    __slots__ = ('path', 'status', 'stage', 'errors', 'seconds', 'peak_rss_mb', 'detail')
+
+    fields = ['path', 'status', 'stage', 'errors', 'seconds', 'peak_rss_mb', 'detail']
+
+    def __init__(self, path: str, status: str, stage: Optional[str], errors: Optional[int], seconds: float,
+                 peak_rss_mb: Optional[float], detail: str = ''):
+        self.path = path
+        self.status = status
+        self.stage = stage
+        self.errors = errors
+        self.seconds = seconds
+        self.peak_rss_mb = peak_rss_mb
+        self.detail = detail
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'ok'
+
+    def as_row(self) -> list:
+        return [self.path, self.status, self.stage or '', '' if self.errors is None else self.errors,
+                f'{self.seconds:.3f}', '' if self.peak_rss_mb is None else f'{self.peak_rss_mb:.1f}', self.detail]
+
+
+class _Job:
+    """A workbook being checked in its own worker process, as tracked by BatchRunner."""
+
+    def __init__(self, path: str, process, connection):
+        self.path = path
+        self.process = process
+        self.connection = connection
+        self.started = time.monotonic()
+        self.stage: Optional[str] = None
+        self.peak_rss_mb: Optional[float] = None
+        self.outcome: Optional[tuple] = None
+
+    @property
+    def seconds(self) -> float:
+        return time.monotonic() - self.started
+
+    def read_messages(self) -> None:
+        try:
+            while self.connection.poll():
+                kind, value = self.connection.recv()
+                if kind == 'stage':
+                    self.stage = value
+                else:
+                    self.outcome = (kind, value)
+        except (EOFError, OSError):
+            pass
+
+    def sample_rss(self) -> Optional[float]:
+        rss_mb = _rss_mb(self.process.pid)
+        if rss_mb is not None:
+            self.peak_rss_mb = max(rss_mb, self.peak_rss_mb or 0.0)
+        return rss_mb
+
+
+class BatchRunner:
+    """Checks a batch of workbooks, each in a fresh worker process with its own time and memory budget.
+
+    Up to `workers` workbooks are checked at once. Every workbook gets a new process, so nothing one workbook
+    does--a runaway scan, a leak, a crash--can affect the next. While a worker runs, the parent polls its
+    wall-clock time and resident memory (from /proc, every `poll_interval` seconds). A worker over `timeout`
+    seconds or `max_rss_mb` megabytes is killed, the workbook is recorded with the stage it was in, and the batch
+    carries on with the next one.
+
+    The memory ceiling is only enforced where /proc/<pid>/statm is available (Linux), and a spike shorter than
+    the poll interval can slip past it.
+    """
+
+    poll_interval = 0.05
+
+    def __init__(self, task: WorkbookTask, timeout: Optional[float] = None, max_rss_mb: Optional[float] = None,
+                 workers: int = 1):
+        if workers < 1:
+            raise Exception('A batch needs at least one worker')
+        self.task: WorkbookTask = task
+        self.timeout: Optional[float] = timeout
+        self.max_rss_mb: Optional[float] = max_rss_mb
+        self.workers: int = workers
+        self._context = multiprocessing.get_context()
+
+    def run(self, paths: Iterable[str]) -> List[WorkbookResult]:
+        return list(self.iter_results(paths))
+
+    def iter_results(self, paths: Iterable[str]) -> Iterator[WorkbookResult]:
+        """Yields each workbook's WorkbookResult as it finishes (not necessarily in the order given)."""
+        pending = list(paths)
+        running: List[_Job] = list()
+        try:
+            while pending or running:
+                while pending and len(running) < self.workers:
+                    running.append(self._start(pending.pop(0)))
+
+                time.sleep(self.poll_interval)
+                for job in list(running):
+                    result = self._poll(job)
+                    if result is not None:
+                        running.remove(job)
+                        yield result
+        finally:
+            for job in running:
+                self._stop(job)
+
+    def _start(self, path: str) -> _Job:
+        receiver, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(target=_run_workbook, args=(self.task, path, sender), daemon=True)
+        process.start()
+        sender.close()
+        return _Job(path, process, receiver)
+
+    def _poll(self, job: _Job) -> Optional[WorkbookResult]:
+        job.read_messages()
+        rss_mb = job.sample_rss() if job.process.is_alive() else None
+
+        if job.outcome is not None or not job.process.is_alive():
+            job.process.join()
+            job.read_messages()
+            return self._finish(job)
+        if self.timeout is not None and job.seconds > self.timeout:
+            self._stop(job)
+            return self._result(job, 'timeout', detail=f'Over the {self.timeout:g}s time limit')
+        if self.max_rss_mb is not None and rss_mb is not None and rss_mb > self.max_rss_mb:
+            self._stop(job)
+            return self._result(job, 'memory', detail=f'Over the {self.max_rss_mb:g}MB memory limit '
+                                                      f'({rss_mb:.1f}MB)')
+        return None
+
+    def _finish(self, job: _Job) -> WorkbookResult:
+        if job.outcome is None:
+            return self._result(job, 'crashed', detail=f'Worker exited with code {job.process.exitcode}')
+        kind, value = job.outcome
+        if kind == 'done':
+            return self._result(job, 'ok', errors=value)
+        return self._result(job, 'error', detail=value)
+
+    @staticmethod
+    def _result(job: _Job, status: str, errors: Optional[int] = None, detail: str = '') -> WorkbookResult:
+        job.connection.close()
+        return WorkbookResult(job.path, status, job.stage, errors, job.seconds, job.peak_rss_mb, detail)
+
+    @staticmethod
+    def _stop(job: _Job) -> None:
+        if job.process.is_alive():
+            job.process.kill()
+        job.process.join()
+        job.read_messages()         # Pick up a stage reported just before the kill
+
+
+def _run_workbook(task: WorkbookTask, path: str, connection) -> None:
+    # Runs in the worker process; everything goes back to the parent through the pipe
+    try:
+        error_count = task(path, lambda stage: connection.send(('stage', stage)))
+        connection.send(('done', error_count))
+    except Exception as e:
+        connection.send(('error', f'{type(e).__name__}: {e}'))
+    finally:
+        connection.close()
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f'/proc/{pid}/statm') as statm:
+            return int(statm.read().split()[1]) * _page_size / (1024 * 1024)
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def check_workbook(options: dict, path: str, on_stage: StageCallback) -> int:
+    """Default batch task: runs main.main() on one workbook with the given command line options."""
+    from main import main
+    return main(argparse.Namespace(input_file=path, **options), on_stage=on_stage)
+
+
+def add_check_options(parser: argparse.ArgumentParser) -> None:
+    """Adds the main.py options that are passed through to check_workbook()."""
+    parser.add_argument('--max-errors', type=int, default=None, help='Stop checking a log after this many errors')
+    parser.add_argument('--disable-rule', action='append', default=None, metavar='RULE',
+                        help='Skip this validation rule (can be given more than once)')
+    parser.add_argument('--rule-config', default=None, help='JSON file of rules to skip (see rules.RuleSelection)')
+    parser.add_argument('--window-size', type=int, default=None, metavar='ROWS',
+                        help='Check each log in windows of this many employee rows (see main.py)')
+    parser.add_argument('--quick-check', action='store_true', help='Only run the structural checks')
+    parser.add_argument('--cache', default=None, metavar='DIR',
+                        help='Parsed-sheet cache directory, so re-checking a log skips parsing it (see main.py)')
+    parser.add_argument('--catalog', default=None,
+                        help='Reference catalog of the month\'s PCM topics and drill sheets to check every log '
+                             'against (see main.py)')
+
+
+def get_check_options(args) -> dict:
+    # The catalog is loaded here, once, and handed to every workbook's process
+    from reference_catalog import ReferenceCatalog
+
+    return dict(max_errors=args.max_errors, disable_rule=args.disable_rule, rule_config=args.rule_config,
+                window_size=args.window_size, quick_check=args.quick_check, cache=args.cache,
+                catalog=ReferenceCatalog.load(args.catalog) if args.catalog else None)
+
+
+def write_results(results: Iterable[WorkbookResult], stream) -> List[WorkbookResult]:
+    writer = csv.writer(stream)
+    writer.writerow(WorkbookResult.fields)
+    written = list()
+    for result in results:
+        writer.writerow(result.as_row())
+        stream.flush()
+        written.append(result)
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check many salt logs, each in its own worker process')
+    parser.add_argument('input_files', nargs='+')
+    parser.add_argument('--timeout', type=float, default=None, help='Seconds allowed per workbook')
+    parser.add_argument('--max-rss', type=float, default=None, metavar='MB',
+                        help='Resident memory allowed per workbook, in megabytes')
+    parser.add_argument('--workers', type=int, default=1, help='Workbooks to check at once')
+    parser.add_argument('--results', default='batch_results.csv',
+                        help='CSV file to record each workbook\'s outcome in')
+    add_check_options(parser)
+    args = parser.parse_args()
+
+    runner = BatchRunner(partial(check_workbook, get_check_options(args)), timeout=args.timeout,
+                         max_rss_mb=args.max_rss, workers=args.workers)
+    with open(args.results, 'w', newline='') as results_file:
+        results = write_results(runner.iter_results(args.input_files), results_file)
+    failed = [result for result in results if not result.ok]
+    print(f'{len(results) - len(failed)} of {len(results)} workbooks checked')
+    for result in failed:
+        print(f'{result.path}: {result.status} during {result.stage or "startup"} ({result.detail})')
@@ -0,0 +1,100 @@
+import argparse
+import io
+import pathlib
+import re
+import subprocess
+import sys
+import time
+
+#########################
+# Typing setup
+#########################
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+# Cold-start budget (cumulative `-X importtime` of the module, best of several runs) and whether openpyxl may be
+# loaded on the way. The CLI and the upload-time quick check must stay clear of openpyxl; it's only imported to
+# load and mark up a workbook.
+IMPORT_BUDGETS: Dict[str, Tuple[float, bool]] = {
+    'main': (120.0, False),
+    'quick_check': (120.0, False),
+    'windowed_log': (120.0, False),
+}
+IMPORT_RUNS = 5
+
+REPO_DIR = pathlib.Path(__file__).resolve().parent
+
+
+def measure_import(module: str) -> Tuple[float, bool]:
+    """Returns (best cumulative import time in ms, whether openpyxl was imported) for a fresh interpreter."""
+    best = None
+    loads_openpyxl = False
+    for run in range(IMPORT_RUNS):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=REPO_DIR,
+                                capture_output=True, text=True, check=True)
+        for line in result.stderr.splitlines():
+            match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)', line)
+            if match is None:
+                continue
+            if match.group(3) == 'openpyxl':
+                loads_openpyxl = True
+            if match.group(3) == module and match.group(2) == '':
+                milliseconds = int(match.group(1)) / 1000
+                best = milliseconds if best is None else min(best, milliseconds)
+    return best, loads_openpyxl
+
+
+def check_imports(lines: List[str]) -> bool:
+    lines.append(f'{"import":<16}{"ms":>10}{"budget":>10}{"openpyxl":>10}  result')
+    passed = True
+    for module, (budget, openpyxl_allowed) in IMPORT_BUDGETS.items():
+        milliseconds, loads_openpyxl = measure_import(module)
+        ok = milliseconds <= budget and (openpyxl_allowed or not loads_openpyxl)
+        passed = passed and ok
+        lines.append(f'{module:<16}{milliseconds:>10.1f}{budget:>10.1f}{"yes" if loads_openpyxl else "no":>10}  '
+                     f'{"ok" if ok else "OVER BUDGET"}')
+    return passed
+
+
+def time_checks(lines: List[str], employees: int) -> None:
+    from openpyxl import load_workbook
+    from sample_log import SampleLog
+    from salt_log import SaltLog
+    from log_checker import LogChecker
+    from quick_check import QuickCheck
+    from windowed_log import WindowedChecker
+
+    workbook_file = io.BytesIO()
+    SampleLog(employees=employees, weeks=['observation', 'live salt', 'supplemental drill', 'observation'],
+              error_rate=0.1, seed=1).build().save(workbook_file)
+
+    def timed(label: str, run) -> None:
+        workbook_file.seek(0)
+        start = time.perf_counter()
+        error_count = run()
+        lines.append(f'{label:<16}{time.perf_counter() - start:>10.3f}{error_count:>10}')
+
+    lines.append('')
+    lines.append(f'{employees} employees')
+    lines.append(f'{"check":<16}{"seconds":>10}{"errors":>10}')
+    timed('full', lambda: len(LogChecker(SaltLog(load_workbook(workbook_file))).run_checks()))
+    timed('quick', lambda: len(QuickCheck(workbook_file).run_checks()))
+    timed('windowed', lambda: len(WindowedChecker(workbook_file, window_size=500).run_checks()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--employees', type=int, default=2000, help='Size of the generated log to time')
+    parser.add_argument('--output', default=None, help='Also write the results to this file')
+    args = parser.parse_args()
+
+    lines = list()
+    imports_ok = check_imports(lines)
+    time_checks(lines, args.employees)
+
+    output = '\n'.join(lines)
+    print(output)
+    if args.output:
+        pathlib.Path(args.output).write_text(output + '\n')
+    sys.exit(0 if imports_ok else 1)
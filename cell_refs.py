@@ -0,0 +1,50 @@
+# Cell reference helpers (column letters and 'A1:B2' ranges), kept free of openpyxl so that the read paths built
+# on XlsxValueReader don't pay for importing it
+
+#########################
+# Typing setup
+#########################
+from typing import Dict
+from typing import Tuple
+
+_letters: Dict[int, str] = dict()
+_numbers: Dict[str, int] = dict()
+
+
+def column_letter(column: int) -> str:
+    """1 -> 'A', 27 -> 'AA', as openpyxl.utils.get_column_letter()."""
+    letters = _letters.get(column)
+    if letters is None:
+        letters = ''
+        number = column
+        while number > 0:
+            number, remainder = divmod(number - 1, 26)
+            letters = chr(65 + remainder) + letters
+        _letters[column] = letters
+    return letters
+
+
+def column_index(letters: str) -> int:
+    """'A' -> 1, 'AA' -> 27, as openpyxl.utils.column_index_from_string()."""
+    number = _numbers.get(letters)
+    if number is None:
+        number = 0
+        for letter in letters.upper():
+            number = number * 26 + ord(letter) - 64
+        _numbers[letters] = number
+    return number
+
+
+def split_ref(ref: str) -> Tuple[int, int]:
+    """'B12' -> (12, 2), i.e. (row, column)."""
+    ref = ref.replace('$', '')
+    letters = ref.rstrip('0123456789')
+    return int(ref[len(letters):]), column_index(letters)
+
+
+def range_boundaries(ref: str) -> Tuple[int, int, int, int]:
+    """'A2:C4' -> (min_col, min_row, max_col, max_row), as openpyxl.utils.cell.range_boundaries()."""
+    start, _, end = ref.partition(':')
+    min_row, min_col = split_ref(start)
+    max_row, max_col = split_ref(end) if end else (min_row, min_col)
+    return min_col, min_row, max_col, max_row
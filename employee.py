@@ -1,18 +1,22 @@
-from openpyxl.cell.cell import Cell
-
 #########################
 # Typing setup
 #########################
 from typing import List
+from typing import Optional
+from typing import TYPE_CHECKING
 from datetime import date
+if TYPE_CHECKING:
+    from openpyxl.cell.cell import Cell
 
 DateList = List[date]
 
 
 class Employee:
 
-    def __init__(self, name: str, cell: Cell):
+    def __init__(self, name: str, cell: 'Cell'):
         self.name: str = name
-        self.cell: Cell = cell
+        self.cell: 'Cell' = cell
         self.row: int = cell.row
         self.valid_drill_dates: DateList = list()
+        self.ordinal: Optional[int] = None     # Position in the log's employee list, set by EmployeeIndex
+        self.roster_id: Optional[str] = None   # HR roster id, set by RosterValidator when the name resolves
@@ -0,0 +1,69 @@
+#########################
+# Typing setup
+#########################
+from typing import List
+from typing import Dict
+from typing import Optional
+from employee import Employee
+
+EmployeeList = List[Employee]
+EntryList = List[dict]
+
+
+class EmployeeIndex:
+    """Dense index of the employee rows of a SALT log, with every employee's week entries preloaded.
+
+    Employees are numbered by their position in the employee list (Employee.ordinal), and the index maps
+    ordinal -> row and row -> Employee. The block of rows holding the employees is read from the sheet in a single
+    pass, and each week's category/result/comment cells and values are laid out up front, per week, in ordinal
+    order. SaltWeek.get_entry() and MonthValidator then fetch an employee's entry by indexing a list instead of
+    looking up cells one by one.
+
+    The entry dicts are shared with every caller, so they must be treated as read-only.
+    """
+
+    def __init__(self, sheet, employee_list: EmployeeList, week_cols: List[int], drill_date_col: Optional[int] = None,
+                 drill_result_col: Optional[int] = None):
+        self.employees: EmployeeList = employee_list
+        self.rows: List[int] = list()
+        self.by_row: Dict[int, Employee] = dict()
+        for ordinal, employee in enumerate(employee_list):
+            employee.ordinal = ordinal
+            self.rows.append(employee.row)
+            self.by_row[employee.row] = employee
+
+        # Offsets of each week's category column (and of the drill columns) within the preloaded rows
+        entry_cols = list(week_cols) + [col for col in (drill_date_col, drill_result_col) if col is not None]
+        self.min_col: int = min(entry_cols) if entry_cols else 1
+        self.max_col: int = max(max(week_cols) + 2 if week_cols else 1, max(entry_cols) if entry_cols else 1)
+        self.week_offsets: List[int] = [col - self.min_col for col in week_cols]
+        self.drill_date_offset = drill_date_col - self.min_col if drill_date_col is not None else None
+        self.drill_result_offset = drill_result_col - self.min_col if drill_result_col is not None else None
+
+        row_cells = self._read_rows(sheet)
+        self.entry_cells: List[EntryList] = list()
+        self.entry_values: List[EntryList] = list()
+        for offset in self.week_offsets:
+            week_cells = list()
+            week_values = list()
+            for cells in row_cells:
+                category, result, comment = cells[offset], cells[offset + 1], cells[offset + 2]
+                week_cells.append({'category': category, 'result': result, 'comment': comment})
+                week_values.append({'category': category.value, 'result': result.value, 'comment': comment.value})
+            self.entry_cells.append(week_cells)
+            self.entry_values.append(week_values)
+
+        self.drill_cells: list = [(cells[self.drill_date_offset] if self.drill_date_offset is not None else None,
+                                   cells[self.drill_result_offset] if self.drill_result_offset is not None else None)
+                                  for cells in row_cells]
+
+    def _read_rows(self, sheet) -> list:
+        if not self.rows:
+            return list()
+        # Keyed by row rather than position, since a sparse sheet (see windowed_log) leaves out empty rows
+        block = {cells[0].row: cells for cells in sheet.iter_rows(min_row=min(self.rows), max_row=max(self.rows),
+                                                                  min_col=self.min_col, max_col=self.max_col)}
+        return [block[row] for row in self.rows]
+
+    def __len__(self):
+        return len(self.employees)
@@ -0,0 +1,89 @@
+import hashlib
+import io
+import os
+import pathlib
+import tempfile
+from value_grid import GridWorkbook
+
+#########################
+# Typing setup
+#########################
+from typing import Optional
+
+
+class GridCache:
+    """Directory of decoded salt logs, keyed by a hash of the xlsx file, for re-checking logs without re-parsing.
+
+    Each entry is the GridWorkbook encoding of a workbook (the log sheet plus the first value of the PCM and
+    drill tabs), written once by encode_xlsx() and then memory-mapped by load(), so re-running the rules over a
+    corpus of logs costs hashing each file and evaluating the rules. The key is the SHA-256 of the file's bytes,
+    so an edited log is simply a new entry, and the grid format is part of the file name, so a format change
+    never reads an old entry.
+
+    Entries are written to a temporary file and renamed into place, so several processes (or hosts sharing the
+    directory) can fill the same cache safely. Nothing is ever evicted; delete the directory to clear it.
+    """
+
+    _hash_chunk_size = 1 << 20
+
+    def __init__(self, directory):
+        self.directory = pathlib.Path(directory)
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @classmethod
+    def key(cls, workbook_file) -> str:
+        digest = hashlib.sha256()
+        if isinstance(workbook_file, (bytes, bytearray, memoryview)):
+            digest.update(workbook_file)
+        elif hasattr(workbook_file, 'read'):
+            workbook_file.seek(0)
+            for chunk in iter(lambda: workbook_file.read(cls._hash_chunk_size), b''):
+                digest.update(chunk)
+            workbook_file.seek(0)
+        else:
+            with open(workbook_file, 'rb') as stream:
+                for chunk in iter(lambda: stream.read(cls._hash_chunk_size), b''):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def path(self, key: str) -> pathlib.Path:
+        # Spread over 256 subdirectories so a year of logs doesn't make one huge directory
+        return self.directory / key[:2] / (key + GridWorkbook.file_suffix)
+
+    def get(self, key: str) -> Optional[GridWorkbook]:
+        path = self.path(key)
+        if not path.exists():
+            return None
+        return GridWorkbook.open(path)
+
+    def put(self, key: str, workbook_file) -> pathlib.Path:
+        if isinstance(workbook_file, (bytes, bytearray, memoryview)):
+            workbook_file = io.BytesIO(workbook_file)
+        data = GridWorkbook.encode_xlsx(workbook_file)
+
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temp_name = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as temp_file:
+                temp_file.write(data)
+            os.replace(temp_name, path)
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+        return path
+
+    def load(self, workbook_file) -> GridWorkbook:
+        """The workbook's decoded grid, from the cache if it's there, otherwise decoded and cached first.
+
+        `workbook_file` is a path, a binary file object or the file's bytes. The grid should be closed once the
+        log built on it is done with.
+        """
+        key = self.key(workbook_file)
+        grid = self.get(key)
+        if grid is not None:
+            self.hits += 1
+            return grid
+        self.misses += 1
+        return GridWorkbook.open(self.put(key, workbook_file))
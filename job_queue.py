@@ -0,0 +1,424 @@
+import argparse
+import multiprocessing
+import os
+import pathlib
+import socket
+import sqlite3
+import threading
+import time
+from functools import partial
+from batch import BatchRunner
+from batch import WorkbookResult
+from batch import add_check_options
+from batch import check_workbook
+from batch import get_check_options
+from batch import write_results
+from log_size import LogSize
+
+#########################
+# Typing setup
+#########################
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from batch import WorkbookTask
+
+# Priority classes, in the order they're served
+PRIORITIES = ('interactive', 'bulk')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    priority TEXT NOT NULL DEFAULT 'bulk',
+    cost REAL,                                  -- LogSize.cost, if it could be read
+    state TEXT NOT NULL DEFAULT 'pending',      -- pending, running or finished
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    enqueued REAL,
+    started REAL,
+    finished REAL,
+    status TEXT,                                -- a WorkbookResult status, or 'abandoned'
+    stage TEXT,
+    errors INTEGER,
+    seconds REAL,
+    peak_rss_mb REAL,
+    detail TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_expires);
+CREATE TABLE IF NOT EXISTS class_limits (
+    priority TEXT PRIMARY KEY,
+    max_running INTEGER NOT NULL
+);
+'''
+
+
+class Job:
+    """A workbook claimed from a JobQueue. The (id, worker, attempt) triple identifies the lease."""
+
+    __slots__ = ('id', 'path', 'worker', 'attempt', 'priority')
+
+    def __init__(self, id: int, path: str, worker: str, attempt: int, priority: str = 'bulk'):
+        self.id = id
+        self.path = path
+        self.worker = worker
+        self.attempt = attempt
+        self.priority = priority
+
+    def __repr__(self):
+        return f'Job({self.id}, {self.path!r}, {self.worker!r}, {self.attempt}, {self.priority!r})'
+
+
+class JobQueue:
+    """Queue of workbooks to check, kept in a SQLite file that every worker, on any host, opens directly.
+
+    A worker claims a job by taking a lease on it for `lease_seconds`, and keeps the lease alive with
+    heartbeat() while it works. If the lease runs out--the worker or its host died--the next claim() hands the
+    job to someone else, up to `max_attempts` times in all; after that it's finished as 'abandoned'. Results and
+    timings are written back to the same file, so results() is the whole run's report wherever it was run.
+
+    Jobs are served by priority class: every queued 'interactive' job (e.g. a supervisor's upload) before any
+    'bulk' one (e.g. a backfill). Within a class the order is size-aware, using the LogSize read from each
+    workbook's header when it's added: interactive jobs smallest first, so the many small uploads aren't held up
+    by one big one, and bulk jobs largest first, so a backfill doesn't end waiting on one straggler. A class can
+    be capped at a number of running jobs across all workers (set_limit()); capping 'bulk' below the number of
+    workers keeps workers free for interactive jobs however much bulk work is queued, so an upload waits at
+    most one idle worker's poll before it starts.
+
+    Every claim or update is one short write transaction (claims use BEGIN IMMEDIATE, so two workers can never
+    take the same job), and the workbooks themselves are never touched by the queue, so the file is not a
+    bottleneck next to the checking.
+
+    Notes for a shared mount:
+        * The default rollback journal is used, not WAL: WAL needs shared memory, which doesn't work across hosts.
+        * SQLite relies on the file system's locks. They're sound on local disks and on most SMB/NFSv4 setups,
+          but not on every network file system.
+        * Leases are stamped with the clock of the host that writes them, so the hosts' clocks should be synced
+          and `lease_seconds` kept well above any drift.
+        * Paths under the queue file's directory are stored relative to it, so hosts that mount the share in
+          different places still find the workbooks.
+    """
+
+    def __init__(self, path, lease_seconds: float = 60.0, max_attempts: int = 3, busy_timeout: float = 30.0):
+        self.path = pathlib.Path(path)
+        self.lease_seconds: float = lease_seconds
+        self.max_attempts: int = max_attempts
+        # One connection, shared with the heartbeat thread under a lock; transactions are managed by hand
+        self._connection = sqlite3.connect(str(self.path), timeout=busy_timeout, isolation_level=None,
+                                           check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    #########################
+    # Paths
+    #########################
+    def _stored_path(self, path) -> str:
+        path = pathlib.Path(path).resolve()
+        try:
+            return path.relative_to(self.path.resolve().parent).as_posix()
+        except ValueError:
+            return str(path)
+
+    def local_path(self, stored_path: str) -> str:
+        """Where this host finds a job's workbook."""
+        return str(self.path.parent / stored_path)
+
+    #########################
+    # Queue operations
+    #########################
+    def add(self, paths: Iterable, priority: str = 'bulk') -> int:
+        """Queues the workbooks in the priority class.
+
+        A workbook already in the queue is left as it is, except that one still pending is moved up to
+        'interactive' when it's added again as interactive (an upload of a log that's waiting in a backfill), with
+        the lower of the two size estimates. Each workbook's header is read for its LogSize first (a few
+        milliseconds each). Returns how many workbooks were added or moved up.
+        """
+        if priority not in PRIORITIES:
+            raise Exception(f'Unknown priority class "{priority}" (expected one of {", ".join(PRIORITIES)})')
+        # Read outside the transaction, so other workers can carry on claiming meanwhile
+        jobs = [(self._stored_path(path), priority, self.estimate_cost(path)) for path in paths]
+
+        now = time.time()
+        with self._lock:
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                before = self._connection.total_changes
+                self._connection.executemany(
+                    "INSERT INTO jobs (path, priority, cost, enqueued) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (path) DO UPDATE SET priority = 'interactive', "
+                    "cost = COALESCE(MIN(cost, excluded.cost), cost, excluded.cost) "
+                    "WHERE excluded.priority = 'interactive' AND priority != 'interactive' AND state = 'pending'",
+                    (job + (now,) for job in jobs))
+                added = self._connection.total_changes - before
+                self._connection.execute('COMMIT')
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+        return added
+
+    @staticmethod
+    def estimate_cost(path) -> Optional[float]:
+        try:
+            return LogSize.read(path).cost
+        except Exception:
+            # A workbook that can't be read is still queued; checking it will report the problem
+            return None
+
+    def set_limit(self, priority: str, max_running: Optional[int]) -> None:
+        """Caps the class at `max_running` jobs running at once, across all workers; None lifts the cap."""
+        if priority not in PRIORITIES:
+            raise Exception(f'Unknown priority class "{priority}" (expected one of {", ".join(PRIORITIES)})')
+        with self._lock:
+            if max_running is None:
+                self._connection.execute('DELETE FROM class_limits WHERE priority = ?', (priority,))
+            else:
+                self._connection.execute('INSERT OR REPLACE INTO class_limits (priority, max_running) VALUES (?, ?)',
+                                         (priority, max_running))
+
+    def limits(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._connection.execute('SELECT priority, max_running FROM class_limits').fetchall())
+
+    # Class order, then smallest first for interactive jobs and largest first for bulk ones (unknown sizes last)
+    _claim_order = ('CASE priority ' + ' '.join(f"WHEN '{priority}' THEN {rank}"
+                                               for rank, priority in enumerate(PRIORITIES)) + ' END, '
+                    "CASE WHEN cost IS NULL THEN 1 ELSE 0 END, "
+                    "CASE WHEN priority = 'interactive' THEN cost ELSE -cost END, id")
+
+    def claim(self, worker: str) -> Optional[Job]:
+        """Leases the next pending (or abandoned) job to `worker`, or returns None if there's nothing to take.
+
+        The job is the first by priority class and size (see the class docstring) whose class is under its limit.
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                self._connection.execute(
+                    "UPDATE jobs SET state = 'finished', status = 'abandoned', finished = ?, "
+                    "detail = 'Lease expired on every attempt' "
+                    "WHERE state = 'running' AND lease_expires < ? AND attempts >= ?",
+                    (now, now, self.max_attempts))
+                running = dict(self._connection.execute(
+                    "SELECT priority, COUNT(*) FROM jobs WHERE state = 'running' AND lease_expires >= ? "
+                    "GROUP BY priority", (now,)).fetchall())
+                full = [priority for priority, max_running in self._connection.execute(
+                    'SELECT priority, max_running FROM class_limits').fetchall()
+                    if running.get(priority, 0) >= max_running]
+                row = self._connection.execute(
+                    "SELECT id, path, attempts, priority FROM jobs "
+                    "WHERE (state = 'pending' OR (state = 'running' AND lease_expires < ?)) "
+                    f"AND priority NOT IN ({', '.join('?' * len(full))}) "
+                    f"ORDER BY {self._claim_order} LIMIT 1", (now, *full)).fetchone()
+                if row is not None:
+                    self._connection.execute(
+                        "UPDATE jobs SET state = 'running', worker = ?, attempts = attempts + 1, lease_expires = ?, "
+                        "started = ? WHERE id = ?", (worker, now + self.lease_seconds, now, row[0]))
+                self._connection.execute('COMMIT')
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+        if row is None:
+            return None
+        id, path, attempts, priority = row
+        return Job(id, path, worker, attempts + 1, priority)
+
+    def heartbeat(self, job: Job) -> bool:
+        """Extends the job's lease. False if the lease was lost (it expired and the job went to another worker)."""
+        return self._update_leased(job, 'lease_expires = ?', (time.time() + self.lease_seconds,))
+
+    def complete(self, job: Job, result: WorkbookResult) -> bool:
+        """Records the job's result. False, and nothing recorded, if the lease was lost in the meantime."""
+        return self._update_leased(
+            job, "state = 'finished', finished = ?, status = ?, stage = ?, errors = ?, seconds = ?, "
+                 "peak_rss_mb = ?, detail = ?",
+            (time.time(), result.status, result.stage, result.errors, result.seconds, result.peak_rss_mb,
+             result.detail))
+
+    def release(self, job: Job) -> bool:
+        """Hands a claimed job back to the queue untried, e.g. when a worker is shutting down."""
+        return self._update_leased(job, "state = 'pending', attempts = attempts - 1, worker = NULL", ())
+
+    def _update_leased(self, job: Job, assignments: str, values: tuple) -> bool:
+        with self._lock:
+            cursor = self._connection.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND worker = ? AND attempts = ? AND state = 'running'",
+                values + (job.id, job.worker, job.attempt))
+        return cursor.rowcount == 1
+
+    #########################
+    # Progress and results
+    #########################
+    def counts(self, priority: Optional[str] = None) -> Dict[str, int]:
+        """Jobs (of the priority class, or all) by state: 'pending', 'running' and 'finished'."""
+        with self._lock:
+            rows = self._connection.execute('SELECT state, COUNT(*) FROM jobs WHERE ? IS NULL OR priority = ? '
+                                            'GROUP BY state', (priority, priority)).fetchall()
+        counts = {'pending': 0, 'running': 0, 'finished': 0}
+        counts.update(rows)
+        return counts
+
+    def unfinished(self) -> int:
+        counts = self.counts()
+        return counts['pending'] + counts['running']
+
+    def results(self) -> List[WorkbookResult]:
+        """Finished jobs as WorkbookResults, in the order they finished."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path, status, stage, errors, seconds, peak_rss_mb, detail FROM jobs "
+                "WHERE state = 'finished' ORDER BY finished, id").fetchall()
+        return [WorkbookResult(path, status, stage, errors, seconds or 0.0, peak_rss_mb, detail or '')
+                for path, status, stage, errors, seconds, peak_rss_mb, detail in rows]
+
+    def timings(self) -> List[tuple]:
+        """(path, priority, worker, attempts, seconds waiting in the queue, seconds checking) for each finished
+        job."""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT path, priority, worker, attempts, started - enqueued, seconds FROM jobs "
+                "WHERE state = 'finished' ORDER BY finished, id").fetchall()
+
+
+class QueueWorker:
+    """Claims workbooks from a JobQueue one at a time and checks each under BatchRunner's time and memory budgets.
+
+    While a workbook is being checked, a background thread renews the lease every `heartbeat_interval` seconds
+    (a third of the lease by default). When the queue has nothing left to claim, the worker waits for the jobs
+    still running elsewhere, so it can pick up any whose worker dies, and stops once every job has finished.
+    """
+
+    poll_interval = 1.0
+
+    def __init__(self, queue: JobQueue, task: WorkbookTask, timeout: Optional[float] = None,
+                 max_rss_mb: Optional[float] = None, worker: Optional[str] = None,
+                 heartbeat_interval: Optional[float] = None):
+        self.queue: JobQueue = queue
+        self.runner = BatchRunner(task, timeout=timeout, max_rss_mb=max_rss_mb)
+        self.worker: str = worker or f'{socket.gethostname()}:{os.getpid()}'
+        self.heartbeat_interval: float = heartbeat_interval or queue.lease_seconds / 3
+        self.jobs_done: int = 0
+
+    def run(self, max_jobs: Optional[int] = None) -> int:
+        """Works until the queue is finished (or `max_jobs` are done); returns the number of jobs done."""
+        while max_jobs is None or self.jobs_done < max_jobs:
+            job = self.queue.claim(self.worker)
+            if job is None:
+                if self.queue.unfinished() == 0:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+            self.run_job(job)
+        return self.jobs_done
+
+    def run_job(self, job: Job) -> Optional[WorkbookResult]:
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, stop), daemon=True)
+        heartbeat.start()
+        try:
+            result, = self.runner.run([self.queue.local_path(job.path)])
+        except BaseException:
+            # Interrupted (e.g. Ctrl-C): give the job straight back rather than leave it for the lease to run out
+            stop.set()
+            heartbeat.join()
+            self.queue.release(job)
+            raise
+        stop.set()
+        heartbeat.join()
+        # Record the result under the queue's name for the workbook, not this host's
+        result.path = job.path
+        if not self.queue.complete(job, result):
+            return None
+        self.jobs_done += 1
+        return result
+
+    def _heartbeat(self, job: Job, stop: threading.Event) -> None:
+        while not stop.wait(self.heartbeat_interval):
+            if not self.queue.heartbeat(job):
+                return
+
+
+def work(queue_path, task: WorkbookTask, timeout: Optional[float] = None, max_rss_mb: Optional[float] = None,
+         lease_seconds: float = 60.0, max_attempts: int = 3) -> int:
+    """Runs one QueueWorker on the queue file; the target of each process started by run_workers()."""
+    with JobQueue(queue_path, lease_seconds=lease_seconds, max_attempts=max_attempts) as queue:
+        return QueueWorker(queue, task, timeout=timeout, max_rss_mb=max_rss_mb).run()
+
+
+def run_workers(queue_path, task: WorkbookTask, workers: int = 1, **options) -> None:
+    """Runs `workers` QueueWorkers on this host, each in its own process, until the queue is finished."""
+    context = multiprocessing.get_context()
+    processes = [context.Process(target=work, args=(queue_path, task), kwargs=options) for worker in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Share the checking of many salt logs between workers on any '
+                                                 'number of hosts through a SQLite queue file')
+    parser.add_argument('queue', help='Queue file, on storage every worker host can reach')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add_parser = commands.add_parser('add', help='Queue workbooks to check')
+    add_parser.add_argument('input_files', nargs='+')
+    add_parser.add_argument('--priority', choices=PRIORITIES, default='bulk',
+                            help='Priority class: interactive jobs go ahead of every bulk job')
+
+    limit_parser = commands.add_parser('limit', help='Cap how many jobs of a priority class run at once')
+    limit_parser.add_argument('priority', choices=PRIORITIES)
+    limit_parser.add_argument('max_running', type=int, nargs='?', default=None,
+                              help='Jobs allowed to run at once, across all workers (leave out to lift the cap)')
+
+    work_parser = commands.add_parser('work', help='Check queued workbooks until the queue is finished')
+    work_parser.add_argument('--workers', type=int, default=1, help='Worker processes to run on this host')
+    work_parser.add_argument('--timeout', type=float, default=None, help='Seconds allowed per workbook')
+    work_parser.add_argument('--max-rss', type=float, default=None, metavar='MB',
+                             help='Resident memory allowed per workbook, in megabytes')
+    work_parser.add_argument('--lease', type=float, default=60.0,
+                             help='Seconds a worker holds a job without a heartbeat before it can be retried')
+    work_parser.add_argument('--max-attempts', type=int, default=3,
+                             help='Times a job is handed out before it is given up as abandoned')
+    add_check_options(work_parser)
+
+    commands.add_parser('status', help='Show how many jobs are pending, running and finished')
+
+    results_parser = commands.add_parser('results', help='Write every finished job\'s outcome to a CSV file')
+    results_parser.add_argument('output', nargs='?', default='queue_results.csv')
+    args = parser.parse_args()
+
+    if args.command == 'add':
+        with JobQueue(args.queue) as queue:
+            print(f'{queue.add(args.input_files, priority=args.priority)} workbooks queued')
+    elif args.command == 'limit':
+        with JobQueue(args.queue) as queue:
+            queue.set_limit(args.priority, args.max_running)
+    elif args.command == 'work':
+        run_workers(args.queue, partial(check_workbook, get_check_options(args)), workers=args.workers,
+                    timeout=args.timeout, max_rss_mb=args.max_rss, lease_seconds=args.lease,
+                    max_attempts=args.max_attempts)
+    elif args.command == 'status':
+        with JobQueue(args.queue) as queue:
+            limits = queue.limits()
+            for priority in PRIORITIES:
+                limit = f' (at most {limits[priority]} running)' if priority in limits else ''
+                print(f'{priority}: ' + ', '.join(f'{count} {state}' for state, count in
+                                                   queue.counts(priority).items()) + limit)
+    elif args.command == 'results':
+        with JobQueue(args.queue) as queue, open(args.output, 'w', newline='') as results_file:
+            results = write_results(queue.results(), results_file)
+        print(f'{len(results)} results written to {args.output}')
@@ -0,0 +1,122 @@
+from itertools import islice
+from validator import Validator
+from MonthValidator import MonthValidator
+from rules import RuleStats
+from rules import RuleSelection
+from roster import Roster
+from roster import RosterValidator
+from reference_catalog import CatalogValidator
+
+#########################
+# Typing setup
+#########################
+from typing import List
+from typing import Iterator
+from typing import Optional
+from typing import Iterable
+from typing import Dict
+from salt_log import SaltLog
+from SaltError import SaltError
+
+SaltErrorList = List[SaltError]
+SaltErrorIter = Iterator[SaltError]
+RuleStatsDict = Dict[str, RuleStats]
+
+
+class LogChecker:
+    """Runs every validation check on a SaltLog and streams the resulting SaltErrors.
+
+    LogChecker ties the weekly Validators and the MonthValidator together into a single stream of SaltErrors.
+    The weeks are checked in order, followed by the monthly checks, and each SaltError is yielded as soon as it is
+    found, so the annotator (ErrorProcessor) or an exporter (ErrorReport) can start working before the whole log
+    has been validated.
+
+    For gatekeeping, the stream can be cut short: `max_errors` stops validation after that many errors, and
+    `fail_fast` stops it at the first one.
+
+    Rules can be switched off for this run with `disabled_rules`, and per station with a RuleSelection (matched
+    against the log's operation name). Once the errors have been consumed, `rule_stats` holds the combined
+    rows/time/errors of every rule that ran, across all weeks.
+
+    If the log was built with a reference catalog (SaltLog(catalog=...)), its own PCM and drill tabs are compared
+    with the catalog after the monthly checks (see CatalogValidator). Given an HR `roster`, every employee name is
+    then resolved against it (see RosterValidator); `roster_station` picks between roster entries that share a name.
+    """
+
+    def __init__(self, log: SaltLog, max_errors: Optional[int] = None, fail_fast: bool = False,
+                 disabled_rules: Optional[Iterable[str]] = None, rule_selection: Optional[RuleSelection] = None,
+                 roster: Optional[Roster] = None, roster_station: Optional[str] = None):
+        self.log: SaltLog = log
+        self.max_errors: Optional[int] = 1 if fail_fast else max_errors
+        self.roster: Optional[Roster] = roster
+        self.roster_station: Optional[str] = roster_station
+
+        self.disabled_rules = set(disabled_rules or ())
+        if rule_selection is not None:
+            self._check_rule_names(rule_selection.rule_names())
+            self.disabled_rules.update(rule_selection.disabled_for(log.operation_name))
+        self._check_rule_names(self.disabled_rules)
+
+        self._validator_stats: List[RuleStatsDict] = list()
+
+    @staticmethod
+    def rule_names() -> set:
+        return set(Validator.employee_rules) | set(Validator.week_rules) | \
+               set(MonthValidator.employee_rules) | set(MonthValidator.log_rules) | \
+               set(CatalogValidator.log_rules) | set(RosterValidator.employee_rules)
+
+    @classmethod
+    def _check_rule_names(cls, names: set) -> None:
+        unknown = set(names) - cls.rule_names()
+        if unknown:
+            raise Exception(f'Unknown validation rule(s): {", ".join(sorted(unknown))}')
+
+    def run_checks(self) -> SaltErrorList:
+        return list(self.iter_checks())
+
+    def iter_checks(self) -> SaltErrorIter:
+        salt_errors = self._iter_all_checks()
+        if self.max_errors is not None:
+            salt_errors = islice(salt_errors, self.max_errors)
+        return salt_errors
+
+    def _iter_all_checks(self) -> SaltErrorIter:
+        for week in self.log.weeks:
+            validator = Validator(week, self.disabled_rules)
+            self._validator_stats.append(validator.rule_stats)
+            yield from validator.iter_checks(self.log.employee_list)
+
+        validator = MonthValidator(self.log, self.disabled_rules)
+        self._validator_stats.append(validator.rule_stats)
+        yield from validator.iter_checks()
+
+        catalog_validator = self._catalog_validator()
+        if catalog_validator is not None:
+            yield from catalog_validator.iter_log_checks(self.log.workbook)
+
+        roster_validator = self._roster_validator()
+        if roster_validator is not None:
+            yield from roster_validator.iter_employee_checks(self.log.employee_list)
+
+    def _catalog_validator(self) -> Optional[CatalogValidator]:
+        if self.log.catalog is None:
+            return None
+        validator = CatalogValidator(self.log.catalog, self.disabled_rules)
+        self._validator_stats.append(validator.rule_stats)
+        return validator
+
+    def _roster_validator(self) -> Optional[RosterValidator]:
+        if self.roster is None:
+            return None
+        validator = RosterValidator(self.roster, self.roster_station, self.disabled_rules)
+        self._validator_stats.append(validator.rule_stats)
+        return validator
+
+    @property
+    def rule_stats(self) -> RuleStatsDict:
+        # Sums the stats of every validator run so far, so it's also current partway through iter_checks()
+        totals: RuleStatsDict = dict()
+        for validator_stats in self._validator_stats:
+            for name, stats in validator_stats.items():
+                totals.setdefault(name, RuleStats()).add(stats)
+        return totals
@@ -0,0 +1,60 @@
+from cell_refs import range_boundaries
+from xlsx_values import XlsxValueReader
+
+#########################
+# Typing setup
+#########################
+from typing import Optional
+
+
+class LogSize:
+    """Rough size of a salt log--employee slots and weeks--read from its header alone, for scheduling.
+
+    Only the rows down to the 'Employee Name' heading are decoded, for the week headings; the number of employee
+    slots comes from the sheet's recorded used range, so the employee rows are never read. The slot count is an
+    upper bound (it takes in the footer and any blank slots), which is close enough for ordering work.
+
+    `cost` is employees x weeks, in entries checked. It's None if the size can't be told, e.g. the sheet has no
+    recorded used range.
+    """
+
+    log_sheet = 'AIR DG SALT LOG'
+    max_col = 30            # SaltLog.get_week_cols() looks for weeks up to column 30
+    max_header_rows = 50    # Give up on finding the 'Employee Name' heading past here
+
+    def __init__(self, employees: Optional[int], weeks: int):
+        self.employees: Optional[int] = employees
+        self.weeks: int = weeks
+
+    @property
+    def cost(self) -> Optional[int]:
+        if self.employees is None:
+            return None
+        return self.employees * max(self.weeks, 1)
+
+    @classmethod
+    def read(cls, workbook_file) -> 'LogSize':
+        reader = XlsxValueReader(workbook_file)
+        try:
+            weeks = 0
+            first_employee_row = None
+            for row_num, values in reader.iter_rows(cls.log_sheet, max_col=cls.max_col,
+                                                    max_row=cls.max_header_rows):
+                texts = [value.lower() for value in values.values() if isinstance(value, str)]
+                if weeks == 0:
+                    weeks = sum('week' in text for text in texts)
+                if any(text.strip() == 'employee name' for text in texts):
+                    first_employee_row = row_num + 1
+                    break
+
+            dimension = reader.dimension(cls.log_sheet)
+        finally:
+            reader.close()
+
+        if first_employee_row is None or dimension is None or ':' not in dimension:
+            return cls(None, weeks)
+        min_col, min_row, max_col, max_row = range_boundaries(dimension)
+        return cls(max(max_row - first_employee_row + 1, 0), weeks)
+
+    def __repr__(self):
+        return f'LogSize({self.employees}, {self.weeks})'
@@ -1,42 +1,197 @@
 import argparse
 import pathlib
+from contextlib import nullcontext
 
-from openpyxl import load_workbook
 from salt_log import SaltLog
-from validator import Validator
-from MonthValidator import MonthValidator
+from log_checker import LogChecker
+from windowed_log import WindowedChecker
 from ErrorProcessor import ErrorProcessor
+from ErrorReport import ErrorReport
+from quick_check import QuickCheck
+from archive import ArchiveChecker
+from archive import is_archive
+from rules import RuleSelection
+from roster import Roster
+from reference_catalog import ReferenceCatalog
+
+def main(args, on_stage=None):
+    # on_stage(name) is called as each stage starts, so a batch runner can tell where a workbook got stuck
+    on_stage = on_stage or (lambda stage: None)
+    if getattr(args, 'quick_check', False):
+        on_stage('quick check')
+        return quick_check(args)
+    if getattr(args, 'window_size', None):
+        return windowed_check(args, on_stage)
+    if is_archive(args.input_file):
+        return archive_check(args, on_stage)
+    if getattr(args, 'cache', None):
+        return cached_check(args, on_stage)
+
+    # openpyxl is only needed to load and mark up the workbook, so the quick check and windowed paths skip it
+    from openpyxl import load_workbook
 
-def main(args):
     input_file = pathlib.Path(args.input_file)
     output_file = input_file.with_name(input_file.stem + '_marked' + input_file.suffix)
+    on_stage('load')
     workbook = load_workbook(input_file)
-    log = SaltLog(workbook)
-    salt_errors = list()
+    on_stage('read log')
+    log = SaltLog(workbook, catalog=get_catalog(args))
 
     #########################
     # Check the Salt Log
     #########################
-    for week in log.weeks:
-        tester = Validator(week)
-        salt_errors.extend(tester.run_checks(log.employee_list))
-
-    salt_errors.extend(MonthValidator(log).run_checks())
+    checker_options = get_checker_options(args)
+    processes = getattr(args, 'processes', None)
+    if processes is not None and processes > 1:
+        from parallel_checker import ParallelChecker
+        checker = ParallelChecker(log, processes=processes, **checker_options)
+    else:
+        checker = LogChecker(log, **checker_options)
+    salt_errors = checker.iter_checks()
 
     #########################
-    # Push the errors out to file
+    # Push the errors out to file as they're found
     #########################
-    fixer = ErrorProcessor(salt_errors)
-    fixer.process_errors()
+    on_stage('check')
+    report_path = getattr(args, 'report', None)
+    with open(report_path, 'w', newline='') if report_path else nullcontext() as report_file:
+        if report_file is not None:
+            salt_errors = ErrorReport(report_file).tap(salt_errors)
+        fixer = ErrorProcessor(salt_errors)
+        error_count = fixer.process_errors()
 
     #########################
     # Write the corrected Salt Log to file
     #########################
+    on_stage('save')
     workbook.save(output_file)
-    print(len(salt_errors))
+    print(error_count)
+    if getattr(args, 'rule_stats', False):
+        print_rule_stats(checker.rule_stats)
+    return error_count
+
+def get_checker_options(args) -> dict:
+    rule_config = getattr(args, 'rule_config', None)
+    roster = getattr(args, 'roster', None)
+    return dict(max_errors=getattr(args, 'max_errors', None),
+                fail_fast=getattr(args, 'fail_fast', False),
+                disabled_rules=getattr(args, 'disable_rule', None),
+                rule_selection=RuleSelection.from_json(rule_config) if rule_config else None,
+                roster=Roster.load(roster) if roster else None,
+                roster_station=getattr(args, 'roster_station', None))
+
+def get_catalog(args):
+    # A batch loads the catalog once and hands the same ReferenceCatalog to every workbook; from the command line
+    # it's a path
+    catalog = getattr(args, 'catalog', None)
+    if catalog is None or isinstance(catalog, ReferenceCatalog):
+        return catalog
+    return ReferenceCatalog.load(catalog)
+
+def windowed_check(args, on_stage=None):
+    # The log is never loaded whole, so there's no marked workbook--the errors only go to the CSV report
+    on_stage = on_stage or (lambda stage: None)
+    input_file = pathlib.Path(args.input_file)
+    report_path = getattr(args, 'report', None) or input_file.with_name(input_file.stem + '_errors.csv')
+    on_stage('read log')
+    checker = WindowedChecker(input_file, window_size=args.window_size, catalog=get_catalog(args),
+                              **get_checker_options(args))
+    on_stage('check')
+    with open(report_path, 'w', newline='') as report_file:
+        error_count = ErrorReport(report_file).write_errors(checker.iter_checks())
+
+    print(error_count)
+    if getattr(args, 'rule_stats', False):
+        print_rule_stats(checker.rule_stats)
+    return error_count
+
+def cached_check(args, on_stage=None):
+    # The log is read from the parsed-sheet cache rather than openpyxl, so as with windowed_check() the errors
+    # only go to the CSV report
+    from grid_cache import GridCache
+
+    on_stage = on_stage or (lambda stage: None)
+    input_file = pathlib.Path(args.input_file)
+    report_path = getattr(args, 'report', None) or input_file.with_name(input_file.stem + '_errors.csv')
+    on_stage('load')
+    grid = GridCache(args.cache).load(input_file)
+    try:
+        on_stage('read log')
+        checker = LogChecker(SaltLog(grid, catalog=get_catalog(args)), **get_checker_options(args))
+        on_stage('check')
+        with open(report_path, 'w', newline='') as report_file:
+            error_count = ErrorReport(report_file).write_errors(checker.iter_checks())
+    finally:
+        grid.close()
+
+    print(error_count)
+    if getattr(args, 'rule_stats', False):
+        print_rule_stats(checker.rule_stats)
+    return error_count
+
+def archive_check(args, on_stage=None):
+    # Marked workbooks and the combined error report go into '<archive name>_marked.zip'
+    on_stage = on_stage or (lambda stage: None)
+    input_file = pathlib.Path(args.input_file)
+    output_file = input_file.with_name(ArchiveChecker.output_name(input_file.name))
+    checker = ArchiveChecker(input_file, workers=getattr(args, 'processes', None) or 1,
+                             checker_options=dict(get_checker_options(args), catalog=get_catalog(args)))
+    on_stage('check')
+    error_count = checker.run(output_file)
+
+    print(error_count)
+    if checker.workbooks_failed:
+        print(f'{checker.workbooks_failed} workbook(s) could not be checked; see {checker.report_name}')
+    return error_count
+
+def print_rule_stats(rule_stats):
+    print(f'{"rule":<20}{"rows":>10}{"errors":>10}{"ms":>12}')
+    for name, stats in sorted(rule_stats.items(), key=lambda item: item[1].seconds, reverse=True):
+        print(f'{name:<20}{stats.rows:>10}{stats.errors:>10}{stats.seconds * 1000:>12.2f}')
+
+def quick_check(args):
+    checker = QuickCheck(args.input_file, catalog=get_catalog(args))
+    salt_errors = checker.run_checks()
+    for error in salt_errors:
+        location = error.cell.coordinate if error.cell is not None else '-'
+        print(f'{location}: {error.message}')
+    print('PASS' if checker.passed else 'FAIL')
+    return len(salt_errors)
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('input_file')
+    parser.add_argument('--max-errors', type=int, default=None, help='Stop checking after this many errors')
+    parser.add_argument('--fail-fast', action='store_true', help='Stop checking at the first error')
+    parser.add_argument('--report', default=None, help='Also write the errors to this CSV file')
+    parser.add_argument('--quick-check', action='store_true',
+                        help='Only run the structural checks (operation name, week headings, PCM topics, '
+                             'signatures) and report PASS/FAIL without writing a marked workbook')
+    parser.add_argument('--disable-rule', action='append', default=None, metavar='RULE',
+                        help='Skip this validation rule (can be given more than once)')
+    parser.add_argument('--rule-config', default=None,
+                        help='JSON file of rules to skip, by default and per station (see rules.RuleSelection)')
+    parser.add_argument('--rule-stats', action='store_true',
+                        help='Print rows evaluated, errors raised and time taken for each rule')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='Check the weeks in this many worker processes, sharing one decoded copy of the log '
+                             '(for a zip/tar archive of logs, check this many workbooks at once)')
+    parser.add_argument('--roster', default=None,
+                        help='HR roster to resolve employee names against: a CSV file with id, name (and station) '
+                             'columns, or a SQLite database with a "roster" table of the same')
+    parser.add_argument('--roster-station', default=None,
+                        help='Station to prefer when several roster entries share a name')
+    parser.add_argument('--catalog', default=None,
+                        help='Reference catalog of the month\'s PCM topics and drill sheets (a JSON file from '
+                             'reference_catalog.py, or a workbook with the authoritative tabs) to check against '
+                             'instead of the log\'s own tabs; tabs that differ from it are flagged')
+    parser.add_argument('--window-size', type=int, default=None, metavar='ROWS',
+                        help='Stream the employee rows in windows of this many rows, keeping memory use flat for very '
+                             'large logs; errors go to the --report CSV (default <input>_errors.csv) and no marked '
+                             'workbook is written')
+    parser.add_argument('--cache', default=None, metavar='DIR',
+                        help='Read the log from this parsed-sheet cache directory (decoding and adding it on the first '
+                             'run), so re-checking the same file skips parsing the xlsx; errors go to the --report '
+                             'CSV (default <input>_errors.csv) and no marked workbook is written')
     args = parser.parse_args()
     main(args)
@@ -0,0 +1,95 @@
+import multiprocessing
+from log_checker import LogChecker
+from salt_log import SaltLog
+from validator import Validator
+from MonthValidator import MonthValidator
+from SaltError import SaltError
+from value_grid import GridWorkbook
+from reference_catalog import ReferenceCatalog
+
+#########################
+# Typing setup
+#########################
+from typing import List
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+
+SaltErrorIter = Iterator[SaltError]
+# (row, column, employee row, message, suggestions)--SaltErrors can't cross the process boundary, since their
+# cells point into the worker's view of the shared grid
+ErrorRecord = Tuple[int, int, Optional[int], str, List[str]]
+
+MONTH_TASK = -1
+
+# Per-worker state, set up once by _attach_worker()
+_worker_grid: Optional[GridWorkbook] = None
+_worker_log: Optional[SaltLog] = None
+_worker_disabled_rules: set = set()
+
+
+class ParallelChecker(LogChecker):
+    """LogChecker that spreads the weekly and monthly checks across a pool of worker processes.
+
+    The parent decodes the log once into a GridWorkbook placed in shared memory; each worker attaches to it
+    (zero-copy) and builds its own SaltLog on it, so the workbook is neither re-read nor pickled per worker. Each
+    week is one task and the monthly checks are another. Workers send back plain (row, column, employee row,
+    message, suggestions) records, which the parent turns back into SaltErrors on the real workbook's cells so that
+    ErrorProcessor can annotate them.
+
+    Errors come out in the same order as LogChecker's, and max_errors/fail_fast, disabled rules and rule_stats
+    work the same way.
+    """
+
+    def __init__(self, log: SaltLog, processes: Optional[int] = None, **kwargs):
+        super().__init__(log, **kwargs)
+        self.processes: Optional[int] = processes
+
+    def _iter_all_checks(self) -> SaltErrorIter:
+        employees = {employee.row: employee for employee in self.log.employee_list}
+        tasks = list(range(len(self.log.weeks))) + [MONTH_TASK]
+
+        grid = GridWorkbook.share(self.log.workbook)
+        try:
+            with multiprocessing.Pool(self.processes, initializer=_attach_worker,
+                                      initargs=(grid.shm_name, self.disabled_rules, self.log.catalog)) as pool:
+                for records, rule_stats in pool.imap(_run_task, tasks):
+                    self._validator_stats.append(rule_stats)
+                    for row, column, employee_row, message, suggestions in records:
+                        yield SaltError(employees.get(employee_row), self.log.xl_log.cell(row=row, column=column),
+                                        message, suggestions)
+        finally:
+            grid.close()
+            grid.unlink()
+
+        # The catalog tab comparison reads a few cells, and its errors are on the tabs rather than the log sheet, so
+        # it runs in the parent; so do the roster lookups, which are memoized dict probes
+        catalog_validator = self._catalog_validator()
+        if catalog_validator is not None:
+            yield from catalog_validator.iter_log_checks(self.log.workbook)
+
+        roster_validator = self._roster_validator()
+        if roster_validator is not None:
+            yield from roster_validator.iter_employee_checks(self.log.employee_list)
+
+
+def _attach_worker(shm_name: str, disabled_rules: set, catalog: Optional[ReferenceCatalog]) -> None:
+    global _worker_grid, _worker_log, _worker_disabled_rules
+    _worker_grid = GridWorkbook.attach(shm_name)
+    _worker_log = SaltLog(_worker_grid, catalog=catalog)
+    _worker_disabled_rules = disabled_rules
+
+
+def _run_task(task: int) -> tuple:
+    if task == MONTH_TASK:
+        validator = MonthValidator(_worker_log, _worker_disabled_rules)
+        salt_errors = validator.run_checks()
+    else:
+        validator = Validator(_worker_log.weeks[task], _worker_disabled_rules)
+        salt_errors = validator.run_checks(_worker_log.employee_list)
+
+    records: List[ErrorRecord] = [(error.cell.row, error.cell.column,
+                                   error.employee.row if error.employee is not None else None, error.message,
+                                   error.suggestions)
+                                  for error in salt_errors]
+    return records, validator.rule_stats
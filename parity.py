@@ -0,0 +1,323 @@
+import abc
+import argparse
+import io
+import pathlib
+import sys
+import tempfile
+import time
+from collections import Counter
+
+#########################
+# Typing setup
+#########################
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+# (cell coordinate, message)--what has to match between engines
+ErrorKey = Tuple[str, str]
+ErrorKeyList = List[ErrorKey]
+# (workbook name, workbook bytes)
+CorpusItem = Tuple[str, bytes]
+
+
+def error_keys(salt_errors, employee: bool = False, sheet: bool = False) -> list:
+    """(coordinate, message) of each error, in order--the ErrorKeys compared between engines.
+
+    The tests compare errors through the same helper; they can also ask for the employee's name (appended) and the
+    cell's sheet (prepended), for checks that know more about the errors than a marked workbook does.
+    """
+    keys = list()
+    for error in salt_errors:
+        key = (error.cell.coordinate, error.message)
+        if employee:
+            key += (error.employee.name if error.employee is not None else None,)
+        if sheet:
+            key = (error.cell.parent.title,) + key
+        keys.append(key)
+    return keys
+
+
+class Engine(abc.ABC):
+    """One way of checking a salt log, as seen by the parity harness: workbook bytes in, error keys out.
+
+    Subclasses implement run(). expected() maps the reference engine's keys to what this engine should produce,
+    for engines that can't see every error (e.g. only the last comment left on a cell survives marking).
+    prepare() does any untimed setup for a workbook, e.g. filling a cache.
+    """
+
+    name = ''
+
+    def prepare(self, workbook_data: bytes) -> None:
+        pass
+
+    @abc.abstractmethod
+    def run(self, workbook_data: bytes) -> ErrorKeyList:
+        pass
+
+    def expected(self, reference_keys: ErrorKeyList) -> ErrorKeyList:
+        return reference_keys
+
+
+class ReferenceEngine(Engine):
+    """The original object-by-object check: a Validator per week, then the MonthValidator, with every entry
+    looked up on the sheet cell by cell (no EmployeeIndex). Every other engine is held to its output."""
+
+    name = 'reference'
+
+    def run(self, workbook_data: bytes) -> ErrorKeyList:
+        from openpyxl import load_workbook
+        from salt_log import SaltLog
+        from validator import Validator
+        from MonthValidator import MonthValidator
+
+        log = SaltLog(load_workbook(io.BytesIO(workbook_data)), index=False)
+        salt_errors = list()
+        for week in log.weeks:
+            salt_errors.extend(Validator(week).run_checks(log.employee_list))
+        salt_errors.extend(MonthValidator(log).run_checks())
+        return error_keys(salt_errors)
+
+
+class LogCheckerEngine(Engine):
+    name = 'log_checker'
+
+    def run(self, workbook_data: bytes) -> ErrorKeyList:
+        from openpyxl import load_workbook
+        from salt_log import SaltLog
+        from log_checker import LogChecker
+
+        return error_keys(LogChecker(SaltLog(load_workbook(io.BytesIO(workbook_data)))).iter_checks())
+
+
+class ParallelEngine(Engine):
+    name = 'parallel'
+
+    def __init__(self, processes: int = 2):
+        self.processes: int = processes
+
+    def run(self, workbook_data: bytes) -> ErrorKeyList:
+        from openpyxl import load_workbook
+        from salt_log import SaltLog
+        from parallel_checker import ParallelChecker
+
+        log = SaltLog(load_workbook(io.BytesIO(workbook_data)))
+        return error_keys(ParallelChecker(log, processes=self.processes).iter_checks())
+
+
+class WindowedEngine(Engine):
+    name = 'windowed'
+
+    def __init__(self, window_size: int = 1000):
+        self.window_size: int = window_size
+
+    def run(self, workbook_data: bytes) -> ErrorKeyList:
+        from windowed_log import WindowedChecker
+
+        return error_keys(WindowedChecker(io.BytesIO(workbook_data), window_size=self.window_size).iter_checks())
+
+
+class CachedEngine(Engine):
+    """LogChecker on the workbook's grid from a GridCache, filled by prepare(), so it's timed on a cache hit."""
+
+    name = 'cached'
+
+    def __init__(self):
+        self._directory: Optional[tempfile.TemporaryDirectory] = None
+
+    def _cache(self):
+        from grid_cache import GridCache
+
+        if self._directory is None:
+            self._directory = tempfile.TemporaryDirectory(prefix='parity-cache-')
+        return GridCache(self._directory.name)
+
+    def prepare(self, workbook_data: bytes) -> None:
+        cache = self._cache()
+        key = cache.key(workbook_data)
+        if not cache.path(key).exists():
+            cache.put(key, workbook_data)
+
+    def run(self, workbook_data: bytes) -> ErrorKeyList:
+        from salt_log import SaltLog
+        from log_checker import LogChecker
+
+        grid = self._cache().load(workbook_data)
+        try:
+            return error_keys(LogChecker(SaltLog(grid)).iter_checks())
+        finally:
+            grid.close()
+
+
+class MarkedEngine(Engine):
+    """Checks and marks up the workbook through the in-memory API, then reads the comments back out of the
+    marked workbook, so the ErrorProcessor's output is compared rather than the SaltErrors."""
+
+    name = 'marked'
+
+    def run(self, workbook_data: bytes) -> ErrorKeyList:
+        from openpyxl import load_workbook
+        from api import SaltLogChecker
+
+        marked = load_workbook(io.BytesIO(SaltLogChecker().check(workbook_data, mark=True).marked_workbook))
+        return [(cell.coordinate, cell.comment.text) for row in marked['AIR DG SALT LOG'].iter_rows()
+                for cell in row if cell.comment is not None]
+
+    def expected(self, reference_keys: ErrorKeyList) -> ErrorKeyList:
+        # A cell holds one comment, so a later error on the same cell replaces the earlier one's
+        return list({coordinate: (coordinate, message) for coordinate, message in reference_keys}.values())
+
+
+ENGINES: Dict[str, Engine] = {engine.name: engine for engine in
+                              (LogCheckerEngine(), ParallelEngine(), WindowedEngine(), CachedEngine(),
+                               MarkedEngine())}
+
+
+class ParityResult:
+    """How one engine did on one workbook against the reference: the error keys it missed or added (as
+    multisets--order doesn't matter, but a duplicated error does), and the best time of each."""
+
+    __slots__ = ('workbook', 'engine', 'missing', 'extra', 'reference_seconds', 'engine_seconds', 'error_count')
+
+    def __init__(self, workbook: str, engine: str, missing: ErrorKeyList, extra: ErrorKeyList,
+                 reference_seconds: float, engine_seconds: float, error_count: int):
+        self.workbook: str = workbook
+        self.engine: str = engine
+        self.missing: ErrorKeyList = missing
+        self.extra: ErrorKeyList = extra
+        self.reference_seconds: float = reference_seconds
+        self.engine_seconds: float = engine_seconds
+        self.error_count: int = error_count
+
+    @property
+    def matches(self) -> bool:
+        return not self.missing and not self.extra
+
+    @property
+    def speedup(self) -> float:
+        return self.reference_seconds / self.engine_seconds if self.engine_seconds else float('inf')
+
+
+class ParityHarness:
+    """Runs the reference engine and a set of alternative engines over a corpus of workbooks and diffs them.
+
+    Each engine's errors are compared with the reference's by (coordinate, message), and timed end to end from
+    workbook bytes (best of `repeat` runs), so the speedup reported for each workbook includes loading. An engine
+    that raises is reported as a mismatch, with the exception as its one extra key, rather than stopping the run.
+    """
+
+    def __init__(self, engines: Optional[Iterable[Engine]] = None, repeat: int = 1,
+                 reference: Optional[Engine] = None):
+        self.engines: List[Engine] = list(engines) if engines is not None else list(ENGINES.values())
+        self.repeat: int = repeat
+        self.reference: Engine = reference or ReferenceEngine()
+
+    def run(self, corpus: Iterable[CorpusItem]) -> List[ParityResult]:
+        return list(self.iter_results(corpus))
+
+    def iter_results(self, corpus: Iterable[CorpusItem]) -> Iterator[ParityResult]:
+        for name, workbook_data in corpus:
+            reference_keys, reference_seconds = self._timed(self.reference, workbook_data)
+            for engine in self.engines:
+                try:
+                    engine.prepare(workbook_data)
+                    engine_keys, engine_seconds = self._timed(engine, workbook_data)
+                except Exception as e:
+                    yield ParityResult(name, engine.name, list(), [('', f'{type(e).__name__}: {e}')],
+                                       reference_seconds, 0.0, len(reference_keys))
+                    continue
+                missing, extra = self.diff(engine.expected(reference_keys), engine_keys)
+                yield ParityResult(name, engine.name, missing, extra, reference_seconds, engine_seconds,
+                                   len(reference_keys))
+
+    def _timed(self, engine: Engine, workbook_data: bytes) -> Tuple[ErrorKeyList, float]:
+        best = None
+        for run in range(self.repeat):
+            start = time.perf_counter()
+            keys = engine.run(workbook_data)
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+        return keys, best
+
+    @staticmethod
+    def diff(expected: ErrorKeyList, actual: ErrorKeyList) -> Tuple[ErrorKeyList, ErrorKeyList]:
+        """(keys expected but not produced, keys produced but not expected), each sorted."""
+        expected_counts, actual_counts = Counter(expected), Counter(actual)
+        return sorted((expected_counts - actual_counts).elements()), sorted((actual_counts - expected_counts).elements())
+
+
+#########################
+# Corpora
+#########################
+GENERATED_WEEKS = [
+    ['observation'] * 4,
+    ['observation', 'live salt', 'supplemental drill', 'observation'],
+    ['live salt', 'supplemental drill', 'observation', 'live salt', 'observation'],
+]
+
+
+def generated_corpus(employee_counts: Iterable[int], error_rate: float = 0.2, seed: int = 0) -> Iterator[CorpusItem]:
+    """SampleLogs of each size, cycling through the week layouts, with errors mixed in."""
+    from sample_log import SampleLog
+
+    for number, employees in enumerate(employee_counts):
+        weeks = GENERATED_WEEKS[number % len(GENERATED_WEEKS)]
+        workbook_file = io.BytesIO()
+        SampleLog(employees=employees, weeks=weeks, error_rate=error_rate, seed=seed + number).build() \
+            .save(workbook_file)
+        yield f'generated-{employees}-{number}', workbook_file.getvalue()
+
+
+def file_corpus(paths: Iterable) -> Iterator[CorpusItem]:
+    """Workbooks read from disk; a directory contributes every .xlsx/.xlsm under it."""
+    for path in map(pathlib.Path, paths):
+        files = sorted(path.rglob('*.xls[xm]')) if path.is_dir() else [path]
+        for workbook_path in files:
+            if not workbook_path.name.startswith('~$'):
+                yield str(workbook_path), workbook_path.read_bytes()
+
+
+def report(results: Iterable[ParityResult], lines: List[str], max_diffs: int = 5) -> bool:
+    """Appends a table of results (and the first few differences of each mismatch) to lines; True if all match."""
+    all_match = True
+    lines.append(f'{"workbook":<36}{"engine":<14}{"errors":>8}{"ref s":>10}{"engine s":>10}{"speedup":>9}  parity')
+    for result in results:
+        all_match = all_match and result.matches
+        lines.append(f'{result.workbook[-35:]:<36}{result.engine:<14}{result.error_count:>8}'
+                     f'{result.reference_seconds:>10.3f}{result.engine_seconds:>10.3f}{result.speedup:>8.2f}x  '
+                     f'{"ok" if result.matches else f"{len(result.missing)} missing, {len(result.extra)} extra"}')
+        for label, keys in (('-', result.missing), ('+', result.extra)):
+            for coordinate, message in keys[:max_diffs]:
+                lines.append(f'    {label} {coordinate} {message}')
+    return all_match
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check that the optimized engines flag exactly what the '
+                                                 'reference validators flag, and how much faster they are')
+    parser.add_argument('paths', nargs='*', help='Real salt logs (files or directories) to include')
+    parser.add_argument('--generated', type=int, nargs='*', default=[10, 200, 2000],
+                        help='Employee counts of the generated logs to include (none with no values)')
+    parser.add_argument('--engines', default=','.join(ENGINES),
+                        help=f'Comma-separated engines to compare (default: all of {", ".join(ENGINES)})')
+    parser.add_argument('--repeat', type=int, default=1, help='Time each engine as the best of this many runs')
+    parser.add_argument('--output', default=None, help='Also write the results to this file')
+    args = parser.parse_args()
+
+    unknown = set(args.engines.split(',')) - set(ENGINES)
+    if unknown:
+        parser.error(f'Unknown engine(s): {", ".join(sorted(unknown))}')
+
+    harness = ParityHarness([ENGINES[name] for name in args.engines.split(',')], repeat=args.repeat)
+    corpus = list(file_corpus(args.paths)) + list(generated_corpus(args.generated))
+    lines = list()
+    parity = report(harness.iter_results(corpus), lines)
+
+    output = '\n'.join(lines)
+    print(output)
+    if args.output:
+        pathlib.Path(args.output).write_text(output + '\n')
+    sys.exit(0 if parity else 1)
@@ -0,0 +1,205 @@
+from cell_refs import column_letter
+from xlsx_values import XlsxValueReader
+from salt_log import SaltLog
+from week import SaltWeek
+from validator import Validator
+from MonthValidator import MonthValidator
+from SaltError import SaltError
+from reference_catalog import ReferenceCatalog
+import re
+
+#########################
+# Typing setup
+#########################
+from typing import List
+from typing import Dict
+from typing import Optional
+from datetime import date
+
+SaltErrorList = List[SaltError]
+RowValues = Dict[int, object]
+
+
+class QuickCell:
+    """Minimal stand-in for an openpyxl Cell, used to point SaltErrors at a location on the read-only sheet."""
+
+    __slots__ = ('row', 'column', 'value')
+
+    def __init__(self, row: int, column: int, value):
+        self.row = row
+        self.column = column
+        self.value = value
+
+    @property
+    def coordinate(self) -> str:
+        return f'{column_letter(self.column)}{self.row}'
+
+
+QuickCellDict = Dict[int, QuickCell]
+
+
+class QuickCheck:
+    """Fail-fast structural check of a SALT log, for deciding at upload time whether a log is acceptable.
+
+    QuickCheck runs only the structural rules:
+
+        * Operation name format (`MonthValidator.operation_name_errors()`)
+        * Week headings contain a week ending date that parses
+        * Each week's PCM topic matches its PCM tab (`Validator.pcm_topic_errors()`)
+        * Each week's PCM signature has a valid format (`Validator.signature_errors()`)
+
+    The workbook is read with XlsxValueReader rather than openpyxl, so styles are never loaded, and only the
+    header rows, the week footer rows and the first cells of the PCM tabs are looked at. Below the week row the
+    only cells decoded are in the week heading and comment columns, where the footer labels live; the employee
+    entries themselves are never evaluated, and reading stops as soon as every week's signature row is found.
+
+    Given a batch's reference `catalog`, the PCM topics come from it and the PCM tabs aren't read at all.
+
+    The detailed per-employee checks are left to LogChecker.
+    """
+
+    max_col = 32        # SaltLog.get_week_cols() looks for weeks up to column 30, plus result/comment columns
+    header_cols = 10    # The operation name and first week heading are found in the first 10 columns
+    footer_labels = ('topic', 'date', 'signature')
+
+    def __init__(self, workbook_file, catalog: Optional[ReferenceCatalog] = None):
+        self.workbook_file = workbook_file
+        self.catalog: Optional[ReferenceCatalog] = catalog
+
+        self.operation_name_cell: Optional[QuickCell] = None
+        self.week_row: Optional[int] = None
+        self.week_headings: QuickCellDict = dict()
+        self.footer_cells: Dict[str, QuickCellDict] = {label: dict() for label in self.footer_labels}
+        self.pcms: Dict[date, str] = dict()
+
+        self.salt_errors: SaltErrorList = list()
+
+    @property
+    def passed(self) -> bool:
+        return len(self.salt_errors) == 0
+
+    def run_checks(self) -> SaltErrorList:
+        self.salt_errors = list()
+        reader = XlsxValueReader(self.workbook_file)
+        try:
+            self._scan_log(reader)
+            if self.catalog is not None:
+                self.pcms = dict(self.catalog.pcm_topics)
+            else:
+                self.pcms = self._read_pcm_tabs(reader)
+        finally:
+            reader.close()
+
+        self._check_operation_name()
+        self._check_weeks()
+        return self.salt_errors
+
+    def _scan_log(self, reader: XlsxValueReader) -> None:
+        # The reader checks `columns` cell by cell, so narrowing it once the week headings are found means only the
+        # week heading and comment columns get decoded from there on
+        columns = set(range(1, self.max_col + 1))
+        for row_num, values in reader.iter_rows('AIR DG SALT LOG', columns=columns):
+            if self.operation_name_cell is None:
+                self._find_operation_name(row_num, values)
+            if self.week_row is None:
+                self._find_week_headings(row_num, values)
+                if self.week_row is not None:
+                    columns.intersection_update(self._footer_columns())
+            if self.week_row is not None:
+                self._find_footer_labels(row_num, values)
+                if self._footer_complete() and self.operation_name_cell is not None:
+                    break
+
+    def _footer_columns(self) -> set:
+        columns = set(self.week_headings) | {col + 2 for col in self.week_headings}
+        if self.operation_name_cell is None:
+            columns.update(range(1, self.header_cols + 1))
+        return columns
+
+    def _find_operation_name(self, row_num: int, values: RowValues) -> None:
+        for col in range(1, self.header_cols + 1):
+            value = values.get(col)
+            if isinstance(value, str) and 'operation' in value.lower():
+                # Merged cells aren't read, so take the first non-empty cell after the label; if there isn't one
+                # the operation name was left blank
+                for value_col in range(col + 1, self.header_cols + 1):
+                    if values.get(value_col) is not None:
+                        self.operation_name_cell = QuickCell(row_num, value_col, values[value_col])
+                        return
+                self.operation_name_cell = QuickCell(row_num, col + 1, None)
+                return
+
+    def _find_week_headings(self, row_num: int, values: RowValues) -> None:
+        if not any(isinstance(values.get(col), str) and 'week' in values[col].lower()
+                   for col in range(1, self.header_cols + 1)):
+            return
+        self.week_row = row_num
+        for col in range(1, 31):
+            value = values.get(col)
+            if isinstance(value, str) and 'week' in value.lower():
+                self.week_headings[col] = QuickCell(row_num, col, value)
+
+    def _find_footer_labels(self, row_num: int, values: RowValues) -> None:
+        for col in self.week_headings:
+            value = values.get(col)
+            if not isinstance(value, str):
+                continue
+            for label in self.footer_labels:
+                if col not in self.footer_cells[label] and label in value.lower():
+                    # Footer values live in the week's comment column
+                    self.footer_cells[label][col] = QuickCell(row_num, col + 2, values.get(col + 2))
+
+    def _footer_complete(self) -> bool:
+        return all(col in self.footer_cells['signature'] for col in self.week_headings)
+
+    def _read_pcm_tabs(self, reader: XlsxValueReader) -> dict:
+        pcms = dict()
+        for name in reader.sheetnames:
+            if not name.strip().startswith('PCM'):
+                continue
+            try:
+                pcm_date = SaltLog._parse_date(name)
+            except Exception:
+                self.salt_errors.append(SaltError(None, None, f'Could not read date from PCM tab "{name}"'))
+                continue
+            for row_num, values in reader.iter_rows(name, max_row=5, max_col=15):
+                if values:
+                    pcms[pcm_date] = values[min(values)]
+                    break
+        return pcms
+
+    def _check_operation_name(self) -> None:
+        if self.operation_name_cell is None:
+            self.salt_errors.append(SaltError(None, None, 'Could not find operation name'))
+            return
+        self.salt_errors.extend(MonthValidator.operation_name_errors(self.operation_name_cell.value,
+                                                                     self.operation_name_cell))
+
+    def _check_weeks(self) -> None:
+        if self.week_row is None:
+            self.salt_errors.append(SaltError(None, None, 'Could not find week headings'))
+            return
+
+        for col, heading_cell in self.week_headings.items():
+            ending_date = self._parse_heading(heading_cell)
+
+            topic_cell = self.footer_cells['topic'].get(col)
+            if topic_cell is None:
+                self.salt_errors.append(SaltError(None, heading_cell, 'Could not find PCM topic row for week'))
+            elif ending_date is not None:
+                self.salt_errors.extend(Validator.pcm_topic_errors(topic_cell.value, self.pcms.get(ending_date),
+                                                                   topic_cell))
+
+            signature_cell = self.footer_cells['signature'].get(col)
+            if signature_cell is None:
+                self.salt_errors.append(SaltError(None, heading_cell, 'Could not find signature row for week'))
+            else:
+                self.salt_errors.extend(Validator.signature_errors(signature_cell.value, signature_cell))
+
+    def _parse_heading(self, heading_cell: QuickCell) -> Optional[date]:
+        match = re.search(SaltWeek.ending_date_pattern, heading_cell.value)
+        try:
+            return SaltWeek._parse_date(match.group(0))
+        except (AttributeError, ValueError):
+            self.salt_errors.append(SaltError(None, heading_cell, 'Could not read week ending date from heading'))
+            return None
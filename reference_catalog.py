@@ -0,0 +1,193 @@
+import argparse
+import json
+from datetime import date
+from datetime import datetime
+from salt_log import SaltLog
+from SaltError import SaltError
+from rules import RuleRunner
+
+#########################
+# Typing setup
+#########################
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+
+# Week ending date -> PCM topic or drill sheet name
+DateValues = Dict[date, object]
+SaltErrorIter = Iterator[SaltError]
+
+
+class ReferenceCatalog:
+    """The authoritative PCM topics and supplemental drill sheets for a month, by week ending date.
+
+    Every station's log carries its own copy of the month's 'PCM ...' and '... drill' tabs. A batch of logs can
+    instead be checked against one catalog, loaded once and shared by every worker: SaltLog(catalog=...) takes the
+    correct PCM topic and drill sheet for each week from it rather than reading its tabs, and CatalogValidator flags
+    the tabs of any log whose copy differs from the catalog.
+
+    A catalog is built from a reference workbook (any log with the month's tabs) or loaded from the JSON file
+    written by save():
+
+        {"pcm_topics": {"2019-01-05": "Hidden Shipments", ...}, "drill_sheets": {"2019-01-19": "DS-12", ...}}
+
+    A tab value that's a date (a date-formatted cell) is written as {"datetime": "2019-01-19T00:00:00"}, so that
+    it's read back as the same value the workbook's cell holds.
+    """
+
+    def __init__(self, pcm_topics: DateValues, drill_sheets: DateValues):
+        self.pcm_topics: DateValues = dict(pcm_topics)
+        self.drill_sheets: DateValues = dict(drill_sheets)
+
+    @classmethod
+    def load(cls, path) -> 'ReferenceCatalog':
+        """Reads a catalog from a .json file written by save(), or from the tabs of an .xlsx/.xlsm workbook."""
+        if str(path).lower().endswith(('.xlsx', '.xlsm')):
+            return cls.from_xlsx(path)
+        return cls.from_json(path)
+
+    @classmethod
+    def from_json(cls, path) -> 'ReferenceCatalog':
+        with open(path, encoding='utf-8') as catalog_file:
+            data = json.load(catalog_file)
+        try:
+            return cls({date.fromisoformat(day): cls._decode(value)
+                        for day, value in data.get('pcm_topics', dict()).items()},
+                       {date.fromisoformat(day): cls._decode(value)
+                        for day, value in data.get('drill_sheets', dict()).items()})
+        except (AttributeError, TypeError, ValueError):
+            raise Exception(f'Could not read reference catalog "{path}"--expected pcm_topics and drill_sheets '
+                            f'objects keyed by YYYY-MM-DD dates')
+
+    @classmethod
+    def from_workbook(cls, workbook) -> 'ReferenceCatalog':
+        """From an already loaded workbook (openpyxl or value_grid), read the way SaltLog reads its own tabs."""
+        return cls(SaltLog.read_pcm_tabs(workbook), SaltLog.read_drill_tabs(workbook))
+
+    @classmethod
+    def from_xlsx(cls, workbook_file) -> 'ReferenceCatalog':
+        """From an xlsx file, streaming the first rows of its PCM and drill tabs only (the log sheet isn't read)."""
+        from xlsx_values import XlsxValueReader
+
+        reader = XlsxValueReader(workbook_file, dates=True)
+        try:
+            pcm_topics = dict()
+            for name in SaltLog.pcm_tab_names(reader):
+                topic = cls._first_value(reader, name, max_row=5)
+                if topic is None:
+                    raise Exception('No PCM topic found in cells searched')
+                pcm_topics[SaltLog._parse_date(name)] = topic
+            drill_sheets = {SaltLog._parse_date(name): cls._first_value(reader, name)
+                            for name in SaltLog.drill_tab_names(reader)}
+        finally:
+            reader.close()
+        return cls(pcm_topics, drill_sheets)
+
+    @staticmethod
+    def _first_value(reader, name: str, max_row: Optional[int] = None):
+        # Same search as SaltLog.first_value_cell(): first non-empty row, leftmost value, first 15 columns
+        for row_num, values in reader.iter_rows(name, max_row=max_row, max_col=15):
+            if values:
+                return values[min(values)]
+        return None
+
+    def save(self, path) -> None:
+        data = {'pcm_topics': {day.isoformat(): self._encode(value) for day, value in sorted(self.pcm_topics.items())},
+                'drill_sheets': {day.isoformat(): self._encode(value)
+                                 for day, value in sorted(self.drill_sheets.items())}}
+        with open(path, 'w', encoding='utf-8') as catalog_file:
+            json.dump(data, catalog_file, indent=2)
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, datetime):
+            return {'datetime': value.isoformat()}
+        if isinstance(value, date):
+            return {'date': value.isoformat()}
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        raise Exception(f'Can\'t save a {type(value).__name__} tab value ({value!r}) in a reference catalog')
+
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, dict) and list(value) == ['datetime']:
+            return datetime.fromisoformat(value['datetime'])
+        if isinstance(value, dict) and list(value) == ['date']:
+            return date.fromisoformat(value['date'])
+        return value
+
+    def __repr__(self):
+        return f'ReferenceCatalog({len(self.pcm_topics)} PCM topics, {len(self.drill_sheets)} drill sheets)'
+
+
+class CatalogValidator(RuleRunner):
+    """Compares a log's own PCM and drill tabs with the reference catalog it was checked against.
+
+    A tab whose date can't be read, whose date isn't in the catalog, or whose topic/drill sheet differs from the
+    catalog's is flagged on the tab's first value (cell A1 if the tab is empty), naming the tab, with the catalog's
+    value as the suggestion. PCM topics are compared as Validator compares them, ignoring case and surrounding
+    space. Weeks of the catalog that have no tab in the log aren't flagged, since the catalog supplies them anyway.
+    The check is the 'catalog_tabs' rule; it only reads the first few cells of each tab.
+    """
+
+    log_rules = {
+        'catalog_tabs': 'check_catalog_tabs',
+    }
+
+    def __init__(self, catalog: ReferenceCatalog, disabled_rules: Optional[Iterable[str]] = None):
+        self.catalog: ReferenceCatalog = catalog
+
+        super().__init__(disabled_rules)
+        self._active_log_rules = self._activate_rules(self.log_rules)
+
+    def iter_log_checks(self, workbook) -> SaltErrorIter:
+        for name, rule in self._active_log_rules:
+            self._run_rule(name, rule, workbook)
+        yield from self._drain_errors()
+
+    def check_catalog_tabs(self, workbook) -> None:
+        for name in SaltLog.pcm_tab_names(workbook):
+            self._check_tab(workbook[name], 'PCM', self.catalog.pcm_topics, max_row=5)
+        for name in SaltLog.drill_tab_names(workbook):
+            self._check_tab(workbook[name], 'Drill', self.catalog.drill_sheets)
+
+    def _check_tab(self, sheet, kind: str, catalog_values: DateValues, max_row: Optional[int] = None) -> None:
+        cell = SaltLog.first_value_cell(sheet, max_row=max_row)
+        value = cell.value if cell is not None else None
+        if cell is None:
+            cell = sheet.cell(row=1, column=1)
+
+        try:
+            tab_date = SaltLog._parse_date(sheet.title)
+        except Exception:
+            self.salt_errors.append(SaltError(None, cell, f'Could not read date from {kind} tab "{sheet.title}"'))
+            return
+        if tab_date not in catalog_values:
+            self.salt_errors.append(SaltError(None, cell, f'{kind} tab "{sheet.title}" is not in the reference '
+                                                          f'catalog--check the tab\'s date'))
+            return
+
+        expected = catalog_values[tab_date]
+        if not self._same(value, expected):
+            message = f'{kind} tab "{sheet.title}" doesn\'t match the reference catalog--should be "{expected}"'
+            self.salt_errors.append(SaltError(None, cell, message, [str(expected)]))
+
+    @staticmethod
+    def _same(value, expected) -> bool:
+        if isinstance(value, str) and isinstance(expected, str):
+            return value.strip().lower() == expected.strip().lower()
+        return value == expected
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build a reference catalog of the month\'s PCM topics and drill '
+                                                 'sheets from a workbook\'s tabs, for checking a batch of logs '
+                                                 'with --catalog')
+    parser.add_argument('workbook', help='Workbook (.xlsx/.xlsm) holding the authoritative PCM and drill tabs')
+    parser.add_argument('output', help='JSON file to write the catalog to')
+    args = parser.parse_args()
+
+    catalog = ReferenceCatalog.from_xlsx(args.workbook)
+    catalog.save(args.output)
+    print(catalog)
@@ -0,0 +1,255 @@
+import csv
+import re
+import unicodedata
+from SaltError import SaltError
+from rules import RuleRunner
+from similarity import BoundedMemo
+from similarity import dice
+from similarity import trigrams
+
+#########################
+# Typing setup
+#########################
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from employee import Employee
+
+EmployeeList = List[Employee]
+SaltErrorList = List[SaltError]
+SaltErrorIter = Iterator[SaltError]
+
+
+class RosterEntry:
+    """One employee on the HR roster."""
+
+    __slots__ = ('id', 'name', 'station', 'normalized')
+
+    def __init__(self, id: str, name: str, station: Optional[str] = None):
+        self.id = id
+        self.name = name
+        self.station = station
+        self.normalized = Roster.normalize(name)
+
+    def __repr__(self):
+        return f'RosterEntry({self.id!r}, {self.name!r}, {self.station!r})'
+
+
+class RosterMatch:
+    """Result of Roster.resolve(): how the name matched (`status`), the entry if it resolved, and suggestions.
+
+    `status` is 'exact', 'normalized', 'ambiguous' (several entries share the name; they're in `candidates`) or
+    'unknown' (no entry has the name; the closest by trigram similarity are in `candidates`, best first).
+    """
+
+    __slots__ = ('status', 'entry', 'candidates')
+
+    def __init__(self, status: str, entry: Optional[RosterEntry] = None,
+                 candidates: Optional[List[RosterEntry]] = None):
+        self.status = status
+        self.entry = entry
+        self.candidates: List[RosterEntry] = candidates or list()
+
+    @property
+    def resolved(self) -> bool:
+        return self.entry is not None
+
+
+class Roster:
+    """HR master list of employees, indexed for resolving the names typed into a salt log.
+
+    Three indexes are built once, when the roster is loaded:
+
+        * exact: name as written -> entries
+        * normalized: name with case, accents, punctuation, spacing and word order ironed out -> entries, so
+          'DOE, Jane' and 'jane  doe' find 'Jane Doe'
+        * trigram: each trigram of a normalized name -> entries containing it, for suggesting the closest names
+          when there's no match at all
+
+    resolve() tries them in that order. Exact and normalized lookups are single dict probes; the trigram search
+    only runs for names that don't match, and the last `memo_size` results are memoized, so the same names coming
+    up again across a batch cost a dict lookup.
+
+    A roster can be read from a CSV file with 'id' and 'name' columns (and optionally 'station'), or from a
+    SQLite table with those columns; see load().
+    """
+
+    suggestion_count = 3
+    min_similarity = 0.4
+    memo_size = 16384
+
+    def __init__(self, entries: Iterable[RosterEntry]):
+        self.entries: List[RosterEntry] = list(entries)
+        self.exact: Dict[str, List[RosterEntry]] = dict()
+        self.normalized: Dict[str, List[RosterEntry]] = dict()
+        self.trigrams: Dict[str, List[int]] = dict()
+        self._entry_trigrams: List[frozenset] = list()
+        self._memo = BoundedMemo(self.memo_size)
+
+        for position, entry in enumerate(self.entries):
+            self.exact.setdefault(entry.name.strip(), list()).append(entry)
+            self.normalized.setdefault(entry.normalized, list()).append(entry)
+            entry_trigrams = frozenset(trigrams(entry.normalized))
+            self._entry_trigrams.append(entry_trigrams)
+            for trigram in entry_trigrams:
+                self.trigrams.setdefault(trigram, list()).append(position)
+
+    def __len__(self):
+        return len(self.entries)
+
+    #########################
+    # Loading
+    #########################
+    @classmethod
+    def load(cls, path) -> 'Roster':
+        """Reads a roster from a .csv file, or from the 'roster' table of a SQLite database (any other suffix)."""
+        if str(path).lower().endswith('.csv'):
+            return cls.from_csv(path)
+        return cls.from_sqlite(path)
+
+    @classmethod
+    def from_csv(cls, path) -> 'Roster':
+        with open(path, newline='', encoding='utf-8-sig') as roster_file:
+            reader = csv.DictReader(roster_file)
+            columns = {column.strip().lower(): column for column in reader.fieldnames or ()}
+            if 'id' not in columns or 'name' not in columns:
+                raise Exception('Roster CSV needs "id" and "name" columns')
+            station = columns.get('station')
+            entries = [cls._entry(row.get(columns['id']), row.get(columns['name']),
+                                  row.get(station) if station else None, f'line {reader.line_num} of "{path}"')
+                       for row in reader]
+        return cls(entry for entry in entries if entry is not None)
+
+    @classmethod
+    def from_sqlite(cls, path, table: str = 'roster') -> 'Roster':
+        import sqlite3
+        connection = sqlite3.connect(path)
+        try:
+            columns = {row[1].lower() for row in connection.execute(f'PRAGMA table_info("{table}")')}
+            if 'id' not in columns or 'name' not in columns:
+                raise Exception(f'Roster table "{table}" needs "id" and "name" columns')
+            station_column = 'station' if 'station' in columns else 'NULL'
+            rows = connection.execute(f'SELECT id, name, {station_column} FROM "{table}"')
+            entries = [cls._entry(id, name, station, f'row {number} of table "{table}"')
+                       for number, (id, name, station) in enumerate(rows, 1)]
+        finally:
+            connection.close()
+        return cls(entry for entry in entries if entry is not None)
+
+    @staticmethod
+    def _entry(id, name, station, where: str) -> Optional[RosterEntry]:
+        # Values may be missing (a short CSV row) or not text (a SQLite column of numbers). A row without a name
+        # is skipped as blank; a named employee without an id is an error in the roster
+        name = str(name).strip() if name is not None else ''
+        if not name:
+            return None
+        id = str(id).strip() if id is not None else ''
+        if not id:
+            raise Exception(f'Roster entry "{name}" at {where} has no id')
+        station = str(station).strip() if station is not None else ''
+        return RosterEntry(id, name, station or None)
+
+    #########################
+    # Lookups
+    #########################
+    @staticmethod
+    def normalize(name: str) -> str:
+        name = unicodedata.normalize('NFKD', name)
+        name = ''.join(char for char in name if not unicodedata.combining(char)).lower()
+        return ' '.join(sorted(re.findall(r'[a-z0-9]+', name)))
+
+    def resolve(self, name: str, station: Optional[str] = None) -> RosterMatch:
+        """Matches a name from the log against the roster.
+
+        If `station` is given, a name shared by several entries resolves to the one at that station, if only one
+        is.
+        """
+        key = (name, station)
+        match = self._memo.get(key)
+        if match is None:
+            match = self._resolve(name, station)
+            self._memo[key] = match
+        return match
+
+    def _resolve(self, name: str, station: Optional[str]) -> RosterMatch:
+        status, entries = 'exact', self.exact.get(name.strip())
+        if not entries:
+            status, entries = 'normalized', self.normalized.get(self.normalize(name))
+        if not entries:
+            return RosterMatch('unknown', candidates=self.suggest(name))
+
+        if len(entries) > 1 and station is not None:
+            entries = [entry for entry in entries if entry.station == station] or entries
+        if len(entries) == 1:
+            return RosterMatch(status, entries[0])
+        return RosterMatch('ambiguous', candidates=entries)
+
+    def suggest(self, name: str) -> List[RosterEntry]:
+        """Roster entries closest to `name` by trigram (Dice) similarity, best first."""
+        name_trigrams = trigrams(self.normalize(name))
+        if not name_trigrams:
+            return list()
+
+        # Candidates come from the rarer half of the name's trigrams--common ones (e.g. from popular first names)
+        # have long postings lists and add little. A typo only touches a few trigrams, so a close name still
+        # shares most of them.
+        postings = sorted((self.trigrams.get(trigram, ()) for trigram in name_trigrams), key=len)
+        candidates = set()
+        for positions in postings[:max(3, len(postings) // 2)]:
+            candidates.update(positions)
+
+        scored = list()
+        for position in candidates:
+            score = dice(name_trigrams, self._entry_trigrams[position])
+            if score >= self.min_similarity:
+                scored.append((score, position))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [self.entries[position] for score, position in scored[:self.suggestion_count]]
+
+
+class RosterValidator(RuleRunner):
+    """Resolves each employee in a log against the HR roster, raising SaltErrors for names that don't resolve.
+
+    Resolved employees get their roster id in `Employee.roster_id`. A name that isn't on the roster, or that
+    matches several entries, is flagged on the employee's name cell with the closest roster names as suggestions.
+    The check is the 'roster' rule, selectable and accounted for like the Validator/MonthValidator rules.
+    """
+
+    employee_rules = {
+        'roster': 'check_roster',
+    }
+
+    def __init__(self, roster: Roster, station: Optional[str] = None, disabled_rules: Optional[Iterable[str]] = None):
+        self.roster: Roster = roster
+        self.station: Optional[str] = station
+
+        super().__init__(disabled_rules)
+        self._active_employee_rules = self._activate_rules(self.employee_rules)
+
+    def iter_employee_checks(self, employee_list: EmployeeList) -> SaltErrorIter:
+        for employee in employee_list:
+            for name, rule in self._active_employee_rules:
+                self._run_rule(name, rule, employee)
+            yield from self._drain_errors()
+
+    def check_roster(self, employee: Employee) -> None:
+        match = self.roster.resolve(employee.name, self.station)
+        if match.resolved:
+            employee.roster_id = match.entry.id
+            return
+
+        suggestions = [self._describe(entry) for entry in match.candidates]
+        if match.status == 'ambiguous':
+            message = f'Employee name matches several roster entries: {"; ".join(suggestions)}'
+        elif suggestions:
+            message = f'Employee not found on roster--did you mean {"; ".join(suggestions)}?'
+        else:
+            message = 'Employee not found on roster'
+        self.salt_errors.append(SaltError(employee, employee.cell, message, [entry.name for entry in match.candidates]))
+
+    @staticmethod
+    def _describe(entry: RosterEntry) -> str:
+        details = ', '.join(detail for detail in (entry.id, entry.station) if detail)
+        return f'{entry.name} ({details})'
@@ -0,0 +1,120 @@
+import json
+import time
+
+#########################
+# Typing setup
+#########################
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from SaltError import SaltError
+
+StrSet = Set[str]
+SaltErrorList = List[SaltError]
+# Rule name -> method name, as declared by a validator; and the (name, bound method) pairs selected to run
+RuleTable = Dict[str, str]
+ActiveRuleList = List[Tuple[str, Callable]]
+
+
+class RuleStats:
+    """Cost accounting for a single validation rule: rows evaluated, time taken and errors raised."""
+
+    __slots__ = ('rows', 'seconds', 'errors')
+
+    def __init__(self, rows: int = 0, seconds: float = 0.0, errors: int = 0):
+        self.rows: int = rows
+        self.seconds: float = seconds
+        self.errors: int = errors
+
+    def add(self, other: 'RuleStats') -> None:
+        self.rows += other.rows
+        self.seconds += other.seconds
+        self.errors += other.errors
+
+    def __repr__(self):
+        return f'RuleStats(rows={self.rows}, seconds={self.seconds:.6f}, errors={self.errors})'
+
+
+RuleStatsDict = Dict[str, RuleStats]
+
+
+class RuleRunner:
+    """Mixin for the validators: selects their named rules, runs them with cost accounting and collects errors.
+
+    A validator declares its rules as class-level tables of rule name -> method name (e.g. `employee_rules`),
+    calls RuleRunner.__init__() with the rules switched off for the run, and then picks each table's rules with
+    _activate_rules(). Rules append SaltErrors to `self.salt_errors`; _run_rule() records each run in
+    `rule_stats`, and _drain_errors() hands the errors collected so far on.
+    """
+
+    def __init__(self, disabled_rules: Optional[Iterable[str]] = None):
+        self.disabled_rules: StrSet = set(disabled_rules or ())
+        self.rule_stats: RuleStatsDict = dict()
+        self.salt_errors: SaltErrorList = list()
+
+    def _activate_rules(self, rules: RuleTable) -> ActiveRuleList:
+        """The table's rules that aren't switched off and apply here, bound, each with a fresh RuleStats."""
+        active = [(name, getattr(self, method)) for name, method in rules.items()
+                  if name not in self.disabled_rules and self._rule_applies(name)]
+        for name, rule in active:
+            self.rule_stats[name] = RuleStats()
+        return active
+
+    def _rule_applies(self, name: str) -> bool:
+        return True
+
+    def _run_rule(self, name: str, rule, *args) -> None:
+        """Runs a single rule, recording its row, time and error counts in self.rule_stats."""
+        stats = self.rule_stats[name]
+        error_count = len(self.salt_errors)
+        start = time.perf_counter()
+        rule(*args)
+        stats.seconds += time.perf_counter() - start
+        stats.rows += 1
+        stats.errors += len(self.salt_errors) - error_count
+
+    def _drain_errors(self) -> SaltErrorList:
+        """Hands back the SaltErrors collected so far and starts a fresh list for the next rules."""
+        salt_errors, self.salt_errors = self.salt_errors, list()
+        return salt_errors
+
+
+class RuleSelection:
+    """Which validation rules are switched off, for every log and per station.
+
+    A station is matched against the log's operation name (case-insensitive substring), so a station key can be
+    as broad as '2DA' or as narrow as '2DA Wing C Posi 7 North'. The rules switched off for a log are the
+    defaults plus those of every station that matches.
+
+    A selection can be loaded from a JSON file of the form:
+
+        {"disabled": ["observation"], "stations": {"Posi 7": ["signature", "pcm"]}}
+    """
+
+    def __init__(self, disabled: Optional[Iterable[str]] = None, stations: Optional[Dict[str, Iterable[str]]] = None):
+        self.disabled: StrSet = set(disabled or ())
+        self.stations: Dict[str, StrSet] = {station: set(rules) for station, rules in (stations or dict()).items()}
+
+    @classmethod
+    def from_json(cls, path) -> 'RuleSelection':
+        with open(path) as config_file:
+            config = json.load(config_file)
+        return cls(config.get('disabled'), config.get('stations'))
+
+    def disabled_for(self, operation_name: Optional[str]) -> StrSet:
+        disabled = set(self.disabled)
+        if operation_name is not None:
+            for station, rules in self.stations.items():
+                if station.lower() in operation_name.lower():
+                    disabled.update(rules)
+        return disabled
+
+    def rule_names(self) -> StrSet:
+        names = set(self.disabled)
+        for rules in self.stations.values():
+            names.update(rules)
+        return names
@@ -1,11 +1,12 @@
-from openpyxl.cell.cell import MergedCell
-from openpyxl.worksheet.worksheet import Worksheet
-from openpyxl.workbook.workbook import Workbook
-from openpyxl.cell.cell import Cell
-from openpyxl.styles import PatternFill, Color
-from openpyxl.styles.colors import YELLOW
+from typing import Optional
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from openpyxl.worksheet.worksheet import Worksheet
+    from openpyxl.workbook.workbook import Workbook
+    from reference_catalog import ReferenceCatalog
 
 from employee import Employee
+from employee_index import EmployeeIndex
 from datetime import datetime
 from week import SaltWeek
 
@@ -14,13 +15,21 @@ from datetime import datetime
 import re
 
 class SaltLog:
-    def __init__(self, workbook):
-        self.workbook: Workbook = workbook
-        self.xl_log: Worksheet = workbook['AIR DG SALT LOG']
+    def __init__(self, workbook, index: bool = True, catalog: Optional['ReferenceCatalog'] = None):
+        self.workbook: 'Workbook' = workbook
+        self.xl_log: 'Worksheet' = workbook['AIR DG SALT LOG']
         self.employee_list_start: tuple = self.find_first_employee()
         self.employee_list: list = self.get_employee_list()
-        self.pcms: dict = self.get_pcm_list()
-        self.drill_sheets = self.get_supp_drills()
+
+        # With a batch's reference catalog, the correct PCM topics and drill sheets come from it and this
+        # workbook's own copies of the tabs aren't read (CatalogValidator compares them against it instead)
+        self.catalog: Optional['ReferenceCatalog'] = catalog
+        if catalog is not None:
+            self.pcms: dict = dict(catalog.pcm_topics)
+            self.drill_sheets = dict(catalog.drill_sheets)
+        else:
+            self.pcms: dict = self.get_pcm_list()
+            self.drill_sheets = self.get_supp_drills()
         self.week_row: int = self.get_week_row()
         self.week_cols: list = self.get_week_cols(self.week_row)
 
@@ -40,9 +49,14 @@ class SaltLog:
             week.set_supp_drill(self.drill_sheets)
             week.set_correct_PCM(self.pcms)
 
-    def set_highlight(self, cell: Cell) -> None:
-        cell.fill = PatternFill(fill_type='solid', fgColor=Color(rgb='FFFFF200', type='rgb'),
-                                bgColor=Color(rgb='FFFFFF00', type='rgb'))
+        # Preload every employee's week entries and monthly drill cells. Without the index (`index=False`), every
+        # entry is looked up on the sheet cell by cell--the original path, kept as the reference for parity.py
+        self.employee_index = None
+        if index:
+            self.employee_index = EmployeeIndex(self.xl_log, self.employee_list, self.week_cols,
+                                                self.monthly_drill_date_col, self.monthly_drill_result_col)
+            for week_number, week in enumerate(self.weeks):
+                week.set_index(self.employee_index, week_number)
 
     def find_first_employee(self) -> tuple:
         for cell in self.xl_log.iter_rows(min_col=2, max_col=2):
@@ -59,7 +73,8 @@ class SaltLog:
                                           min_row=self.employee_list_start[1]):
 
             # The employee slots end at a merged cell and should never be merged cells themselves
-            if isinstance(cell[0], MergedCell):
+            # (checked by name so that value_grid's MergedCell counts too)
+            if type(cell[0]).__name__ == 'MergedCell':
                 break
             # If the line is blank, skip it
             if cell[0].value is None or cell[0].value.strip() == '':
@@ -69,43 +84,60 @@ class SaltLog:
 
         return ee_list
 
-    def get_pcm_topic(self, sheet: Worksheet) -> str:
-        for row in sheet.iter_rows(min_col=1, max_col=15, max_row=5):
+    @staticmethod
+    def first_value_cell(sheet: 'Worksheet', max_row: Optional[int] = None):
+        """The first cell with a value in the first 15 columns of a PCM/drill tab, or None."""
+        for row in sheet.iter_rows(min_col=1, max_col=15, max_row=max_row):
             for cell in row:
-                if cell.value is not None:
-                    return cell.value
+                if getattr(cell, 'value', None) is not None:   # MergedCells may have no value attribute
+                    return cell
+        return None
 
-        raise Exception('No PCM topic found in cells searched')
+    @classmethod
+    def get_pcm_topic(cls, sheet: 'Worksheet') -> str:
+        cell = cls.first_value_cell(sheet, max_row=5)
+        if cell is None:
+            raise Exception('No PCM topic found in cells searched')
+        return cell.value
 
     def get_pcm_list(self) -> dict:
-        pcm_details = dict()
-        pcm_sheets = [item for item in self.workbook.sheetnames if item.strip().startswith('PCM')]
+        return self.read_pcm_tabs(self.workbook)
 
-        for item in pcm_sheets:
-            pcm_date = self._parse_date(item)
-            topic = self.get_pcm_topic(self.workbook[item])
+    @classmethod
+    def pcm_tab_names(cls, workbook) -> list:
+        return [item for item in workbook.sheetnames if item.strip().startswith('PCM')]
+
+    @classmethod
+    def read_pcm_tabs(cls, workbook) -> dict:
+        pcm_details = dict()
+        for item in cls.pcm_tab_names(workbook):
+            pcm_date = cls._parse_date(item)
+            topic = cls.get_pcm_topic(workbook[item])
             pcm_details[pcm_date] = topic
 
         return pcm_details
 
     def get_supp_drills(self) -> dict:
-        supp_drills = dict()
-        supp_drill_sheets = [item for item in self.workbook.sheetnames if 'drill' in item.strip().lower()]
+        return self.read_drill_tabs(self.workbook)
 
-        for item in supp_drill_sheets:
-            drill_date = self._parse_date(item)
-            drill_sheet = self._find_drill_sheet_name(self.workbook[item])
+    @classmethod
+    def drill_tab_names(cls, workbook) -> list:
+        return [item for item in workbook.sheetnames if 'drill' in item.strip().lower()]
+
+    @classmethod
+    def read_drill_tabs(cls, workbook) -> dict:
+        supp_drills = dict()
+        for item in cls.drill_tab_names(workbook):
+            drill_date = cls._parse_date(item)
+            drill_sheet = cls._find_drill_sheet_name(workbook[item])
             supp_drills[drill_date] = drill_sheet
 
         return supp_drills
 
-    def _find_drill_sheet_name(self, sheet: Worksheet) -> str:
-        for row in sheet.iter_rows(max_col=15):
-            for cell in row:
-                try:
-                    if cell.value != None: return cell.value
-                except AttributeError:      #MergedCells have no value attribute
-                    pass
+    @classmethod
+    def _find_drill_sheet_name(cls, sheet: 'Worksheet') -> str:
+        cell = cls.first_value_cell(sheet)
+        return cell.value if cell is not None else None
 
     def get_week_row(self) -> int:
         for row in self.xl_log.iter_rows(max_col=10):
@@ -172,7 +204,8 @@ class SaltLog:
 
         return self.xl_log.cell(row=row_num, column=col_num)
 
-    def _parse_date(self, _string:str) -> date:
+    @staticmethod
+    def _parse_date(_string:str) -> date:
         date_string = re.search(r'\d{1,2}[/-]\d{1,2}[-/]\d{2,4}', _string).group(0)
         try:
             date = datetime.strptime(date_string, '%m-%d-%Y')
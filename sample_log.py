@@ -0,0 +1,141 @@
+from openpyxl import Workbook
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+import random
+
+#########################
+# Typing setup
+#########################
+from typing import List
+from typing import Optional
+
+StrList = List[str]
+
+
+class SampleLog:
+    """Builds synthetic salt log workbooks laid out the way the station templates are.
+
+    The generated workbook has an 'AIR DG SALT LOG' sheet with the operation name, one block of columns per week
+    (category, result, comment), the monthly training drill columns and the PCM topic/date/signature footer,
+    plus one 'PCM <date>' tab per week and a '<date> Drill' tab for each supplemental drill week. It's used by
+    the tests and the benchmark so they don't depend on real station logs.
+
+    Errors can be mixed in with `error_rate`; each employee entry then has that chance of being replaced with
+    one of a handful of known-bad entries.
+    """
+
+    week_salt_types = {
+        'observation': ('Observation', 'Observation 10/10', 'A'),
+        'live salt': ('Live SALT', 'Lithium Battery Mark/Label', 'A'),
+        'supplemental drill': ('Supp Drill', 'Drill sheet 1.23.4', 'A'),
+    }
+
+    bad_entries = {
+        'observation': [('Observation', 'Observation 5/10', 'A'),
+                        ('Observation', 'Observation 10/10', 'U/R'),
+                        ('Observation', 'Observation 12/10', 'A')],
+        'live salt': [('Live SALT', 'Lithium Battery Mark/Label', 'U'),
+                      ('Live SALT', 'Lithium Batt Mark', 'A')],
+        'supplemental drill': [('Supp Drill', 'Drill sheet 1.99.4', 'A'),
+                               ('Supp Drill', 'Drill sheet 1.23.4', 'U/A')],
+    }
+
+    def __init__(self, employees: int = 10, weeks: Optional[StrList] = None, first_week: date = date(2019, 1, 5),
+                 operation_name: str = '2DA Wing C Posi 7 North', error_rate: float = 0.0, seed: int = 0):
+        self.employees = employees
+        self.weeks = weeks if weeks is not None else ['observation'] * 4
+        self.first_week = first_week
+        self.operation_name = operation_name
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+        # Layout
+        self.week_row = 4
+        self.first_employee_row = self.week_row + 2
+        self.first_week_col = 3
+        self.drill_date_col = self.first_week_col + 3 * len(self.weeks)
+        self.drill_result_col = self.drill_date_col + 1
+        self.footer_row = self.first_employee_row + self.employees
+
+    def build(self) -> Workbook:
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = 'AIR DG SALT LOG'
+
+        sheet.cell(row=1, column=1, value='AIR DG SALT LOG')
+        sheet.cell(row=2, column=1, value='Operation:')
+        sheet.cell(row=2, column=2, value=self.operation_name)
+        sheet.cell(row=self.first_employee_row - 1, column=2, value='Employee Name')
+
+        for week_num, salt_type in enumerate(self.weeks):
+            self._build_week(workbook, sheet, week_num, salt_type)
+
+        # Monthly training drill
+        sheet.cell(row=self.week_row, column=self.drill_date_col, value='Monthly Training Drill')
+        sheet.merge_cells(start_row=self.week_row, start_column=self.drill_date_col,
+                          end_row=self.week_row, end_column=self.drill_result_col)
+        sheet.cell(row=self.week_row + 1, column=self.drill_date_col, value='Drill Date')
+        sheet.cell(row=self.week_row + 1, column=self.drill_result_col, value='Drill Result')
+
+        drill_date = datetime.combine(self.first_week - timedelta(days=4), datetime.min.time())
+        for offset in range(self.employees):
+            row = self.first_employee_row + offset
+            sheet.cell(row=row, column=2, value=f'Employee {offset + 1:05d}')
+            if self._inject_error():
+                sheet.cell(row=row, column=self.drill_date_col, value=drill_date + timedelta(days=3))
+                sheet.cell(row=row, column=self.drill_result_col, value='F')
+            else:
+                sheet.cell(row=row, column=self.drill_date_col, value=drill_date)
+                sheet.cell(row=row, column=self.drill_result_col, value='P')
+
+        # The employee slots end at a merged footer row
+        for row in range(self.footer_row, self.footer_row + 3):
+            sheet.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+
+        return workbook
+
+    def _build_week(self, workbook: Workbook, sheet, week_num: int, salt_type: str) -> None:
+        col = self.first_week_col + 3 * week_num
+        ending_date = self.first_week + timedelta(weeks=week_num)
+        date_label = f'{ending_date.month}-{ending_date.day}-{ending_date.year}'
+
+        sheet.cell(row=self.week_row, column=col,
+                   value=f'Week Ending {ending_date.month}/{ending_date.day}/{ending_date.year}')
+        sheet.merge_cells(start_row=self.week_row, start_column=col, end_row=self.week_row, end_column=col + 2)
+        sheet.cell(row=self.week_row + 1, column=col, value='Category')
+        sheet.cell(row=self.week_row + 1, column=col + 1, value='Result')
+        sheet.cell(row=self.week_row + 1, column=col + 2, value=salt_type.title())
+
+        for offset in range(self.employees):
+            if self._inject_error():
+                category, comment, result = self._random.choice(self.bad_entries[salt_type])
+            else:
+                category, comment, result = self.week_salt_types[salt_type]
+            row = self.first_employee_row + offset
+            sheet.cell(row=row, column=col, value=category)
+            sheet.cell(row=row, column=col + 1, value=result)
+            sheet.cell(row=row, column=col + 2, value=comment)
+
+        # Footer
+        topic = f'PCM topic for week {week_num + 1}'
+        pcm_date = datetime.combine(ending_date - timedelta(days=4), datetime.min.time())
+        signature = 'Jane Doe 1234567'
+        if self._inject_error():
+            topic, signature = 'Some other topic', 'Jane Doe 123'
+        sheet.cell(row=self.footer_row, column=col, value='PCM Topic')
+        sheet.cell(row=self.footer_row, column=col + 2, value=topic)
+        sheet.cell(row=self.footer_row + 1, column=col, value='PCM Date')
+        sheet.cell(row=self.footer_row + 1, column=col + 2, value=pcm_date)
+        sheet.cell(row=self.footer_row + 2, column=col, value='Signature')
+        sheet.cell(row=self.footer_row + 2, column=col + 2, value=signature)
+
+        # PCM and supplemental drill tabs
+        pcm_sheet = workbook.create_sheet(f'PCM {date_label}')
+        pcm_sheet.cell(row=1, column=1, value=f'PCM topic for week {week_num + 1}')
+        if salt_type == 'supplemental drill':
+            drill_sheet = workbook.create_sheet(f'{date_label} Drill')
+            drill_sheet.cell(row=1, column=1, value='Drill Sheet 1.23.4')
+
+    def _inject_error(self) -> bool:
+        return self.error_rate > 0 and self._random.random() < self.error_rate
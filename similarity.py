@@ -0,0 +1,110 @@
+import re
+import threading
+from collections import OrderedDict
+
+#########################
+# Typing setup
+#########################
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+# Default for BoundedMemo.get() that no memoized result can be, since None is a valid one
+_MISSING = object()
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of already normalized text, padded so that word starts and ends count."""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice(first: set, second: set) -> float:
+    """Dice similarity of two trigram sets: 1.0 for the same set, 0.0 for nothing in common."""
+    if not first and not second:
+        return 0.0
+    return 2 * len(first & second) / (len(first) + len(second))
+
+
+class BoundedMemo:
+    """Memo of at most `max_size` results, dropping the least recently used first.
+
+    For lookups that are memoized for the life of a long-running process (a batch worker, the web tier), where
+    an unbounded dict would grow with every distinct misspelling ever seen. A memo may be shared by threads (the
+    indexes are class-wide), so each operation holds a lock and a lookup should be one get() with a default.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size: int = max_size
+        self._values: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._values.move_to_end(key)
+            except KeyError:
+                return default
+            return self._values[key]
+
+    def __setitem__(self, key, value) -> None:
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            if len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class SimilarityIndex:
+    """Finds the closest value in a fixed vocabulary (e.g. the valid live SALT types) to some text typed in a log.
+
+    Each vocabulary value is normalized--case folded, with punctuation dropped and runs of spaces collapsed, so
+    that 'ORM-D Mark (US, SJU & Canada Only)' finds 'ORM-D Mark (US, SJU & Canada  Only)'--and its trigrams are
+    worked out once, when the index is built. best() first looks the text up by its normalized form, then falls
+    back to scoring it against every value by trigram (Dice) similarity. The vocabularies are a dozen or so
+    values, so that's a handful of small set intersections; the last `memo_size` results are memoized, so text
+    seen before (the same misspelling down a whole column, or across a batch of logs) costs one dict lookup.
+    """
+
+    min_similarity = 0.5
+    memo_size = 4096
+
+    def __init__(self, values: Iterable[str]):
+        self.values: List[str] = list(values)
+        self.normalized: Dict[str, str] = dict()
+        self._value_trigrams: List[set] = list()
+        for value in self.values:
+            normalized = self.normalize(value)
+            self.normalized.setdefault(normalized, value)
+            self._value_trigrams.append(trigrams(normalized))
+        self._memo = BoundedMemo(self.memo_size)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return ' '.join(re.findall(r'[a-z0-9]+', text.casefold()))
+
+    def best(self, text: str) -> Optional[str]:
+        """The vocabulary value closest to `text`, or None if none is at least `min_similarity` alike."""
+        hit = self._memo.get(text, _MISSING)
+        if hit is not _MISSING:
+            return hit
+
+        normalized = self.normalize(text)
+        match = self.normalized.get(normalized)
+        if match is None and normalized:
+            text_trigrams = trigrams(normalized)
+            best_score = self.min_similarity
+            for value, value_trigrams in zip(self.values, self._value_trigrams):
+                score = dice(text_trigrams, value_trigrams)
+                if score >= best_score and (match is None or score > best_score):
+                    match, best_score = value, score
+        self._memo[text] = match
+        return match
@@ -0,0 +1,68 @@
+import io
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from openpyxl import load_workbook
+from sample_log import SampleLog
+from salt_log import SaltLog
+from log_checker import LogChecker
+from api import SaltLogChecker
+from api import validate
+from parity import error_keys
+
+
+def workbook_bytes(workbook) -> bytes:
+    stream = io.BytesIO()
+    workbook.save(stream)
+    return stream.getvalue()
+
+
+class NonSeekable(io.RawIOBase):
+
+    def __init__(self, data: bytes):
+        self.stream = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self.stream.readinto(buffer)
+
+
+class TestSaltLogChecker(unittest.TestCase):
+
+    def setUp(self):
+        self.data = workbook_bytes(SampleLog(employees=8, weeks=['observation', 'live salt'], error_rate=0.3,
+                                             seed=4).build())
+        self.expected = error_keys(LogChecker(SaltLog(load_workbook(io.BytesIO(self.data)))).run_checks())
+
+    def test_bytes_and_streams(self):
+        checker = SaltLogChecker()
+        self.assertEqual(error_keys(checker.check(self.data).salt_errors), self.expected)
+        self.assertEqual(error_keys(checker.check(io.BytesIO(self.data)).salt_errors), self.expected)
+        self.assertEqual(error_keys(checker.check(NonSeekable(self.data)).salt_errors), self.expected)
+
+    def test_marked_workbook(self):
+        result = validate(self.data, mark=True)
+        self.assertEqual(result.error_count, len(self.expected))
+        marked = load_workbook(io.BytesIO(result.marked_workbook))['AIR DG SALT LOG']
+        coordinate, message = self.expected[0]
+        self.assertIn(message, marked[coordinate].comment.text)
+        self.assertIsNone(validate(self.data).marked_workbook)
+
+    def test_options(self):
+        self.assertEqual(len(SaltLogChecker(max_errors=2).check(self.data).salt_errors), 2)
+        result = SaltLogChecker(disabled_rules=['observation']).check(self.data)
+        self.assertNotIn('observation', result.rule_stats)
+        with self.assertRaises(Exception):
+            SaltLogChecker(disabled_rules=['no_such_rule'])
+
+    def test_thread_pool(self):
+        checker = SaltLogChecker()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda data: checker.check(data, mark=True), [self.data] * 8))
+        for result in results:
+            self.assertEqual(error_keys(result.salt_errors), self.expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import io
+import csv
+import tarfile
+import zipfile
+import unittest
+from openpyxl import load_workbook
+from sample_log import SampleLog
+from salt_log import SaltLog
+from log_checker import LogChecker
+from archive import ArchiveChecker
+
+
+def workbook_bytes(workbook) -> bytes:
+    stream = io.BytesIO()
+    workbook.save(stream)
+    return stream.getvalue()
+
+
+class TestArchiveChecker(unittest.TestCase):
+
+    def setUp(self):
+        self.members = {
+            'station-a/log.xlsx': workbook_bytes(SampleLog(employees=6, error_rate=0.4, seed=1).build()),
+            'station-b/log.xlsx': workbook_bytes(SampleLog(employees=4).build()),
+            'station-c/broken.xlsx': b'not a workbook',
+        }
+        self.expected_errors = len(LogChecker(SaltLog(load_workbook(
+            io.BytesIO(self.members['station-a/log.xlsx'])))).run_checks())
+
+    def zip_archive(self) -> io.BytesIO:
+        stream = io.BytesIO()
+        with zipfile.ZipFile(stream, 'w') as archive:
+            for name, data in self.members.items():
+                archive.writestr(name, data)
+            archive.writestr('notes.txt', 'not a log')
+            archive.writestr('station-a/~$log.xlsx', 'lock file')
+        stream.seek(0)
+        return stream
+
+    def tar_archive(self) -> io.BytesIO:
+        stream = io.BytesIO()
+        with tarfile.open(fileobj=stream, mode='w:gz') as archive:
+            for name, data in self.members.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+        stream.seek(0)
+        return stream
+
+    def check(self, archive_file, workers=1):
+        checker = ArchiveChecker(archive_file, workers=workers)
+        output = io.BytesIO()
+        error_count = checker.run(output)
+        output.seek(0)
+        return checker, error_count, zipfile.ZipFile(output)
+
+    def test_zip(self):
+        checker, error_count, output = self.check(self.zip_archive())
+        self.assertEqual(sorted(output.namelist()), ['errors.csv', 'station-a/log_marked.xlsx',
+                                                     'station-b/log_marked.xlsx'])
+        self.assertEqual(error_count, self.expected_errors)
+        self.assertEqual((checker.workbooks_checked, checker.workbooks_failed), (2, 1))
+
+        rows = list(csv.reader(io.StringIO(output.read('errors.csv').decode())))
+        self.assertEqual(rows[0], ['workbook', 'cell', 'employee', 'message'])
+        self.assertEqual(sum(row[0] == 'station-a/log.xlsx' for row in rows), self.expected_errors)
+        self.assertTrue(rows[-1][0] == 'station-c/broken.xlsx' and
+                        rows[-1][3].startswith('Could not check workbook'))
+
+        marked = load_workbook(io.BytesIO(output.read('station-a/log_marked.xlsx')))
+        comments = [cell.comment for row in marked['AIR DG SALT LOG'].iter_rows() for cell in row if cell.comment]
+        self.assertEqual(len(comments), len({row[1] for row in rows if row[0] == 'station-a/log.xlsx'}))
+
+    def test_tar_with_workers(self):
+        checker, error_count, output = self.check(self.tar_archive(), workers=2)
+        self.assertEqual(error_count, self.expected_errors)
+        self.assertIn('station-b/log_marked.xlsx', output.namelist())
+
+    def test_output_name(self):
+        self.assertEqual(ArchiveChecker.output_name('March.tar.gz'), 'March_marked.zip')
+        self.assertEqual(ArchiveChecker.output_name('March.ZIP'), 'March_marked.zip')
+
+
+if __name__ == '__main__':
+    unittest.main()
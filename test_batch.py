@@ -0,0 +1,80 @@
+import os
+import time
+import tempfile
+import unittest
+from functools import partial
+from sample_log import SampleLog
+from batch import BatchRunner
+from batch import check_workbook
+
+
+def quick_task(path, on_stage):
+    on_stage('check')
+    return len(path)
+
+
+def slow_task(path, on_stage):
+    on_stage('read log')
+    time.sleep(30)
+
+
+def stuck_task(path, on_stage):
+    return (slow_task if path == 'stuck.xlsx' else quick_task)(path, on_stage)
+
+
+def hungry_task(path, on_stage):
+    on_stage('load')
+    hoard = bytearray(400 * 1024 * 1024)
+    time.sleep(30)
+    return len(hoard)
+
+
+def failing_task(path, on_stage):
+    on_stage('read log')
+    raise Exception('Could not find salt category')
+
+
+def crashing_task(path, on_stage):
+    os._exit(3)
+
+
+class TestBatchRunner(unittest.TestCase):
+
+    def test_ok(self):
+        results = BatchRunner(quick_task, timeout=10).run(['a.xlsx', 'bb.xlsx'])
+        self.assertEqual(sorted((result.path, result.status, result.stage, result.errors) for result in results),
+                         [('a.xlsx', 'ok', 'check', 6), ('bb.xlsx', 'ok', 'check', 7)])
+
+    def test_timeout_is_isolated(self):
+        runner = BatchRunner(stuck_task, timeout=0.5, workers=2)
+        start = time.monotonic()
+        results = {result.path: result for result in runner.run(['stuck.xlsx', 'a.xlsx', 'b.xlsx'])}
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertEqual((results['stuck.xlsx'].status, results['stuck.xlsx'].stage), ('timeout', 'read log'))
+        self.assertTrue(results['a.xlsx'].ok and results['b.xlsx'].ok)
+
+    @unittest.skipUnless(os.path.exists('/proc/self/statm'), 'RSS is read from /proc')
+    def test_memory_ceiling(self):
+        result, = BatchRunner(hungry_task, timeout=20, max_rss_mb=200).run(['big.xlsx'])
+        self.assertEqual((result.status, result.stage), ('memory', 'load'))
+        self.assertGreater(result.peak_rss_mb, 200)
+
+    def test_failures(self):
+        result, = BatchRunner(failing_task).run(['bad.xlsx'])
+        self.assertEqual((result.status, result.stage), ('error', 'read log'))
+        self.assertIn('Could not find salt category', result.detail)
+        result, = BatchRunner(crashing_task).run(['bad.xlsx'])
+        self.assertEqual(result.status, 'crashed')
+
+    def test_check_workbook(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'log.xlsx')
+            SampleLog(employees=5, error_rate=0.5, seed=2).build().save(path)
+            result, = BatchRunner(partial(check_workbook, {}), timeout=30).run([path])
+            self.assertEqual((result.status, result.stage), ('ok', 'save'))
+            self.assertGreater(result.errors, 0)
+            self.assertTrue(os.path.exists(os.path.join(directory, 'log_marked.xlsx')))
+
+
+if __name__ == '__main__':
+    unittest.main()
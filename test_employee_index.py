@@ -0,0 +1,36 @@
+import unittest
+from sample_log import SampleLog
+from salt_log import SaltLog
+
+
+class TestEmployeeIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.sample = SampleLog(employees=6, weeks=['observation', 'live salt'], error_rate=0.3, seed=11)
+        workbook = self.sample.build()
+        # A blank slot in the middle of the employee list is skipped
+        workbook['AIR DG SALT LOG'].cell(row=self.sample.first_employee_row + 2, column=2).value = None
+        self.log = SaltLog(workbook)
+
+    def test_rows(self):
+        index = self.log.employee_index
+        self.assertEqual(len(index), 5)
+        self.assertEqual([employee.ordinal for employee in self.log.employee_list], list(range(5)))
+        self.assertEqual(index.rows[2], self.sample.first_employee_row + 3)
+        self.assertIs(index.by_row[index.rows[2]], self.log.employee_list[2])
+
+    def test_entries_match_sheet(self):
+        for week in self.log.weeks:
+            for employee in self.log.employee_list:
+                self.assertEqual(week.get_entry(employee), week.get_entry(employee.row))
+                self.assertEqual(week.get_entry(employee, values=True), week.get_entry(employee.row, values=True))
+
+    def test_drill_cells(self):
+        date_cell, result_cell = self.log.employee_index.drill_cells[1]
+        self.assertEqual((date_cell.row, date_cell.column), (self.sample.first_employee_row + 1,
+                                                              self.sample.drill_date_col))
+        self.assertEqual(result_cell.column, self.sample.drill_result_col)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import argparse
+import csv
+import io
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import unittest
+from sample_log import SampleLog
+from salt_log import SaltLog
+from log_checker import LogChecker
+from value_grid import GridWorkbook
+from grid_cache import GridCache
+from main import main
+from parity import error_keys
+
+
+class TestGridCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.workbook = SampleLog(employees=15, weeks=['observation', 'live salt', 'supplemental drill'],
+                                  error_rate=0.3, seed=11).build()
+        self.workbook_path = os.path.join(self.directory.name, 'log.xlsx')
+        self.workbook.save(self.workbook_path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_encode_xlsx_matches_encode(self):
+        grid = GridWorkbook(GridWorkbook.encode_xlsx(self.workbook_path))
+        self.assertEqual(grid.sheetnames, GridWorkbook(GridWorkbook.encode(self.workbook)).sheetnames)
+        self.assertEqual(error_keys(LogChecker(SaltLog(grid)).run_checks(), employee=True),
+                         error_keys(LogChecker(SaltLog(self.workbook)).run_checks(), employee=True))
+
+    def test_hits_and_misses(self):
+        cache = GridCache(os.path.join(self.directory.name, 'cache'))
+        expected = error_keys(LogChecker(SaltLog(self.workbook)).run_checks(), employee=True)
+        for source in (self.workbook_path, self.workbook_path, pathlib.Path(self.workbook_path).read_bytes()):
+            grid = cache.load(source)
+            self.assertEqual(error_keys(LogChecker(SaltLog(grid)).run_checks(), employee=True), expected)
+            grid.close()
+        self.assertEqual((cache.misses, cache.hits), (1, 2))
+
+        # An edited log is a different entry
+        self.workbook['AIR DG SALT LOG'].cell(row=2, column=2, value='Some other operation')
+        edited = io.BytesIO()
+        self.workbook.save(edited)
+        cache.load(edited).close()
+        self.assertEqual(cache.misses, 2)
+
+    def test_main_reads_from_cache(self):
+        cache_dir = os.path.join(self.directory.name, 'cache')
+        args = argparse.Namespace(input_file=self.workbook_path, cache=cache_dir)
+        error_count = main(args)
+        with open(os.path.join(self.directory.name, 'log_errors.csv'), newline='') as report_file:
+            self.assertEqual(len(list(csv.reader(report_file))), error_count + 1)
+        self.assertEqual(error_count, len(LogChecker(SaltLog(self.workbook)).run_checks()))
+
+        # A cache hit never loads openpyxl
+        script = ('import argparse, sys\nfrom main import main\n'
+                  f'main(argparse.Namespace(input_file={self.workbook_path!r}, cache={cache_dir!r}))\n'
+                  'print("openpyxl" in sys.modules)')
+        result = subprocess.run([sys.executable, '-c', script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.split(), [str(error_count), 'False'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+from batch import WorkbookResult
+from job_queue import JobQueue
+from job_queue import QueueWorker
+from job_queue import run_workers
+from sample_log import SampleLog
+
+
+def quick_task(path, on_stage):
+    on_stage('check')
+    time.sleep(0.05)
+    return len(os.path.basename(path))
+
+
+def stalled_task(path, on_stage):
+    on_stage('read log')
+    time.sleep(5)
+
+
+def stall_worker(queue_path):
+    with JobQueue(queue_path, lease_seconds=0.5) as queue:
+        QueueWorker(queue, stalled_task, worker='stalled').run()
+
+
+def backfill_task(path, on_stage):
+    on_stage('check')
+    time.sleep(0.05 if 'upload' in path else 0.4)
+    return 0
+
+
+def polling_worker(queue_path):
+    with JobQueue(queue_path) as queue:
+        worker = QueueWorker(queue, backfill_task)
+        worker.poll_interval = 0.05
+        worker.run()
+
+
+class TestJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.queue_path = os.path.join(self.directory.name, 'queue.db')
+        self.paths = [os.path.join(self.directory.name, f'log{number:02}.xlsx') for number in range(12)]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_claims(self):
+        with JobQueue(self.queue_path) as queue:
+            self.assertEqual(queue.add(self.paths[:2]), 2)
+            self.assertEqual(queue.add(self.paths[:3]), 1)
+            first, second, third = (queue.claim(worker) for worker in ('a', 'b', 'a'))
+            self.assertEqual((first.path, second.path, third.path), ('log00.xlsx', 'log01.xlsx', 'log02.xlsx'))
+            self.assertIsNone(queue.claim('b'))
+            self.assertEqual(queue.local_path(first.path), self.paths[0])
+
+            self.assertTrue(queue.heartbeat(first))
+            self.assertTrue(queue.complete(first, WorkbookResult(first.path, 'ok', 'save', 4, 1.5, 80.0)))
+            self.assertFalse(queue.heartbeat(first))
+            self.assertTrue(queue.release(second))
+            self.assertEqual(queue.counts(), {'pending': 1, 'running': 1, 'finished': 1})
+            result, = queue.results()
+            self.assertEqual((result.path, result.status, result.errors, result.seconds), ('log00.xlsx', 'ok', 4, 1.5))
+
+    def test_expired_lease_is_retried(self):
+        with JobQueue(self.queue_path, lease_seconds=0.1, max_attempts=2) as queue:
+            queue.add(self.paths[:1])
+            lost = queue.claim('a')
+            time.sleep(0.2)
+            retry = queue.claim('b')
+            self.assertEqual((retry.id, retry.attempt), (lost.id, 2))
+            # The first worker's late result is turned away
+            self.assertFalse(queue.complete(lost, WorkbookResult(lost.path, 'ok', 'save', 0, 1.0, None)))
+
+            time.sleep(0.2)
+            self.assertIsNone(queue.claim('c'))
+            result, = queue.results()
+            self.assertEqual(result.status, 'abandoned')
+
+    def test_workers_share_queue(self):
+        with JobQueue(self.queue_path) as queue:
+            queue.add(self.paths)
+        run_workers(self.queue_path, quick_task, workers=3, timeout=30)
+
+        with JobQueue(self.queue_path) as queue:
+            self.assertEqual(queue.counts()['finished'], len(self.paths))
+            results = queue.results()
+            timings = queue.timings()
+        self.assertEqual(sorted((result.path, result.status, result.errors) for result in results),
+                         [(os.path.basename(path), 'ok', 10) for path in self.paths])
+        self.assertGreater(len({worker for path, priority, worker, attempts, waited, seconds in timings}), 1)
+        self.assertEqual({attempts for path, priority, worker, attempts, waited, seconds in timings}, {1})
+
+    def test_dead_worker_job_is_picked_up(self):
+        with JobQueue(self.queue_path) as queue:
+            queue.add(self.paths[:1])
+        stalled = multiprocessing.Process(target=stall_worker, args=(self.queue_path,))
+        stalled.start()
+        with JobQueue(self.queue_path, lease_seconds=0.5) as queue:
+            while queue.counts()['running'] == 0:
+                time.sleep(0.05)
+            stalled.kill()
+            stalled.join()
+
+            worker = QueueWorker(queue, quick_task, worker='rescuer')
+            worker.poll_interval = 0.1
+            self.assertEqual(worker.run(), 1)
+            (path, priority, worker_name, attempts, waited, seconds), = queue.timings()
+        self.assertEqual((worker_name, attempts), ('rescuer', 2))
+
+
+class TestPriorityScheduling(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.queue_path = os.path.join(self.directory.name, 'queue.db')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def sample(self, name, employees, weeks=4):
+        path = self.path(name)
+        SampleLog(employees=employees, weeks=['observation'] * weeks).build().save(path)
+        return path
+
+    def test_size_aware_order(self):
+        with JobQueue(self.queue_path) as queue:
+            queue.add([self.sample('bulk5.xlsx', 5), self.sample('bulk50.xlsx', 50), self.sample('bulk20.xlsx', 20),
+                       self.path('unreadable.xlsx')])
+            queue.add([self.sample('upload30.xlsx', 30), self.sample('upload5.xlsx', 5, weeks=5)],
+                      priority='interactive')
+            order = [queue.claim('a').path for number in range(6)]
+        self.assertEqual(order, ['upload5.xlsx', 'upload30.xlsx', 'bulk50.xlsx', 'bulk20.xlsx', 'bulk5.xlsx',
+                                 'unreadable.xlsx'])
+
+    def test_class_limits(self):
+        with JobQueue(self.queue_path) as queue:
+            queue.add([self.path('bulk1.xlsx'), self.path('bulk2.xlsx')])
+            queue.set_limit('bulk', 1)
+            self.assertEqual(queue.limits(), {'bulk': 1})
+            bulk = queue.claim('a')
+            self.assertIsNone(queue.claim('b'))
+            queue.add([self.path('upload.xlsx')], priority='interactive')
+            self.assertEqual(queue.claim('b').path, 'upload.xlsx')
+
+            queue.complete(bulk, WorkbookResult(bulk.path, 'ok', 'save', 0, 1.0, None))
+            self.assertEqual(queue.claim('a').path, 'bulk2.xlsx')
+            with self.assertRaises(Exception):
+                queue.set_limit('urgent', 1)
+
+    def test_upload_of_queued_bulk_job(self):
+        with JobQueue(self.queue_path) as queue:
+            queue.add([self.path('bulk1.xlsx'), self.sample('queued.xlsx', 50)])
+            queue.add([self.path('bulk2.xlsx')])
+            self.assertEqual(queue.claim('a').path, 'queued.xlsx')
+            queue.add([self.path('bulk3.xlsx')])
+
+            # Uploaded while it's waiting: moved up to interactive, ahead of the rest of the backfill
+            self.assertEqual(queue.add([self.path('bulk2.xlsx')], priority='interactive'), 1)
+            job = queue.claim('a')
+            self.assertEqual((job.path, job.priority), ('bulk2.xlsx', 'interactive'))
+            # A job that's already running, or already interactive, isn't changed
+            self.assertEqual(queue.add([self.path('queued.xlsx'), self.path('bulk2.xlsx')], priority='interactive'), 0)
+            self.assertEqual(queue.add([self.path('bulk3.xlsx')]), 0)
+            self.assertEqual(queue.claim('a').priority, 'bulk')
+
+    def test_upload_during_backfill(self):
+        with JobQueue(self.queue_path) as queue:
+            queue.add([self.path(f'backfill{number:02}.xlsx') for number in range(12)])
+            queue.set_limit('bulk', 1)
+        workers = [multiprocessing.Process(target=polling_worker, args=(self.queue_path,)) for number in range(2)]
+        for worker in workers:
+            worker.start()
+        try:
+            with JobQueue(self.queue_path) as queue:
+                while queue.counts('bulk')['finished'] < 2:
+                    time.sleep(0.05)
+                queue.add([self.path('upload.xlsx')], priority='interactive')
+                while queue.counts('interactive')['finished'] == 0:
+                    time.sleep(0.05)
+                waits = {path: waited for path, priority, worker, attempts, waited, seconds in queue.timings()}
+                self.assertGreater(queue.counts('bulk')['pending'], 0)
+        finally:
+            for worker in workers:
+                worker.kill()
+                worker.join()
+        # The spare worker starts the upload within a poll or two, despite the backfill still queued
+        self.assertLess(waits['upload.xlsx'], 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
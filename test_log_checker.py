@@ -0,0 +1,92 @@
+import io
+import unittest
+from sample_log import SampleLog
+from salt_log import SaltLog
+from validator import Validator
+from MonthValidator import MonthValidator
+from log_checker import LogChecker
+from ErrorReport import ErrorReport
+from rules import RuleSelection
+
+
+class TestLogChecker(unittest.TestCase):
+
+    def setUp(self):
+        self.log = SaltLog(SampleLog(employees=12, error_rate=0.3, seed=3).build())
+
+    def _reference_errors(self):
+        salt_errors = list()
+        for week in self.log.weeks:
+            salt_errors.extend(Validator(week).run_checks(self.log.employee_list))
+        salt_errors.extend(MonthValidator(self.log).run_checks())
+        return [(error.cell.coordinate, error.message) for error in salt_errors]
+
+    def test_stream_matches_lists(self):
+        streamed = [(error.cell.coordinate, error.message) for error in LogChecker(self.log).iter_checks()]
+        self.assertEqual(streamed, self._reference_errors())
+
+    def test_max_errors(self):
+        self.assertEqual(len(LogChecker(self.log, max_errors=5).run_checks()), 5)
+
+    def test_fail_fast(self):
+        salt_errors = LogChecker(self.log, fail_fast=True).run_checks()
+        self.assertEqual(len(salt_errors), 1)
+        self.assertEqual(salt_errors[0].message, self._reference_errors()[0][1])
+
+    def test_report_tap(self):
+        stream = io.StringIO()
+        report = ErrorReport(stream)
+        passed_on = list(report.tap(LogChecker(self.log, max_errors=3).iter_checks()))
+        self.assertEqual(len(passed_on), 3)
+        self.assertEqual(len(stream.getvalue().strip().splitlines()), 4)
+
+
+
+class TestRuleSelection(unittest.TestCase):
+
+    def setUp(self):
+        self.sample = SampleLog(employees=5, weeks=['observation', 'live salt', 'supplemental drill', 'observation'])
+        self.workbook = self.sample.build()
+        self.log = SaltLog(self.workbook)
+
+    def test_clean_log_with_every_week_type(self):
+        self.assertEqual(LogChecker(self.log).run_checks(), [])
+
+    def test_signature_checked_once(self):
+        self.workbook['AIR DG SALT LOG'].cell(row=self.sample.footer_row + 2, column=5, value='bad')
+        salt_errors = LogChecker(SaltLog(self.workbook)).run_checks()
+        self.assertEqual([error.message for error in salt_errors], ['Invalid signature format'])
+
+    def test_no_result_category_with_blank_comment(self):
+        sheet = self.workbook['AIR DG SALT LOG']
+        row, col = self.sample.first_employee_row, self.sample.first_week_col
+        sheet.cell(row=row, column=col).value = 'vacation'
+        sheet.cell(row=row, column=col + 1).value = None
+        sheet.cell(row=row, column=col + 2).value = None
+        salt_errors = LogChecker(SaltLog(self.workbook)).run_checks()
+        week_errors = [(error.cell.column, error.message) for error in salt_errors if error.cell.column <= col + 2]
+        self.assertEqual(week_errors, [(col + 2, 'Comment cannot be blank')])
+
+    def test_rule_stats(self):
+        checker = LogChecker(self.log, disabled_rules=['blank_comment'])
+        checker.run_checks()
+        stats = checker.rule_stats
+        self.assertNotIn('blank_comment', stats)
+        self.assertEqual(stats['blank_category'].rows, 4 * 5)
+        self.assertEqual(stats['observation'].rows, 2 * 5)
+        self.assertEqual(stats['live_salt'].rows, 5)
+        self.assertEqual(stats['signature'].rows, 4)
+        self.assertEqual(stats['training_drill'].rows, 5)
+
+    def test_station_selection(self):
+        selection = RuleSelection(stations={'posi 7': ['training_drill'], 'Wing B': ['operation_name']})
+        checker = LogChecker(self.log, rule_selection=selection)
+        self.assertEqual(checker.disabled_rules, {'training_drill'})
+
+    def test_unknown_rule(self):
+        with self.assertRaises(Exception):
+            LogChecker(self.log, disabled_rules=['no_such_rule'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from parity import Engine
+from parity import ENGINES
+from parity import ParityHarness
+from parity import ReferenceEngine
+from parity import generated_corpus
+
+
+class DroppingEngine(Engine):
+    """Stands in for a broken optimization: misses the first error and reports one that isn't there."""
+
+    name = 'dropping'
+
+    def run(self, workbook_data):
+        keys = ReferenceEngine().run(workbook_data)
+        return keys[1:] + [('A1', 'Not an error')]
+
+
+class TestParityHarness(unittest.TestCase):
+
+    def setUp(self):
+        self.corpus = list(generated_corpus([12, 30]))
+
+    def test_engines_match_reference(self):
+        results = ParityHarness().run(self.corpus)
+        self.assertEqual(len(results), len(self.corpus) * len(ENGINES))
+        for result in results:
+            self.assertTrue(result.matches, f'{result.engine} on {result.workbook}: -{result.missing} +{result.extra}')
+            self.assertGreater(result.error_count, 0)
+            self.assertGreater(result.speedup, 0)
+
+    def test_reports_differences(self):
+        first_error = ReferenceEngine().run(self.corpus[0][1])[0]
+        result = ParityHarness([DroppingEngine()]).run(self.corpus[:1])[0]
+        self.assertFalse(result.matches)
+        self.assertEqual(result.missing, [first_error])
+        self.assertEqual(result.extra, [('A1', 'Not an error')])
+
+    def test_engine_must_run(self):
+        class NoRunEngine(Engine):
+            name = 'no run'
+
+        with self.assertRaises(TypeError):
+            NoRunEngine()
+
+    def test_diff_counts_duplicates(self):
+        missing, extra = ParityHarness.diff([('B2', 'x'), ('B2', 'x'), ('C3', 'y')], [('C3', 'y'), ('B2', 'x')])
+        self.assertEqual(missing, [('B2', 'x')])
+        self.assertEqual(extra, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
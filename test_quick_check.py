@@ -0,0 +1,84 @@
+import io
+import unittest
+import zipfile
+from openpyxl import Workbook
+from openpyxl import load_workbook
+from sample_log import SampleLog
+from quick_check import QuickCheck
+from xlsx_values import XlsxValueReader
+
+
+def as_file(workbook) -> io.BytesIO:
+    stream = io.BytesIO()
+    workbook.save(stream)
+    stream.seek(0)
+    return stream
+
+
+class TestQuickCheck(unittest.TestCase):
+
+    def setUp(self):
+        self.sample = SampleLog(employees=8)
+        self.workbook = self.sample.build()
+        self.sheet = self.workbook['AIR DG SALT LOG']
+
+    def messages(self):
+        checker = QuickCheck(as_file(self.workbook))
+        return [(error.cell.coordinate if error.cell else None, error.message) for error in checker.run_checks()]
+
+    def test_clean_log_passes(self):
+        checker = QuickCheck(as_file(self.workbook))
+        checker.run_checks()
+        self.assertTrue(checker.passed)
+
+    def test_operation_name(self):
+        self.sheet['B2'] = '2DA Wing B'
+        self.assertEqual(self.messages(), [('B2', 'Building must be Wing C'),
+                                           ('B2', 'Must include posi, e.g. "Posi 7 North" or "Posi 6S"')])
+
+    def test_signature_and_topic(self):
+        self.sheet.cell(row=self.sample.footer_row, column=5, value='Wrong topic')
+        self.sheet.cell(row=self.sample.footer_row + 2, column=8, value='Jane Doe 12345')
+        self.assertEqual(self.messages(), [(f'E{self.sample.footer_row}', 'PCM topic doesn\'t match PCM tab'),
+                                           (f'H{self.sample.footer_row + 2}', 'Invalid signature format')])
+
+    def test_missing_pcm_tab(self):
+        del self.workbook['PCM 1-12-2019']
+        self.assertEqual(self.messages(), [(f'H{self.sample.footer_row}',
+                                            'Could not find PCM tab for week--must check manually')])
+
+    def test_unreadable_week_heading(self):
+        self.sheet['C4'] = 'Week Ending 13/45/2019'
+        self.assertEqual(self.messages(), [('C4', 'Could not read week ending date from heading')])
+
+
+
+class TestXlsxValueReader(unittest.TestCase):
+
+    def test_whitespace_between_tags(self):
+        workbook = Workbook()
+        workbook.active['A1'], workbook.active['B1'] = 'hello', 5
+        saved = as_file(workbook)
+
+        # Pretty-printed sheet XML: the whitespace after </t> and </v> isn't part of the values
+        rewritten = io.BytesIO()
+        with zipfile.ZipFile(saved) as source, zipfile.ZipFile(rewritten, 'w') as target:
+            for item in source.infolist():
+                data = source.read(item)
+                if item.filename == 'xl/worksheets/sheet1.xml':
+                    data = data.replace(b'</t></is>', b'</t>\n  </is>').replace(b'</v></c>', b'</v>\n  </c>')
+                    self.assertIn(b'</t>\n  </is>', data)
+                target.writestr(item, data)
+
+        rewritten.seek(0)
+        expected = [cell.value for cell in load_workbook(rewritten).active[1]]
+        reader = XlsxValueReader(rewritten)
+        try:
+            rows = list(reader.iter_rows(reader.sheetnames[0]))
+        finally:
+            reader.close()
+        self.assertEqual(expected, ['hello', 5])
+        self.assertEqual(rows, [(1, {1: 'hello', 2: 5})])
+
+if __name__ == '__main__':
+    unittest.main()
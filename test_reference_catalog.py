@@ -0,0 +1,91 @@
+import io
+import os
+import tempfile
+import unittest
+from datetime import date
+from datetime import datetime
+from openpyxl import load_workbook
+from sample_log import SampleLog
+from salt_log import SaltLog
+from log_checker import LogChecker
+from windowed_log import WindowedChecker
+from reference_catalog import ReferenceCatalog
+from parity import error_keys
+
+
+class TestReferenceCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.workbook = SampleLog(employees=12, weeks=['observation', 'live salt', 'supplemental drill'],
+                                  error_rate=0.3, seed=5).build()
+        self.catalog = ReferenceCatalog.from_workbook(self.workbook)
+
+    def saved(self, workbook) -> bytes:
+        workbook_file = io.BytesIO()
+        workbook.save(workbook_file)
+        return workbook_file.getvalue()
+
+    def test_build_and_load(self):
+        self.assertEqual(len(self.catalog.pcm_topics), 3)
+        self.assertEqual(len(self.catalog.drill_sheets), 1)
+
+        from_xlsx = ReferenceCatalog.from_xlsx(io.BytesIO(self.saved(self.workbook)))
+        self.assertEqual(from_xlsx.pcm_topics, self.catalog.pcm_topics)
+        self.assertEqual(from_xlsx.drill_sheets, self.catalog.drill_sheets)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'catalog.json')
+            self.catalog.save(path)
+            loaded = ReferenceCatalog.load(path)
+        self.assertEqual(loaded.pcm_topics, self.catalog.pcm_topics)
+        self.assertEqual(loaded.drill_sheets, self.catalog.drill_sheets)
+
+    def test_save_dates(self):
+        catalog = ReferenceCatalog(self.catalog.pcm_topics, {date(2019, 1, 19): datetime(2019, 1, 14)})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'catalog.json')
+            catalog.save(path)
+            self.assertEqual(ReferenceCatalog.load(path).drill_sheets, catalog.drill_sheets)
+
+    def test_matching_tabs_change_nothing(self):
+        expected = sorted(error_keys(LogChecker(SaltLog(self.workbook)).run_checks(), sheet=True))
+        checker = LogChecker(SaltLog(self.workbook, catalog=self.catalog))
+        self.assertEqual(sorted(error_keys(checker.run_checks(), sheet=True)), expected)
+        self.assertEqual(checker.rule_stats['catalog_tabs'].errors, 0)
+
+    def test_weeks_use_catalog_not_tabs(self):
+        pcm_tab = SaltLog.pcm_tab_names(self.workbook)[0]
+        self.workbook[pcm_tab]['A1'].value = 'Out of date topic'
+        catalog_topics = set(self.catalog.pcm_topics.values())
+
+        log = SaltLog(self.workbook, catalog=self.catalog)
+        self.assertTrue(all(week._correct_PCM_topic in catalog_topics for week in log.weeks))
+
+        salt_errors = LogChecker(log).run_checks()
+        tab_errors = [error for error in salt_errors if error.cell.parent.title == pcm_tab]
+        self.assertEqual(len(tab_errors), 1)
+        self.assertIn('doesn\'t match the reference catalog', tab_errors[0].message)
+        self.assertEqual(tab_errors[0].suggestions, [self.catalog.pcm_topics[SaltLog._parse_date(pcm_tab)]])
+
+        disabled = LogChecker(SaltLog(self.workbook, catalog=self.catalog), disabled_rules=['catalog_tabs'])
+        self.assertFalse([error for error in disabled.run_checks() if error.cell.parent.title == pcm_tab])
+
+    def test_tab_not_in_catalog(self):
+        drill_tab = SaltLog.drill_tab_names(self.workbook)[0]
+        catalog = ReferenceCatalog(self.catalog.pcm_topics, {date(2019, 2, 2): 'Drill Sheet 2.0'})
+        salt_errors = LogChecker(SaltLog(self.workbook, catalog=catalog)).run_checks()
+        self.assertIn(f'Drill tab "{drill_tab}" is not in the reference catalog--check the tab\'s date',
+                      [error.message for error in salt_errors if error.cell.parent.title == drill_tab])
+
+    def test_windowed_matches(self):
+        pcm_tab = SaltLog.pcm_tab_names(self.workbook)[-1]
+        self.workbook[pcm_tab]['A1'].value = 'Out of date topic'
+        workbook_data = self.saved(self.workbook)
+
+        expected = LogChecker(SaltLog(load_workbook(io.BytesIO(workbook_data)), catalog=self.catalog)).run_checks()
+        windowed = WindowedChecker(io.BytesIO(workbook_data), window_size=5, catalog=self.catalog).run_checks()
+        self.assertEqual(sorted(error_keys(windowed, sheet=True)), sorted(error_keys(expected, sheet=True)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import csv
+import sqlite3
+import tempfile
+import unittest
+from sample_log import SampleLog
+from salt_log import SaltLog
+from log_checker import LogChecker
+from roster import Roster
+from roster import RosterEntry
+
+
+class TestRoster(unittest.TestCase):
+
+    def setUp(self):
+        self.roster = Roster([RosterEntry('100', 'Jane Doe', 'Posi 7'), RosterEntry('101', 'John Smith', 'Posi 7'),
+                              RosterEntry('102', 'John Smith', 'Posi 6'), RosterEntry('103', 'José Álvarez')])
+
+    def test_resolve(self):
+        self.assertEqual((self.roster.resolve('Jane Doe').status, self.roster.resolve('Jane Doe').entry.id),
+                         ('exact', '100'))
+        self.assertEqual(self.roster.resolve('DOE,  jane').entry.id, '100')
+        self.assertEqual(self.roster.resolve('Jose Alvarez').status, 'normalized')
+        self.assertEqual(self.roster.resolve('John Smith').status, 'ambiguous')
+        self.assertEqual(self.roster.resolve('John Smith', station='Posi 6').entry.id, '102')
+
+        match = self.roster.resolve('Jane Dow')
+        self.assertEqual(match.status, 'unknown')
+        self.assertEqual(match.candidates[0].id, '100')
+        self.assertEqual(self.roster.resolve('Zzyzx Qwerty').candidates, [])
+
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, 'roster.csv')
+            with open(csv_path, 'w', newline='') as roster_file:
+                writer = csv.writer(roster_file)
+                writer.writerow(['ID', 'Name', 'Station'])
+                writer.writerows([['1', 'Jane Doe', 'Posi 7'], ['2', '', 'Posi 7'], ['3', 'John Smith', '']])
+            roster = Roster.load(csv_path)
+            self.assertEqual([(entry.id, entry.station) for entry in roster.entries], [('1', 'Posi 7'), ('3', None)])
+
+            db_path = os.path.join(directory, 'hr.db')
+            connection = sqlite3.connect(db_path)
+            connection.execute('CREATE TABLE roster (id INTEGER, name TEXT)')
+            connection.executemany('INSERT INTO roster VALUES (?, ?)', [(1, 'Jane Doe'), (2, None)])
+            connection.commit()
+            connection.close()
+            roster = Roster.load(db_path)
+            self.assertEqual(roster.resolve('jane doe').entry.id, '1')
+            self.assertEqual(len(roster), 1)
+
+    def test_load_bad_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, 'roster.csv')
+            with open(csv_path, 'w', newline='') as roster_file:
+                roster_file.write('id,name,station\n1,Jane Doe\n\n2\n')
+            # A short row has no station (or no name, and is skipped)
+            self.assertEqual([(entry.id, entry.name, entry.station) for entry in Roster.load(csv_path).entries],
+                             [('1', 'Jane Doe', None)])
+
+            with open(csv_path, 'a', newline='') as roster_file:
+                roster_file.write(' ,John Smith,Posi 7\n')
+            with self.assertRaisesRegex(Exception, 'John Smith" at line 5 .* has no id'):
+                Roster.load(csv_path)
+
+            db_path = os.path.join(directory, 'hr.db')
+            connection = sqlite3.connect(db_path)
+            connection.execute('CREATE TABLE roster (id INTEGER, name, station INTEGER)')
+            connection.executemany('INSERT INTO roster VALUES (?, ?, ?)', [(1, 1234, 7), (2, '  ', None)])
+            connection.commit()
+            connection.close()
+            self.assertEqual([(entry.id, entry.name, entry.station) for entry in Roster.load(db_path).entries],
+                             [('1', '1234', '7')])
+
+    def test_memo_is_bounded(self):
+        class SmallRoster(Roster):
+            memo_size = 2
+
+        roster = SmallRoster(self.roster.entries)
+        for name in ('Jane Doe', 'Jane Dow', 'John Smith', 'Jane Doe'):
+            roster.resolve(name)
+        self.assertEqual(len(roster._memo), 2)
+        self.assertEqual(roster.resolve('Jane Dow').candidates[0].id, '100')
+
+    def test_log_checker(self):
+        sample = SampleLog(employees=5)
+        workbook = sample.build()
+        workbook['AIR DG SALT LOG'].cell(row=sample.first_employee_row + 1, column=2).value = 'Emplyee 00002'
+        log = SaltLog(workbook)
+        roster = Roster(RosterEntry(str(number), f'Employee {number:05}') for number in range(1, 5))
+
+        salt_errors = LogChecker(log, roster=roster).run_checks()
+        self.assertEqual([(error.cell.coordinate, error.employee.name) for error in salt_errors],
+                         [(f'B{sample.first_employee_row + 1}', 'Emplyee 00002'),
+                          (f'B{sample.first_employee_row + 4}', 'Employee 00005')])
+        self.assertEqual(salt_errors[0].suggestions[0], 'Employee 00002')
+        self.assertEqual(log.employee_list[0].roster_id, '1')
+        self.assertEqual(LogChecker(log, roster=roster, disabled_rules=['roster']).run_checks(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from similarity import BoundedMemo
+from similarity import SimilarityIndex
+from similarity import dice
+from similarity import trigrams
+from sample_log import SampleLog
+from salt_log import SaltLog
+from validator import Validator
+from parallel_checker import ParallelChecker
+
+
+class TestSimilarityIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SimilarityIndex(['ORM-D Mark (US, SJU & Canada  Only)', 'Lithium Battery Mark/Label',
+                                      'Cargo Aircraft Only Label'])
+
+    def test_normalized_match(self):
+        self.assertEqual(self.index.best('ORM-D Mark (US, SJU & Canada Only)'), 'ORM-D Mark (US, SJU & Canada  Only)')
+        self.assertEqual(self.index.best('lithium battery mark / label'), 'Lithium Battery Mark/Label')
+
+    def test_closest(self):
+        self.assertEqual(self.index.best('Lithium Batt Mark'), 'Lithium Battery Mark/Label')
+        self.assertEqual(self.index.best('Cargo aircraft only'), 'Cargo Aircraft Only Label')
+        self.assertIsNone(self.index.best('Watched them work'))
+        self.assertIsNone(self.index.best(''))
+
+    def test_memo_is_bounded(self):
+        class SmallIndex(SimilarityIndex):
+            memo_size = 2
+
+        index = SmallIndex(['Lithium Battery Mark/Label'])
+        for text in ('Lithium Batt Mark', 'lithium battery', 'Watched them work', 'Lithium Batt Mark'):
+            self.assertEqual(index.best(text), None if text == 'Watched them work' else 'Lithium Battery Mark/Label')
+        self.assertEqual(len(index._memo), 2)
+
+    def test_entry_evicted_by_another_thread(self):
+        class EvictedMemo(BoundedMemo):
+            # The entry is there when checked for, but gone by the time it's read
+            def __contains__(self, key):
+                return True
+
+        self.index._memo = EvictedMemo()
+        self.assertEqual(self.index.best('Lithium Batt Mark'), 'Lithium Battery Mark/Label')
+
+    def test_helpers(self):
+        self.assertEqual(dice(trigrams('jane doe'), trigrams('jane doe')), 1.0)
+        self.assertEqual(dice(set(), set()), 0.0)
+        memo = BoundedMemo(2)
+        memo['a'], memo['b'] = 1, 2
+        memo.get('a')
+        memo['c'] = 3
+        self.assertEqual((memo.get('a'), memo.get('b'), memo.get('c')), (1, None, 3))
+
+
+class TestValidatorSuggestions(unittest.TestCase):
+
+    def setUp(self):
+        self.sample = SampleLog(employees=3, weeks=['live salt', 'observation'])
+        self.workbook = self.sample.build()
+        sheet = self.workbook['AIR DG SALT LOG']
+        row, col = self.sample.first_employee_row, self.sample.first_week_col
+        sheet.cell(row=row, column=col + 2, value='ORM-D Mark (US, SJU & Canada Only)')
+        sheet.cell(row=row + 1, column=col + 2, value='Something else entirely')
+        # Not-present categories are checked in any week
+        sheet.cell(row=row + 2, column=col + 3, value='vacation')
+        sheet.cell(row=row + 2, column=col + 4).value = None
+        sheet.cell(row=row + 2, column=col + 5, value='vacaton week')
+
+    def test_suggestions(self):
+        log = SaltLog(self.workbook)
+        salt_errors = [error for week in log.weeks for error in Validator(week).run_checks(log.employee_list)]
+        self.assertEqual([(error.message, error.suggestions) for error in salt_errors], [
+            ('ORM-D Mark (US, SJU & Canada Only) is not a valid SALT type. '
+             'Did you mean \'ORM-D Mark (US, SJU & Canada  Only)\'?', ['ORM-D Mark (US, SJU & Canada  Only)']),
+            ('Something else entirely is not a valid SALT type', []),
+            ('vacaton week is not a valid comment for vacation. Did you mean \'vacation week\'?', ['vacation week']),
+        ])
+
+    def test_parallel_keeps_suggestions(self):
+        salt_errors = ParallelChecker(SaltLog(self.workbook), processes=2).run_checks()
+        self.assertEqual([error.suggestions for error in salt_errors],
+                         [['ORM-D Mark (US, SJU & Canada  Only)'], [], ['vacation week']])
+
+
+if __name__ == '__main__':
+    unittest.main()
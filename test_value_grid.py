@@ -0,0 +1,59 @@
+import unittest
+from datetime import date
+from datetime import datetime
+from sample_log import SampleLog
+from salt_log import SaltLog
+from log_checker import LogChecker
+from parallel_checker import ParallelChecker
+from value_grid import GridWorkbook
+from parity import error_keys
+
+
+class TestValueGrid(unittest.TestCase):
+
+    def setUp(self):
+        self.workbook = SampleLog(employees=10, weeks=['observation', 'live salt', 'supplemental drill'],
+                                  error_rate=0.2, seed=7).build()
+
+    def test_values_round_trip(self):
+        sheet = self.workbook['AIR DG SALT LOG']
+        sheet['A30'], sheet['B30'], sheet['C30'], sheet['D30'] = 12, 2.5, True, date(2019, 1, 3)
+        grid = GridWorkbook(GridWorkbook.encode(self.workbook))
+        grid_sheet = grid['AIR DG SALT LOG']
+        for row in range(1, sheet.max_row + 1):
+            for col in range(1, sheet.max_column + 1):
+                cell, grid_cell = sheet.cell(row=row, column=col), grid_sheet.cell(row=row, column=col)
+                self.assertEqual(cell.value, grid_cell.value)
+                self.assertEqual(type(cell.value), type(grid_cell.value))
+                self.assertEqual(type(cell).__name__, type(grid_cell).__name__)
+        self.assertIsInstance(grid_sheet.cell(row=6, column=12).value, datetime)     # Monthly drill date
+
+    def test_tabs(self):
+        grid = GridWorkbook(GridWorkbook.encode(self.workbook))
+        self.assertEqual(grid.sheetnames, ['AIR DG SALT LOG', 'PCM 1-5-2019', 'PCM 1-12-2019', 'PCM 1-19-2019',
+                                           '1-19-2019 Drill'])
+        self.assertEqual(grid['1-19-2019 Drill'].max_row, 1)
+
+    def test_shared_memory(self):
+        grid = GridWorkbook.share(self.workbook)
+        try:
+            attached = GridWorkbook.attach(grid.shm_name)
+            expected = error_keys(LogChecker(SaltLog(self.workbook)).run_checks(), employee=True)
+            self.assertEqual(error_keys(LogChecker(SaltLog(attached)).run_checks(), employee=True), expected)
+            attached.close()
+        finally:
+            grid.close()
+            grid.unlink()
+
+    def test_parallel_checker(self):
+        log = SaltLog(self.workbook)
+        checker = ParallelChecker(log, processes=2)
+        salt_errors = checker.run_checks()
+        self.assertEqual(error_keys(salt_errors, employee=True),
+                         error_keys(LogChecker(log).run_checks(), employee=True))
+        self.assertIs(salt_errors[0].cell.parent, self.workbook['AIR DG SALT LOG'])
+        self.assertEqual(checker.rule_stats['training_drill'].rows, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
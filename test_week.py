@@ -1,96 +1,109 @@
 import unittest
+from sample_log import SampleLog
+from salt_log import SaltLog
+from validator import Validator
 from week import SaltWeek
 
+
+def build_log(weeks, entry=None) -> SaltLog:
+    """A one-employee log; `entry` (category, result, comment) overrides the first week's entry."""
+    sample = SampleLog(employees=1, weeks=weeks)
+    workbook = sample.build()
+    if entry is not None:
+        sheet = workbook['AIR DG SALT LOG']
+        for offset, value in enumerate(entry):
+            sheet.cell(row=sample.first_employee_row, column=sample.first_week_col + offset, value=value)
+    return SaltLog(workbook)
+
+
+def week_errors(weeks, entry) -> list:
+    log = build_log(weeks, entry)
+    return [error.message for error in Validator(log.weeks[0]).run_checks(log.employee_list)]
+
+
 class TestWeekMethods(unittest.TestCase):
 
-    def test_requires_date_string(self):
-        # Check that a date is required to be passed in to create a SaltWeek object
+    def test_requires_log_and_position(self):
+        # A SaltWeek is always read from a place on the log sheet
         with self.assertRaises(TypeError):
             salt_week = SaltWeek()
 
     def test_only_valid_salt_categories(self):
-        salt_week = SaltWeek('1/1/2019')
-        salt_week.set_salt_type('Observation')
-        self.assertEqual(salt_week.salt_type, 'Observation')
-        salt_week.set_salt_type('observation')
-        self.assertEqual(salt_week.salt_type, 'Observation')
-        salt_week.set_salt_type('Live')
-        self.assertEqual(salt_week.salt_type, 'Live')
-        salt_week.set_salt_type('live')
-        self.assertEqual(salt_week.salt_type, 'Live')
-        salt_week.set_salt_type('Supplemental Drill')
-        self.assertEqual(salt_week.salt_type, 'Supplemental Drill')
-        salt_week.set_salt_type('supplemental Drill')
-        self.assertEqual(salt_week.salt_type, 'Supplemental Drill')
-        salt_week.set_salt_type('supplemental Drill')
-        self.assertEqual(salt_week.salt_type, 'Supplemental Drill')
-
-        salt_week = SaltWeek('2/2/2019')
-        salt_week.set_salt_type('Bogus type')
-        self.assertEqual(salt_week.salt_type, None)
+        log = build_log(['observation', 'live salt', 'supplemental drill'])
+        self.assertEqual([week.salt_type for week in log.weeks], ['Observation', 'Live Salt', 'Supplemental Drill'])
+
+    def test_entries(self):
+        log = build_log(['observation'], ('Observation', 'U/R', 'Observation 9/10'))
+        employee = log.employee_list[0]
+        expected = {'category': 'Observation', 'result': 'U/R', 'comment': 'Observation 9/10'}
+        self.assertEqual(log.weeks[0].get_entry(employee, values=True), expected)
+        self.assertEqual(log.weeks[0].get_entry(employee.row, values=True), expected)
+
+        # The cell-by-cell lookup used without an EmployeeIndex agrees
+        unindexed = SaltLog(log.workbook, index=False)
+        self.assertEqual(unindexed.weeks[0].get_entry(unindexed.employee_list[0], values=True), expected)
+
 
 class TestObservationCommentValidation(unittest.TestCase):
 
-    def setUp(self):
-        self.log = SaltWeek('1/1/2019')
-        self.log.salt_type = 'Observation'
+    def errors(self, comment, result='A'):
+        return week_errors(['observation'], ('Observation', result, comment))
 
     def test_valid_comments(self):
-        self.assertEqual(self.log.validate_comment('Observation 10/10'), True)
-        self.assertEqual(self.log.validate_comment('observation 10/10'), True)
-        self.assertEqual(self.log.validate_comment('observation10/10'), True)
-        self.assertEqual(self.log.validate_comment('Observation 9/10'), True)
-        self.assertEqual(self.log.validate_comment('Observation 10/11'), True)
-        self.assertEqual(self.log.validate_comment('Observation 8/11'), True)
+        self.assertEqual(self.errors('Observation 10/10'), [])
+        self.assertEqual(self.errors('observation 10/10'), [])
+        self.assertEqual(self.errors('observation10/10'), [])
+        self.assertEqual(self.errors('Observation 9/10', 'U/R'), [])
+        self.assertEqual(self.errors('Observation 10/11', 'U/R'), [])
+        self.assertEqual(self.errors('Observation 8/11', 'U/R'), [])
 
     def test_not_enough_samples(self):
-        self.assertEqual(self.log.validate_comment('Observation 5/6'), False)
-        self.assertEqual(self.log.validate_comment('observation 7/8'), False)
+        # Fewer than 10 observations doesn't even read as an observation comment
+        self.assertEqual(self.errors('Observation 5/6', 'U/R'), ['Invalid observation comment'])
+        self.assertEqual(self.errors('observation 7/8', 'U/R'), ['Invalid observation comment'])
 
     def test_numbers_make_no_sense(self):
         # Make sure the number of good checks is not more than # of total checks
-        self.assertEqual(self.log.validate_comment('Observation 10/8'), False)
+        self.assertIn('Can\'t have more correct than # of observations.', self.errors('Observation 12/10'))
         # Make sure the number total checks is reasonable
-        self.assertEqual(self.log.validate_comment('Observation 20/20'), False)
+        self.assertIn('Did you really do 20 observations??', self.errors('Observation 20/20'))
+
+    def test_invalid_comment(self):
+        self.assertEqual(self.errors('Watched them work'), ['Invalid observation comment'])
+
 
 class TestObservationResultValidation(unittest.TestCase):
 
-    def setUp(self):
-        self.log = SaltWeek('1/1/2019')
-        self.log.salt_type = 'Observation'
+    def errors(self, result, comment):
+        return week_errors(['observation'], ('Observation', result, comment))
 
     def test_bad_result_code(self):
-        self.assertEqual(self.log.validate_result('U', 'Observation 7/10'), False)
-        self.assertEqual(self.log.validate_result('U/A', 'Observation 7/10'), False)
-        self.assertEqual(self.log.validate_result('UA', 'Observation 7/10'), False)
-        self.assertEqual(self.log.validate_result('UR', 'Observation 7/10'), False)
-        self.assertEqual(self.log.validate_result('No', 'Observation 8/10'), False)
-        self.assertEqual(self.log.validate_result('Yes', 'Observation 10/10'), False)
-
+        self.assertEqual(self.errors('U', 'Observation 7/10'), ['U is not a valid result'])
+        self.assertEqual(self.errors('U/A', 'Observation 7/10'), ['U/A is not a valid result'])
+        self.assertEqual(self.errors('UA', 'Observation 7/10'), ['UA is not a valid result'])
+        self.assertEqual(self.errors('UR', 'Observation 7/10'), ['UR is not a valid result'])
+        self.assertEqual(self.errors('No', 'Observation 8/10'), ['No is not a valid result'])
+        self.assertEqual(self.errors('Yes', 'Observation 10/10'), ['Yes is not a valid result'])
 
     def test_good_acceptable(self):
-        self.assertEqual(self.log.validate_result('A', 'Observation 10/10'), True)
-        self.assertEqual(self.log.validate_result('A', 'Observation 14/14'), True)
+        self.assertEqual(self.errors('A', 'Observation 10/10'), [])
+        self.assertEqual(self.errors('A', 'Observation 14/14'), [])
 
     def test_bad_acceptable(self):
-        self.assertEqual(self.log.validate_result('A', 'Observation 0/10'), False)
-        self.assertEqual(self.log.validate_result('A', 'Observation 10/11'), False)
-        self.assertEqual(self.log.validate_result('A', 'Observation 5/10'), False)
+        self.assertEqual(self.errors('A', 'Observation 0/10'), ['Can\'t have an \'A\' if not 100%'])
+        self.assertEqual(self.errors('A', 'Observation 10/11'), ['Can\'t have an \'A\' if not 100%'])
+        self.assertEqual(self.errors('A', 'Observation 5/10'), ['Can\'t have an \'A\' if not 100%'])
 
     def test_good_unacceptable(self):
-        self.assertEqual(self.log.validate_result('U/R', 'Observation 0/10'), True)
-        self.assertEqual(self.log.validate_result('U/R', 'Observation 10/11'), True)
-        self.assertEqual(self.log.validate_result('U/R', 'Observation 5/10'), True)
+        self.assertEqual(self.errors('U/R', 'Observation 0/10'), [])
+        self.assertEqual(self.errors('U/R', 'Observation 10/11'), [])
+        self.assertEqual(self.errors('U/R', 'Observation 5/10'), [])
 
     def test_bad_unacceptable(self):
-        self.assertEqual(self.log.validate_result('U/R', 'Observation 10/10'), False)
-        self.assertEqual(self.log.validate_result('U/R', 'Observation 14/14'), False)
-
-
-
-
-
+        unacceptable = 'Should not have \'U/R\' unless # correct is less than # observed'
+        self.assertEqual(self.errors('U/R', 'Observation 10/10'), [unacceptable])
+        self.assertEqual(self.errors('U/R', 'Observation 14/14'), [unacceptable])
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,69 @@
+import io
+import unittest
+from sample_log import SampleLog
+from salt_log import SaltLog
+from log_checker import LogChecker
+from windowed_log import WindowedChecker
+from parity import error_keys
+
+
+def as_file(workbook) -> io.BytesIO:
+    stream = io.BytesIO()
+    workbook.save(stream)
+    stream.seek(0)
+    return stream
+
+
+class TestWindowedChecker(unittest.TestCase):
+
+    def setUp(self):
+        self.sample = SampleLog(employees=23, weeks=['observation', 'live salt', 'supplemental drill', 'observation'],
+                                error_rate=0.3, seed=5)
+        self.workbook = self.sample.build()
+        # A blank slot is skipped, as in SaltLog
+        self.workbook['AIR DG SALT LOG'].cell(row=self.sample.first_employee_row + 4, column=2).value = None
+
+    def test_matches_log_checker(self):
+        expected = sorted(error_keys(LogChecker(SaltLog(self.workbook)).run_checks(), employee=True))
+        for window_size in (1, 5, 100):
+            checker = WindowedChecker(as_file(self.workbook), window_size=window_size)
+            self.assertEqual(sorted(error_keys(checker.run_checks(), employee=True)), expected)
+
+    def test_windows(self):
+        checker = WindowedChecker(as_file(self.workbook), window_size=5)
+        self.assertEqual((checker.employee_start, checker.employee_end),
+                         (self.sample.first_employee_row, self.sample.footer_row - 1))
+        checker.run_checks()
+        self.assertEqual(checker.windows_read, 5)       # 22 employee rows (one of them left blank)
+        self.assertEqual(checker.rule_stats['training_drill'].rows, 22)
+
+    def test_week_rules_run_last(self):
+        sheet = self.workbook['AIR DG SALT LOG']
+        sheet.cell(row=self.sample.footer_row + 2, column=5).value = 'no signature here'
+        salt_errors = WindowedChecker(as_file(self.workbook), window_size=5).run_checks()
+        has_employee = [error.employee is not None for error in salt_errors]
+        self.assertEqual(has_employee, sorted(has_employee, reverse=True))
+        self.assertIn(f'E{self.sample.footer_row + 2}',
+                      [error.cell.coordinate for error in salt_errors if error.employee is None])
+
+    def test_formatted_tail(self):
+        # Formatting and merges below the footer are neither kept as rows nor expanded into cells
+        sheet = self.workbook['AIR DG SALT LOG']
+        tail = self.sample.footer_row + 10
+        for row in range(tail, tail + 500):
+            sheet.cell(row=row, column=3).number_format = '0.00'
+        sheet.cell(row=tail, column=1).value = 'Notes'
+        sheet.merge_cells(start_row=tail, start_column=1, end_row=tail + 5000, end_column=26)
+        ranges = len(sheet.merged_cells.ranges)
+
+        expected = sorted(error_keys(LogChecker(SaltLog(self.workbook)).run_checks(), employee=True))
+        checker = WindowedChecker(as_file(self.workbook), window_size=5)
+        self.assertEqual(max(checker.log.workbook['AIR DG SALT LOG'].rows), self.sample.footer_row + 2)
+        self.assertEqual(len(checker.merged), ranges)
+        self.assertIn((tail + 4000, 20), checker.merged)
+        self.assertNotIn((tail, 1), checker.merged)
+        self.assertEqual(sorted(error_keys(checker.run_checks(), employee=True)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
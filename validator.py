@@ -8,18 +8,26 @@ from datetime import timedelta
 #########################
 from typing import List
 from typing import Dict
+from typing import Iterator
+from typing import Iterable
+from typing import Optional
+from typing import TYPE_CHECKING
 from employee import Employee
 from week import SaltWeek
 from SaltError import SaltError
-from openpyxl.cell.cell import Cell
+from rules import RuleRunner
+from similarity import SimilarityIndex
+if TYPE_CHECKING:
+    from openpyxl.cell.cell import Cell
 
 DateList = List[date]
 SaltErrorList = List[SaltError]
-CellDict = Dict[str, Cell]
+SaltErrorIter = Iterator[SaltError]
+CellDict = Dict[str, 'Cell']
 StrDict = Dict[str, str]
 
 
-class Validator:
+class Validator(RuleRunner):
     """ Performs validation tests on a single SaltWeek associated with a SaltLog
 
         The Validator class provides various validation checks for a single Week instance associated with a
@@ -38,21 +46,62 @@ class Validator:
 
         For additional details on these checks, please see the method-specific documentation.
 
+        Each check is a named rule (see `employee_rules` and `week_rules`) that can be switched off by passing its
+        name in `disabled_rules`. The observation, live SALT and supplemental drill rules only run in weeks of
+        that SALT type. Every rule that runs has its rows evaluated, time taken and errors raised recorded in
+        `rule_stats`.
+
+        A live SALT type or not-present comment that isn't in the list of valid ones gets the closest valid one
+        suggested, from a SimilarityIndex of each list (see `_vocabulary_index()`).
+
 
     """
-    
-    def __init__(self, week: SaltWeek):
+
+    signature_pattern = r'^[A-Za-z-\']+ +[A-Za-z-. ]+\d{7}$'
+
+    # Rule name -> method name
+    employee_rules = {
+        'blank_category': '_check_for_blank_category',
+        'category_no_result': '_check_category_no_result',
+        'blank_result': '_check_for_blank_result',
+        'blank_comment': '_check_for_blank_comment',
+        'observation': '_check_observation',
+        'live_salt': '_check_live_salt',
+        'supp_drills': '_check_supp_drills',
+    }
+    week_rules = {
+        'pcm': '_check_PCM',
+        'signature': '_validate_signature',
+    }
+
+    # Rules that only apply to one type of SALT week
+    rule_salt_types = {
+        'observation': 'observation',
+        'live_salt': 'live salt',
+        'supp_drills': 'supplemental drill',
+    }
+
+    # Vocabulary -> SimilarityIndex, shared by every Validator so each index (and its memo) is built once
+    _vocabulary_indexes: Dict[tuple, SimilarityIndex] = dict()
+
+    def __init__(self, week: SaltWeek, disabled_rules: Optional[Iterable[str]] = None):
         """Constructor for Validator class.
 
         Args:
             week: A SaltWeek instance associated with a particular week of a SaltLog. This is the week that
             checks will be performed on.
+            disabled_rules: Names of rules (keys of `employee_rules`/`week_rules`) that should not be run.
+            Names belonging to other validators are ignored.
 
         Returns:
             None: Nothing is returned
         """
         self.week : SaltWeek = week
 
+        super().__init__(disabled_rules)
+        self._active_employee_rules = self._activate_rules(self.employee_rules)
+        self._active_week_rules = self._activate_rules(self.week_rules)
+
         # Categories that require that the result column is left blank
         self._not_present_dict = {
             'vacation': ['vacation', 'vacation week',],
@@ -64,14 +113,33 @@ class Validator:
         self._no_results = list(self._not_present_dict.keys())
 
         # Valid live salt types
-        self._live_salt_types = ['Partial Li Batt Mark/Label', 'Un-audited HazMat Package ',
+        self._live_salt_types = ['Partial Li Batt Mark/Label', 'Un-audited HazMat Package',
                                  'ORM-D Air Mark (US, SJU & Canada Only)', 'ORM-D Mark (US, SJU & Canada  Only)',
                                  'Ground LTD QTY Mark/Label', 'Air LTD QTY Mark/Label', 'Partial Diamond Marl/Label',
                                  'Acceptable Diamond Label', 'Cargo Aircraft Only Label',
                                  'Ground Small Quantities Mark', 'Lithium Battery Mark/Label',
                                  'Prohibited Diamond Label']
 
-        self.salt_errors: SaltErrorList = list()
+        # Closest valid value to an invalid comment, for the error message
+        self._live_salt_index = self._vocabulary_index(self._live_salt_types)
+        self._not_present_indexes = {category: self._vocabulary_index(comments)
+                                     for category, comments in self._not_present_dict.items()}
+
+    @classmethod
+    def _vocabulary_index(cls, values: list) -> SimilarityIndex:
+        key = tuple(values)
+        index = cls._vocabulary_indexes.get(key)
+        if index is None:
+            index = cls._vocabulary_indexes[key] = SimilarityIndex(values)
+        return index
+
+    @staticmethod
+    def _invalid_value_error(employee: Employee, cell: 'Cell', message: str, index: SimilarityIndex,
+                             value: str) -> SaltError:
+        suggestion = index.best(value)
+        if suggestion is None:
+            return SaltError(employee, cell, message)
+        return SaltError(employee, cell, f'{message}. Did you mean \'{suggestion}\'?', [suggestion])
 
     def run_checks(self, employee_list: list) -> list:
         """Runs validation tests on a SaltWeek associated with the Validator instance.
@@ -110,20 +178,46 @@ class Validator:
         Returns:
             A list of SaltError objects corresponding to issues found while validating the Week.
 
+        """
+        self.salt_errors = list(self.iter_checks(employee_list))
+        return self.salt_errors
+
+    def iter_checks(self, employee_list: list) -> SaltErrorIter:
+        """Runs the same validation tests as run_checks(), yielding each SaltError as soon as it is found.
+
+        The errors for an employee are yielded once all of the employee-specific tests have been run on that
+        employee, and the PCM and signature errors are yielded last. Nothing is held onto after it has been
+        yielded, so a consumer can stop iterating at any point without the remaining tests being run.
+
+        Args:
+            employee_list: List of Employee objects corresponding to the employees represented in the Week.
+
+        Returns:
+            A generator of SaltError objects corresponding to issues found while validating the Week.
+        """
+        yield from self.iter_employee_checks(employee_list)
+        yield from self.iter_week_checks()
+
+    def iter_employee_checks(self, employee_list: list) -> SaltErrorIter:
+        """Runs only the employee-specific rules, yielding each employee's SaltErrors in turn.
+
+        This can be called more than once with different employees (e.g. one window of rows at a time); the rule
+        stats keep accumulating.
         """
         for employee in employee_list:
-            self._check_for_blank_category(employee)
-            self._check_category_no_result(employee)
-            self._check_for_blank_result(employee)
-            self._check_for_blank_comment(employee)
-            self._check_observation(employee)
-            self._check_live_salt(employee)
-            self._check_supp_drills(employee)
+            for name, rule in self._active_employee_rules:
+                self._run_rule(name, rule, employee)
+            yield from self._drain_errors()
 
-        self._check_PCM()
-        self._validate_signature()
+    def iter_week_checks(self) -> SaltErrorIter:
+        """Runs only the rules that apply to the week as a whole (PCM topic/date and signature)."""
+        for name, rule in self._active_week_rules:
+            self._run_rule(name, rule)
+        yield from self._drain_errors()
 
-        return self.salt_errors
+    def _rule_applies(self, name: str) -> bool:
+        salt_type = self.rule_salt_types.get(name)
+        return salt_type is None or self._week_has_correct_salt_type(salt_type)
 
     def _check_for_blank_category(self, employee: Employee):
         """Checks to make sure the SALT category isn't left blank.
@@ -215,13 +309,17 @@ class Validator:
             self.salt_errors.append(SaltError(employee, cells['result'],
                                               f'Result must be blank if category is {values["category"]}'))
 
-        # Make sure the comment is valid for the SALT category
+        # Make sure the comment is valid for the SALT category; a blank one is left to _check_for_blank_comment()
+        if values['comment'] is None:
+            return None
         not_present_reason = values['category']
         if values['comment'].strip().lower() not in self._not_present_dict[not_present_reason]:
-            self.salt_errors.append(SaltError(employee, cells['comment'],
-                                              f'{values["comment"]} is not a valid comment for {not_present_reason}'))
+            self.salt_errors.append(self._invalid_value_error(
+                employee, cells['comment'], f'{values["comment"]} is not a valid comment for {not_present_reason}',
+                self._not_present_indexes[not_present_reason], values['comment']))
 
-    def _week_has_correct_salt_type(self, salt_type: str, employee: Employee, cells: CellDict, values: StrDict) -> bool:
+    def _week_has_correct_salt_type(self, salt_type: str, employee: Employee = None, cells: CellDict = None,
+                                    values: StrDict = None) -> bool:
         """Checks that the Week's SALT type matches the salt_type provided by the calling method.
 
         `_week_has_correct_salt_type()` checks to make sure that the calling method is the correct one for the
@@ -240,7 +338,8 @@ class Validator:
             bool: True if the Week.salt_type attribute matches the salt_type argument passed by the calling method; otherwise False
 
         """
-        return self.week.salt_type.lower() == salt_type
+        # The SALT type heading may be worded loosely (e.g. 'Live' or 'Live SALT'), so match on the first word
+        return salt_type.split()[0] in self.week.salt_type.lower()
 
     def _initial_comment_checks(self, salt_type: str, employee: Employee, cells: CellDict, values: StrDict) -> bool:
         """Runs initial checks for an Employee's SALT entry.
@@ -268,11 +367,18 @@ class Validator:
             be returned. Otherwise, True is returned.
 
         """
+        if not self._week_has_correct_salt_type(salt_type, employee, cells, values):
+            return False
+
         # todo does this category is blank test make sense here?
         # If the SALT category is blank, mark it as an issue
         if values['category'] == None:
             self.salt_errors.append(SaltError(employee, cells['category'], 'SALT type should not be blank'))
-            return
+            return False
+
+        # Employees who were off, on vacation, etc. are checked by _check_category_no_result()
+        if values['category'].strip().lower() in self._no_results:
+            return False
 
         # For the rest of the tests, we need 'supplemental drill' to be abbreviated to 'supp drill'
         if salt_type == 'supplemental drill':
@@ -286,6 +392,7 @@ class Validator:
         # A comment for the SALT week
         if values['comment'] is None:
             self.salt_errors.append(SaltError(employee, cells['comment'], 'Comment field should not be blank'))
+            return False
 
         return True
 
@@ -300,8 +407,9 @@ class Validator:
 
         # Check that we have 'Observation x/x' as comment
         observation_comment = re.search(r'[Oo]bservation ?(\d{1,2})/(\d{2,})', values['comment'].strip())
-        if values['category'].lower() == 'observation' and observation_comment is None:
+        if observation_comment is None:
             self.salt_errors.append(SaltError(employee, cells['comment'], f'Invalid observation comment'))
+            return None
 
         ###################################
         # Check that the number of observations is reasonable:
@@ -347,11 +455,16 @@ class Validator:
         salt_type = values['comment'].strip()
         if (salt_type not in self._live_salt_types) and \
                 (re.search(r'[Oo]ther [a-zA-Z0-9_/-][\sa-zA-Z0-9_/-]+', salt_type) is None):
-            self.salt_errors.append(SaltError(employee, cells['comment'], f'{salt_type} is not a valid SALT type'))
+            self.salt_errors.append(self._invalid_value_error(employee, cells['comment'],
+                                                              f'{salt_type} is not a valid SALT type',
+                                                              self._live_salt_index, salt_type))
 
         ###############################
         # Check that result is allowed
 
+        # A blank result is reported by _check_for_blank_result()
+        if values['result'] is None:
+            return None
         result = values['result'].strip()
         if result == 'U':
             self.salt_errors.append(SaltError(employee, cells['result'], 'SALT result may not be \'U\'. Did you mean \'U/A\'?'))
@@ -390,24 +503,19 @@ class Validator:
             if drill_sheet_num not in values['comment']:
                 self.salt_errors.append(SaltError(employee, cells['comment'], f'Drill sheet number must be {drill_sheet_num}'))
 
-        # Check that the result is 'A'
-        if values['result'].strip() != "A":
+        # Check that the result is 'A' (a blank result is reported by _check_for_blank_result())
+        if values['result'] is not None and values['result'].strip() != "A":
             self.salt_errors.append(SaltError(employee, cells['result'], 'Supp. drill result must be \'A\''))
 
     def _check_PCM(self):
         # Info from SALT log
         pcm_topic: str = self.week.PCM_topic
-        pcm_cell: Cell = self.week.PCM_topic_cell
+        pcm_cell: 'Cell' = self.week.PCM_topic_cell
         pcm_date: date = self.week.PCM_date
-        pcm_date_cell: Cell = self.week.PCM_date_cell
+        pcm_date_cell: 'Cell' = self.week.PCM_date_cell
 
         # Check that the log has the correct PCM topic info
-        if (pcm_topic is None) or (pcm_topic == ''):
-            self.salt_errors.append(SaltError(None, pcm_cell, 'PCM topic shouldn\'t be blank'))
-        else:
-            correct_topic: str = self.week._correct_PCM_topic
-            if pcm_topic.strip().lower() != correct_topic.strip().lower():
-                self.salt_errors.append(SaltError(None, pcm_cell, 'PCM topic doesn\'t match PCM tab'))
+        self.salt_errors.extend(self.pcm_topic_errors(pcm_topic, self.week._correct_PCM_topic, pcm_cell))
 
         # Check that the log has an acceptable PCM date
         if pcm_date is None:
@@ -415,26 +523,59 @@ class Validator:
         elif pcm_date.date() not in self._get_valid_PCM_days():
             self.salt_errors.append(SaltError(None, pcm_date_cell, 'PCM date not valid--must be Mon., Tues. or Wed. of week'))
 
-        # Check that there is a valid signature (name + GEMS)
-        self._validate_signature()
-
     def _get_valid_PCM_days(self) -> list:
         weekending_date: date = self.week.ending_date
         valid_pcm_days: list = [weekending_date - timedelta(days=item) for item in range(3, 6)]
         return valid_pcm_days
 
     def _validate_signature(self) -> None:
-        signature_pattern = r'^[A-Za-z-\']+ +[A-Za-z-. ]+\d{7}$'
+        self.salt_errors.extend(self.signature_errors(self.week.signature, self.week.signature_cell))
+
+    @classmethod
+    def pcm_topic_errors(cls, pcm_topic: str, correct_topic: str, pcm_cell: 'Cell') -> SaltErrorList:
+        """Checks a week's PCM topic against the topic from the PCM tab for that week.
+
+        This is a classmethod so that the same rule can be run without a SaltWeek (see QuickCheck).
+
+        Args:
+            pcm_topic: The PCM topic entered on the SALT log for the week
+            correct_topic: The topic from the week's PCM tab, or None if there is no PCM tab for the week
+            pcm_cell: The cell holding the PCM topic on the SALT log
+
+        Returns:
+            A list of SaltErrors for the PCM topic (empty if the topic is valid)
+        """
+        if (pcm_topic is None) or (pcm_topic == ''):
+            return [SaltError(None, pcm_cell, 'PCM topic shouldn\'t be blank')]
+        if correct_topic is None:
+            return [SaltError(None, pcm_cell, 'Could not find PCM tab for week--must check manually')]
+        if pcm_topic.strip().lower() != correct_topic.strip().lower():
+            return [SaltError(None, pcm_cell, 'PCM topic doesn\'t match PCM tab')]
+        return list()
+
+    @classmethod
+    def signature_errors(cls, signature: str, signature_cell: 'Cell') -> SaltErrorList:
+        """Checks that a week's PCM signature has a valid format: first name, last name, GEMS.
+
+        This is a classmethod so that the same rule can be run without a SaltWeek (see QuickCheck).
+
+        Args:
+            signature: The signature entered on the SALT log for the week
+            signature_cell: The cell holding the signature
+
+        Returns:
+            A list of SaltErrors for the signature (empty if the signature is valid)
+        """
         # Make sure signature isn't blank
-        if self.week.signature is None or self.week.signature == '':
-            self.salt_errors.append(SaltError(None, self.week.signature_cell, 'Signature shouldn\'t be blank'))
-            return
+        if signature is None or signature == '':
+            return [SaltError(None, signature_cell, 'Signature shouldn\'t be blank')]
 
         # Check that signature has valid format
         # todo give more granular feedback about format error, e.g., 6-digit GEMS
-        search_result = re.search(signature_pattern, self.week.signature.strip())
+        search_result = re.search(cls.signature_pattern, signature.strip())
         if search_result is None:
-            self.salt_errors.append(SaltError(None, self.week.signature_cell, 'Invalid signature format'))
+            return [SaltError(None, signature_cell, 'Invalid signature format')]
+        return list()
 
     # todo Check that any rows not occupied by an employee are blank--if it should be blank, make sure it is.
 
@@ -0,0 +1,410 @@
+from cell_refs import column_letter
+from cell_refs import range_boundaries
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from array import array
+import struct
+
+#########################
+# Typing setup
+#########################
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    import mmap
+    from multiprocessing import shared_memory
+
+StrList = List[str]
+
+
+#########################
+# Cell kinds
+#########################
+EMPTY = 0
+STRING = 1
+INTEGER = 2
+FLOAT = 3
+DATETIME = 4
+DATE = 5
+BOOLEAN = 6
+MERGED = 7
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class Cell:
+    """Read-only stand-in for openpyxl's Cell, backed by a GridSheet.
+
+    The class is deliberately named Cell (and MergedCell below) because SaltLog tells cells apart by class name,
+    the same way it does for openpyxl's cells.
+    """
+
+    __slots__ = ('parent', 'row', 'column', 'value')
+
+    def __init__(self, parent: 'GridSheet', row: int, column: int, value=None):
+        self.parent = parent
+        self.row = row
+        self.column = column
+        self.value = value
+
+    @property
+    def coordinate(self) -> str:
+        return f'{column_letter(self.column)}{self.row}'
+
+    def __repr__(self):
+        return f'<Cell {self.parent.title!r}.{self.coordinate}>'
+
+
+class MergedCell(Cell):
+    """A cell covered by a merged range (other than its top-left cell). Its value is always None."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return f'<MergedCell {self.parent.title!r}.{self.coordinate}>'
+
+
+class GridSheet:
+    """A worksheet decoded into a compact, column-major value grid.
+
+    Each cell is stored as a kind byte plus either a float64 (numbers, dates, booleans) or an int32 index into the
+    workbook's string table, so the whole sheet sits in three flat arrays that can live in shared memory. GridSheet
+    offers the parts of the openpyxl Worksheet API that SaltLog and SaltWeek use--cell(), iter_rows(), iter_cols(),
+    max_row, max_column and title--so the existing classes run on it unchanged.
+    """
+
+    def __init__(self, workbook: 'GridWorkbook', title: str, max_row: int, max_column: int,
+                 kinds: memoryview, numbers: memoryview, strings: memoryview):
+        self.parent = workbook
+        self.title = title
+        self.max_row = max_row
+        self.max_column = max_column
+        self._kinds = kinds
+        self._numbers = numbers
+        self._strings = strings
+
+    def value(self, row: int, column: int):
+        if row < 1 or column < 1 or row > self.max_row or column > self.max_column:
+            return None
+        index = (column - 1) * self.max_row + row - 1
+        kind = self._kinds[index]
+        if kind == STRING:
+            return self.parent.string(self._strings[index])
+        if kind == EMPTY or kind == MERGED:
+            return None
+        number = self._numbers[index]
+        if kind == INTEGER:
+            return int(number)
+        if kind == FLOAT:
+            return number
+        if kind == DATETIME:
+            return _EPOCH + timedelta(seconds=number)
+        if kind == DATE:
+            return date.fromordinal(int(number))
+        return bool(number)
+
+    def cell(self, row: int, column: int) -> Cell:
+        if 1 <= row <= self.max_row and 1 <= column <= self.max_column and \
+                self._kinds[(column - 1) * self.max_row + row - 1] == MERGED:
+            return MergedCell(self, row, column)
+        return Cell(self, row, column, self.value(row, column))
+
+    def iter_rows(self, min_row: Optional[int] = None, max_row: Optional[int] = None, min_col: Optional[int] = None,
+                  max_col: Optional[int] = None, values_only: bool = False):
+        min_row, max_row, min_col, max_col = self._bounds(min_row, max_row, min_col, max_col)
+        for row in range(min_row, max_row + 1):
+            if values_only:
+                yield tuple(self.value(row, col) for col in range(min_col, max_col + 1))
+            else:
+                yield tuple(self.cell(row, col) for col in range(min_col, max_col + 1))
+
+    def iter_cols(self, min_col: Optional[int] = None, max_col: Optional[int] = None, min_row: Optional[int] = None,
+                  max_row: Optional[int] = None, values_only: bool = False):
+        min_row, max_row, min_col, max_col = self._bounds(min_row, max_row, min_col, max_col)
+        for col in range(min_col, max_col + 1):
+            if values_only:
+                yield tuple(self.value(row, col) for row in range(min_row, max_row + 1))
+            else:
+                yield tuple(self.cell(row, col) for row in range(min_row, max_row + 1))
+
+    def _bounds(self, min_row, max_row, min_col, max_col) -> tuple:
+        return (min_row or 1, max_row or self.max_row, min_col or 1, max_col or self.max_column)
+
+
+class GridWorkbook:
+    """A set of GridSheets sharing one interned string table, serialised into a single flat buffer.
+
+    The buffer can be written to shared memory (share()/attach()) or to disk (open() maps a file written with
+    the bytes from encode()/encode_xlsx()), and GridWorkbook reads it in place:
+    the kind/number/string-index arrays are memoryviews onto the buffer rather than copies, and strings are only
+    decoded (once per process) when a cell that holds them is read. GridWorkbook offers `sheetnames` and
+    `workbook[name]`, which is all SaltLog needs from a Workbook.
+
+    Buffer layout (little-endian):
+
+        header      magic, sheet count, string count, string blob size
+        sheets      per sheet: name (string index), max_row, max_column, offset of its arrays
+        strings     (string count + 1) uint32 offsets into the blob, then the UTF-8 blob
+        arrays      per sheet: kinds (uint8), padded to 8 bytes; numbers (float64); string indexes (int32)
+    """
+
+    _magic = b'SALTGRD1'
+    # Grid files carry the format in their name, so a format change never picks up an old file
+    file_suffix = '.' + _magic.decode('ascii').lower()
+    _header = struct.Struct('<8sIIQ')
+    _sheet_entry = struct.Struct('<IIIQ')
+
+    # SaltLog only reads the first non-empty value of the PCM and drill tabs, within their first 15 columns
+    tab_max_col = 15
+
+    def __init__(self, buffer):
+        self.buffer = memoryview(buffer)
+        self._shm: Optional['shared_memory.SharedMemory'] = None
+        self._mmap: Optional['mmap.mmap'] = None
+        self._sheets: Dict[str, GridSheet] = dict()
+
+        magic, sheet_count, string_count, blob_size = self._header.unpack_from(self.buffer, 0)
+        if magic != self._magic:
+            raise Exception('Not a value grid buffer')
+
+        offset = self._header.size
+        entries = list()
+        for _ in range(sheet_count):
+            entries.append(self._sheet_entry.unpack_from(self.buffer, offset))
+            offset += self._sheet_entry.size
+
+        self._string_offsets = self.buffer[offset:offset + 4 * (string_count + 1)].cast('I')
+        offset += 4 * (string_count + 1)
+        self._string_blob = self.buffer[offset:offset + blob_size]
+        self._string_cache: list = [None] * string_count
+
+        for name_index, max_row, max_column, array_offset in entries:
+            cells = max_row * max_column
+            kinds = self.buffer[array_offset:array_offset + cells]
+            array_offset += _pad(cells)
+            numbers = self.buffer[array_offset:array_offset + 8 * cells].cast('d')
+            array_offset += 8 * cells
+            strings = self.buffer[array_offset:array_offset + 4 * cells].cast('i')
+            title = self.string(name_index)
+            self._sheets[title] = GridSheet(self, title, max_row, max_column, kinds, numbers, strings)
+
+    @property
+    def sheetnames(self) -> StrList:
+        return list(self._sheets)
+
+    def __getitem__(self, name: str) -> GridSheet:
+        return self._sheets[name]
+
+    def string(self, index: int) -> str:
+        value = self._string_cache[index]
+        if value is None:
+            value = str(self._string_blob[self._string_offsets[index]:self._string_offsets[index + 1]], 'utf-8')
+            self._string_cache[index] = value
+        return value
+
+    #########################
+    # Building
+    #########################
+    @classmethod
+    def encode(cls, workbook, log_sheet: str = 'AIR DG SALT LOG') -> bytes:
+        """Decodes an openpyxl Workbook into the value grid format.
+
+        The log sheet is encoded in full, merged cells included. The PCM and drill tabs are only encoded up to their
+        first non-empty row (within the first 15 columns), which is as far as SaltLog reads them.
+        """
+        strings: Dict[str, int] = dict()
+        sheets = list()
+        for name in workbook.sheetnames:
+            if name == log_sheet:
+                sheets.append(cls._encode_sheet(workbook[name], strings, merged=True))
+            elif name.strip().startswith('PCM') or 'drill' in name.strip().lower():
+                sheets.append(cls._encode_sheet(workbook[name], strings, max_col=cls.tab_max_col, first_value=True))
+        return cls._pack(sheets, strings)
+
+    @classmethod
+    def _encode_sheet(cls, sheet, strings: Dict[str, int], max_col: Optional[int] = None, merged: bool = False,
+                      first_value: bool = False) -> tuple:
+        max_column = min(sheet.max_column, max_col) if max_col else sheet.max_column
+        rows = list()
+        for row in sheet.iter_rows(min_row=1, max_row=sheet.max_row, max_col=max_column, values_only=True):
+            rows.append(row)
+            if first_value and any(value is not None for value in row):
+                break
+        max_row = len(rows)
+
+        values = ((row_num, col_num, value) for row_num, row in enumerate(rows, 1)
+                  for col_num, value in enumerate(row, 1))
+        merged_ranges = [merged_range.bounds for merged_range in sheet.merged_cells.ranges] if merged else ()
+        return cls._encode_grid(sheet.title, max_row, max_column, values, merged_ranges, strings)
+
+    @classmethod
+    def _encode_grid(cls, title: str, max_row: int, max_column: int, values, merged_ranges,
+                     strings: Dict[str, int]) -> tuple:
+        # values: (row, column, value) for the cells within max_row x max_column; merged_ranges: (min_col,
+        # min_row, max_col, max_row) bounds
+        cells = max_row * max_column
+        kinds = bytearray(cells)
+        numbers = array('d', bytes(8 * cells))
+        string_indexes = array('i', bytes(4 * cells))
+        for row_num, col_num, value in values:
+            index = (col_num - 1) * max_row + row_num - 1
+            kinds[index], numbers[index], string_indexes[index] = cls._encode_value(value, strings)
+
+        for min_col, min_row, max_col, max_row_merged in merged_ranges:
+            for row_num in range(min_row, min(max_row_merged, max_row) + 1):
+                for col_num in range(min_col, min(max_col, max_column) + 1):
+                    if (row_num, col_num) != (min_row, min_col):
+                        kinds[(col_num - 1) * max_row + row_num - 1] = MERGED
+
+        return cls._intern(title, strings), max_row, max_column, kinds, numbers, string_indexes
+
+    @classmethod
+    def encode_xlsx(cls, workbook_file, log_sheet: str = 'AIR DG SALT LOG') -> bytes:
+        """Same as encode(), but reads the xlsx file straight into the grid with XlsxValueReader, without openpyxl.
+
+        The log sheet's size is that of its values and merged ranges; empty cells that only carry formatting,
+        which openpyxl would count, are left out.
+        """
+        from xlsx_values import XlsxValueReader
+
+        reader = XlsxValueReader(workbook_file, dates=True)
+        try:
+            strings: Dict[str, int] = dict()
+            sheets = list()
+            for name in reader.sheetnames:
+                if name == log_sheet:
+                    rows = list(reader.iter_rows(name))
+                    merged_ranges = [range_boundaries(ref) for ref in reader.merged_ranges.get(name, ())]
+                elif name.strip().startswith('PCM') or 'drill' in name.strip().lower():
+                    rows = list()
+                    for row_num, row_values in reader.iter_rows(name, max_col=cls.tab_max_col):
+                        rows.append((row_num, row_values))
+                        if row_values:
+                            break
+                    merged_ranges = list()
+                else:
+                    continue
+
+                rows = [(row_num, row_values) for row_num, row_values in rows if row_values]
+                max_row = max([row_num for row_num, row_values in rows] +
+                              [bounds[3] for bounds in merged_ranges] + [1])
+                max_column = max([max(row_values) for row_num, row_values in rows] +
+                                 [bounds[2] for bounds in merged_ranges] + [1])
+                values = ((row_num, col_num, value) for row_num, row_values in rows
+                          for col_num, value in row_values.items())
+                sheets.append(cls._encode_grid(name, max_row, max_column, values, merged_ranges, strings))
+        finally:
+            reader.close()
+        return cls._pack(sheets, strings)
+
+    @classmethod
+    def _encode_value(cls, value, strings: Dict[str, int]) -> tuple:
+        if value is None:
+            return EMPTY, 0.0, 0
+        if isinstance(value, bool):
+            return BOOLEAN, float(value), 0
+        if isinstance(value, int):
+            return INTEGER, float(value), 0
+        if isinstance(value, float):
+            return FLOAT, value, 0
+        if isinstance(value, datetime):
+            return DATETIME, (value - _EPOCH).total_seconds(), 0
+        if isinstance(value, date):
+            return DATE, float(value.toordinal()), 0
+        return STRING, 0.0, cls._intern(str(value), strings)
+
+    @staticmethod
+    def _intern(value: str, strings: Dict[str, int]) -> int:
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    @classmethod
+    def _pack(cls, sheets: list, strings: Dict[str, int]) -> bytes:
+        encoded = [value.encode('utf-8') for value in strings]
+        string_offsets = array('I', [0])
+        for value in encoded:
+            string_offsets.append(string_offsets[-1] + len(value))
+        blob = b''.join(encoded)
+
+        header_size = cls._header.size + cls._sheet_entry.size * len(sheets) + 4 * len(string_offsets) + len(blob)
+        array_offset = _pad(header_size)
+        parts = [cls._header.pack(cls._magic, len(sheets), len(strings), len(blob))]
+        for name_index, max_row, max_column, kinds, numbers, string_indexes in sheets:
+            parts.append(cls._sheet_entry.pack(name_index, max_row, max_column, array_offset))
+            array_offset += _pad(len(kinds)) + 8 * len(numbers) + 4 * len(string_indexes)
+        parts.append(string_offsets.tobytes())
+        parts.append(blob)
+        parts.append(bytes(_pad(header_size) - header_size))
+        for name_index, max_row, max_column, kinds, numbers, string_indexes in sheets:
+            parts.append(bytes(kinds) + bytes(_pad(len(kinds)) - len(kinds)))
+            parts.append(numbers.tobytes())
+            parts.append(string_indexes.tobytes())
+        return b''.join(parts)
+
+    #########################
+    # Files and shared memory
+    #########################
+    @classmethod
+    def open(cls, path) -> 'GridWorkbook':
+        """Maps a grid file read-only; pages are only read from disk as cells are looked at. close() unmaps it."""
+        import mmap
+        with open(path, 'rb') as grid_file:
+            mapped = mmap.mmap(grid_file.fileno(), 0, access=mmap.ACCESS_READ)
+        grid = cls(mapped)
+        grid._mmap = mapped
+        return grid
+
+    @classmethod
+    def share(cls, workbook, log_sheet: str = 'AIR DG SALT LOG') -> 'GridWorkbook':
+        """Decodes the workbook once and places the grid in a new shared memory block.
+
+        Workers attach to it by name with GridWorkbook.attach(grid.shm_name). The creating process owns the block
+        and must call unlink() once the workers are done with it.
+        """
+        from multiprocessing import shared_memory
+        data = cls.encode(workbook, log_sheet)
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        shm.buf[:len(data)] = data
+        grid = cls(shm.buf[:len(data)])
+        grid._shm = shm
+        return grid
+
+    @classmethod
+    def attach(cls, name: str) -> 'GridWorkbook':
+        from multiprocessing import shared_memory
+        shm = shared_memory.SharedMemory(name=name)
+        grid = cls(shm.buf)
+        grid._shm = shm
+        return grid
+
+    @property
+    def shm_name(self) -> Optional[str]:
+        return self._shm.name if self._shm is not None else None
+
+    def close(self) -> None:
+        if self._shm is not None or self._mmap is not None:
+            # Release every view onto the block or mapping before closing it
+            for sheet in self._sheets.values():
+                sheet._kinds.release()
+                sheet._numbers.release()
+                sheet._strings.release()
+            self._string_offsets.release()
+            self._string_blob.release()
+            self.buffer.release()
+            if self._shm is not None:
+                self._shm.close()
+            else:
+                self._mmap.close()
+
+    def unlink(self) -> None:
+        if self._shm is not None:
+            self._shm.unlink()
+
+
+def _pad(size: int) -> int:
+    return (size + 7) // 8 * 8
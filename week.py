@@ -5,6 +5,9 @@ import re
 
 
 class SaltWeek:
+
+    ending_date_pattern = r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}'
+
     def __init__(self, log, start_row: int, start_col: int):
         self.log = log
 
@@ -35,7 +38,7 @@ class SaltWeek:
 
         # Get date information
         self.ending_date_cell_value: str = self.log.cell(row=self.week_row_heading, column=self.week_col_heading).value
-        self.ending_date_string: str = re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', self.ending_date_cell_value).group(0)
+        self.ending_date_string: str = re.search(self.ending_date_pattern, self.ending_date_cell_value).group(0)
         self.ending_date: date = self._parse_date(self.ending_date_string)
 
         # Get weekly salt category
@@ -48,6 +51,10 @@ class SaltWeek:
         # Correct PCM topic for the week
         self._correct_PCM_topic = None
 
+        # Preloaded employee entries (see set_index())
+        self._entry_cells = None
+        self._entry_values = None
+
         # Valid live salt types
         self._live_salt_types = ['Partial Li Batt Mark/Label', 'Un-audited HazMat Package ',
                                  'ORM-D Air Mark (US, SJU & Canada Only)', 'ORM-D Mark (US, SJU & Canada  Only)',
@@ -62,11 +69,17 @@ class SaltWeek:
     def set_correct_PCM(self, PCM_topics: dict) -> None:
         self._correct_PCM_topic = PCM_topics.get(self.ending_date)
 
+    def set_index(self, employee_index, week_number: int) -> None:
+        """Points get_entry() at this week's preloaded entries in the log's EmployeeIndex."""
+        self._entry_cells = employee_index.entry_cells[week_number]
+        self._entry_values = employee_index.entry_values[week_number]
+
     def get_entry(self, row_source, values=False):
-        funcs = {'int': self._get_entry_int,
-                 'Employee': self._get_entry_employee,
-                 }
-        return funcs[type(row_source).__name__](row_source, values=values)
+        if isinstance(row_source, Employee):
+            if self._entry_cells is not None and row_source.ordinal is not None:
+                return self._entry_values[row_source.ordinal] if values else self._entry_cells[row_source.ordinal]
+            return self._get_entry_employee(row_source, values=values)
+        return self._get_entry_int(row_source, values=values)
 
     def _get_entry_int(self, row:int, values):
         data = dict()
@@ -104,7 +117,8 @@ class SaltWeek:
                 pass
         return None
 
-    def _parse_date(self, date: str) -> date:
+    @staticmethod
+    def _parse_date(date: str) -> date:
         return datetime.strptime(date, '%m/%d/%Y').date()
 
 
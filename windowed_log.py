@@ -0,0 +1,311 @@
+from bisect import bisect_left
+from bisect import bisect_right
+from cell_refs import range_boundaries
+from xlsx_values import XlsxValueReader
+from log_checker import LogChecker
+from salt_log import SaltLog
+from validator import Validator
+from MonthValidator import MonthValidator
+from reference_catalog import ReferenceCatalog
+from employee import Employee
+from employee_index import EmployeeIndex
+from value_grid import Cell
+from value_grid import MergedCell
+
+#########################
+# Typing setup
+#########################
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from SaltError import SaltError
+
+RowValues = Dict[int, object]
+SheetRows = Dict[int, RowValues]
+# (min_col, min_row, max_col, max_row) of a merged range, as from range_boundaries()
+Bounds = Tuple[int, int, int, int]
+EmployeeList = List[Employee]
+SaltErrorIter = Iterator[SaltError]
+
+LOG_SHEET = 'AIR DG SALT LOG'
+
+
+class MergedRanges:
+    """A sheet's merged cell ranges, kept as their bounds rather than cell by cell.
+
+    `(row, column) in merged` is true for every cell of a range except its top-left one--the cells openpyxl makes
+    MergedCells. It costs one tuple per range however many cells the range covers, and within() narrows the
+    ranges to those reaching a window of rows, so a window's lookups only test the few that can match.
+    """
+
+    def __init__(self, bounds: Iterable[Bounds] = ()):
+        self.bounds: List[Bounds] = sorted(bounds, key=lambda bound: bound[1])
+
+    @classmethod
+    def from_refs(cls, refs: Iterable[str]) -> 'MergedRanges':
+        return cls(range_boundaries(ref) for ref in refs)
+
+    def __contains__(self, cell: Tuple[int, int]) -> bool:
+        row, column = cell
+        for min_col, min_row, max_col, max_row in self.bounds:
+            if min_row > row:
+                break
+            if row <= max_row and min_col <= column <= max_col and (row, column) != (min_row, min_col):
+                return True
+        return False
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def within(self, min_row: int, max_row: int) -> 'MergedRanges':
+        return MergedRanges(bound for bound in self.bounds if bound[1] <= max_row and bound[3] >= min_row)
+
+    def first_row(self, column: int, min_row: int) -> Optional[int]:
+        """The first row from `min_row` down whose cell in `column` is merged, or None."""
+        rows = list()
+        for min_col, range_min_row, max_col, max_row in self.bounds:
+            if min_col <= column <= max_col:
+                row = max(range_min_row + 1 if min_col == column else range_min_row, min_row)
+                if row <= max_row:
+                    rows.append(row)
+        return min(rows, default=None)
+
+
+class SparseSheet:
+    """Read-only worksheet holding only some of a sheet's rows, as read by XlsxValueReader.
+
+    Like GridSheet, it offers the parts of the openpyxl Worksheet API that SaltLog and SaltWeek use, and hands out
+    value_grid Cells and MergedCells. Rows that weren't kept are skipped by iter_rows()/iter_cols() rather than
+    filled in with empty cells; every caller is searching for a value, so the result is the same.
+    """
+
+    def __init__(self, title: str, rows: SheetRows, merged: Optional[MergedRanges] = None):
+        self.title = title
+        self.rows: SheetRows = rows
+        self.merged: MergedRanges = merged if merged is not None else MergedRanges()
+        self._row_numbers: List[int] = sorted(rows)
+        self.max_row: int = self._row_numbers[-1] if rows else 0
+        self.max_column: int = max((max(values) for values in rows.values() if values), default=0)
+
+    def cell(self, row: int, column: int) -> Cell:
+        if (row, column) in self.merged:
+            return MergedCell(self, row, column)
+        values = self.rows.get(row)
+        return Cell(self, row, column, values.get(column) if values is not None else None)
+
+    def _rows_between(self, min_row: Optional[int], max_row: Optional[int]) -> List[int]:
+        start = bisect_left(self._row_numbers, min_row) if min_row is not None else 0
+        end = bisect_right(self._row_numbers, max_row) if max_row is not None else len(self._row_numbers)
+        return self._row_numbers[start:end]
+
+    def iter_rows(self, min_row: Optional[int] = None, max_row: Optional[int] = None, min_col: Optional[int] = None,
+                  max_col: Optional[int] = None):
+        columns = range(min_col or 1, (max_col or self.max_column) + 1)
+        for row in self._rows_between(min_row, max_row):
+            yield tuple(self.cell(row, column) for column in columns)
+
+    def iter_cols(self, min_col: Optional[int] = None, max_col: Optional[int] = None, min_row: Optional[int] = None,
+                  max_row: Optional[int] = None):
+        rows = self._rows_between(min_row, max_row)
+        for column in range(min_col or 1, (max_col or self.max_column) + 1):
+            yield tuple(self.cell(row, column) for row in rows)
+
+
+class SparseWorkbook:
+    """Just enough of openpyxl's Workbook for SaltLog: sheetnames and lookup by name."""
+
+    def __init__(self, sheets: Dict[str, SparseSheet]):
+        self.sheets: Dict[str, SparseSheet] = sheets
+
+    @property
+    def sheetnames(self) -> list:
+        return list(self.sheets)
+
+    def __getitem__(self, name: str) -> SparseSheet:
+        return self.sheets[name]
+
+
+class WindowedSaltLog(SaltLog):
+    """SaltLog built on the resident parts of a log only--header rows, week footer rows and the PCM/drill tabs.
+
+    The employee list starts out empty. Each call to load_window() replaces it with the employees in one window of
+    rows, and re-points the weeks and the monthly drill lookups at that window's EmployeeIndex.
+    """
+
+    def get_employee_list(self) -> EmployeeList:
+        return list()
+
+    def load_window(self, window: SparseSheet) -> EmployeeList:
+        column = self.employee_list_start[0]
+        employees = list()
+        for cell, in window.iter_rows(min_col=column, max_col=column):
+            if cell.value is None or cell.value.strip() == '':
+                continue
+            employees.append(Employee(cell.value.strip(), cell))
+
+        self.employee_list = employees
+        self.employee_index = EmployeeIndex(window, employees, self.week_cols, self.monthly_drill_date_col,
+                                            self.monthly_drill_result_col)
+        for week_number, week in enumerate(self.weeks):
+            week.set_index(self.employee_index, week_number)
+        return employees
+
+
+class WindowedChecker(LogChecker):
+    """LogChecker for very large logs that never holds more than one window of employee rows in memory.
+
+    The workbook is read with XlsxValueReader in two streaming passes instead of being loaded by openpyxl:
+
+        1. The header rows (everything above the first employee), the week footer rows (PCM topic/date, signature)
+           and the first cells of the PCM and drill tabs are read and kept; they're small and fixed in size, and
+           the weekly and monthly rules need them throughout. Below the header only the week heading and comment
+           columns are decoded, to find the footer.
+        2. The employee rows are read in windows of `window_size` rows. Each row is read once for every week and
+           for the monthly drill columns; the window's employee rules (weekly and monthly) are run and its
+           SaltErrors handed on before the next window is read.
+
+    The week rules (PCM, signature), the operation name rule and the reference catalog comparison (given a
+    `catalog`) run last, once every window is done. The errors are therefore the same as LogChecker's, but come out
+    window by window rather than week by week.
+
+    Peak memory is flat in the number of employees, apart from the workbook's shared strings table, which every
+    xlsx reader has to hold. The SaltErrors point at value_grid Cells, so they can go to an ErrorReport but can't
+    be used to mark up the workbook.
+    """
+
+    def __init__(self, workbook_file, window_size: int = 1000, catalog: Optional[ReferenceCatalog] = None, **kwargs):
+        if window_size < 1:
+            raise Exception('Window size must be at least 1')
+        self.workbook_file = workbook_file
+        self.window_size: int = window_size
+
+        self.employee_start: Optional[int] = None
+        self.employee_end: Optional[int] = None
+        self.merged: MergedRanges = MergedRanges()
+        self.windows_read: int = 0
+
+        reader = XlsxValueReader(workbook_file, dates=True)
+        try:
+            workbook = self._read_resident(reader)
+        finally:
+            reader.close()
+        super().__init__(WindowedSaltLog(workbook, catalog=catalog), **kwargs)
+
+    def _iter_all_checks(self) -> SaltErrorIter:
+        week_validators = [Validator(week, self.disabled_rules) for week in self.log.weeks]
+        month_validator = MonthValidator(self.log, self.disabled_rules)
+        for validator in week_validators + [month_validator]:
+            self._validator_stats.append(validator.rule_stats)
+        roster_validator = self._roster_validator()
+
+        for window in self._iter_windows():
+            employees = self.log.load_window(window)
+            for validator in week_validators:
+                yield from validator.iter_employee_checks(employees)
+            yield from month_validator.iter_employee_checks(employees)
+            if roster_validator is not None:
+                yield from roster_validator.iter_employee_checks(employees)
+
+        for validator in week_validators:
+            yield from validator.iter_week_checks()
+        yield from month_validator.iter_log_checks()
+
+        catalog_validator = self._catalog_validator()
+        if catalog_validator is not None:
+            yield from catalog_validator.iter_log_checks(self.log.workbook)
+
+    def _iter_windows(self) -> Iterator[SparseSheet]:
+        log = self.log
+        columns = {log.employee_list_start[0]}
+        for week_col in log.week_cols:
+            columns.update((week_col, week_col + 1, week_col + 2))
+        columns.update(col for col in (log.monthly_drill_date_col, log.monthly_drill_result_col) if col is not None)
+
+        reader = XlsxValueReader(self.workbook_file, dates=True)
+        try:
+            rows: SheetRows = dict()
+            for row_num, values in reader.iter_rows(LOG_SHEET, columns=columns, min_row=self.employee_start,
+                                                    max_row=self.employee_end):
+                rows[row_num] = values
+                if len(rows) == self.window_size:
+                    yield self._window(rows)
+                    rows = dict()
+            if rows:
+                yield self._window(rows)
+        finally:
+            reader.close()
+
+    def _window(self, rows: SheetRows) -> SparseSheet:
+        self.windows_read += 1
+        # Rows come in sheet order, so the first and last keys bound the window
+        return SparseSheet(LOG_SHEET, rows, self.merged.within(next(iter(rows)), next(reversed(rows))))
+
+    def _read_resident(self, reader: XlsxValueReader) -> SparseWorkbook:
+        header = self._read_header(reader)
+        week_cols = self._week_cols(header)
+
+        # Below the header, only the week heading and comment columns are needed to find and read the footer. The
+        # footer is kept from the PCM topic row down to the last week's signature row; after that no more cells
+        # are decoded, but the rest of the sheet is still read through for its merged ranges, which come last
+        footer_cols = set(week_cols) | {col + 2 for col in week_cols}
+        footer: SheetRows = dict()
+        signed: Set[int] = set()
+        for row_num, values in reader.iter_rows(LOG_SHEET, columns=footer_cols, min_row=self.employee_start):
+            if not footer_cols or not values:
+                continue
+            labels = {col: values[col].lower() for col in week_cols if isinstance(values.get(col), str)}
+            if footer or any('topic' in label for label in labels.values()):
+                footer[row_num] = values
+                signed.update(col for col, label in labels.items() if 'signature' in label)
+                if len(signed) == len(week_cols):
+                    footer_cols.clear()
+
+        self.merged = MergedRanges.from_refs(reader.merged_ranges.get(LOG_SHEET, ()))
+
+        # The employee slots end at the first merged cell in the name column, as in SaltLog.get_employee_list(),
+        # and in any case above the footer
+        ends = list()
+        first_merged = self.merged.first_row(2, self.employee_start)
+        if first_merged is not None:
+            ends.append(first_merged - 1)
+        if footer:
+            ends.append(min(footer) - 1)
+        self.employee_end = min(ends) if ends else None
+
+        sheets = {LOG_SHEET: SparseSheet(LOG_SHEET, {**header, **footer}, self.merged)}
+        for name in reader.sheetnames:
+            if name != LOG_SHEET and (name.strip().startswith('PCM') or 'drill' in name.strip().lower()):
+                sheets[name] = SparseSheet(name, self._read_tab(reader, name))
+        return SparseWorkbook(sheets)
+
+    def _read_header(self, reader: XlsxValueReader) -> SheetRows:
+        header: SheetRows = dict()
+        for row_num, values in reader.iter_rows(LOG_SHEET):
+            header[row_num] = values
+            name_label = values.get(2)
+            if isinstance(name_label, str) and name_label.lower() == 'employee name':
+                self.employee_start = row_num + 1
+                return header
+        raise Exception('Could not find the employee list')
+
+    @staticmethod
+    def _week_cols(header: SheetRows) -> List[int]:
+        # Same rules as SaltLog.get_week_row()/get_week_cols()
+        for row_num in sorted(header):
+            values = header[row_num]
+            if any(isinstance(values.get(col), str) and 'week' in values[col].lower() for col in range(1, 11)):
+                return [col for col in range(1, 31) if isinstance(values.get(col), str) and
+                        'week' in values[col].lower()]
+        return list()
+
+    @staticmethod
+    def _read_tab(reader: XlsxValueReader, name: str) -> SheetRows:
+        # SaltLog only ever looks at the first non-empty row of a PCM/drill tab
+        for row_num, values in reader.iter_rows(name, max_col=15):
+            if values:
+                return {row_num: values}
+        return dict()
@@ -0,0 +1,270 @@
+from xml.etree.ElementTree import iterparse
+from xml.parsers import expat
+from cell_refs import column_index
+import posixpath
+import re
+import zipfile
+
+#########################
+# Typing setup
+#########################
+from typing import Dict
+from typing import Iterator
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+RowValues = Dict[int, object]
+RowIter = Iterator[Tuple[int, RowValues]]
+
+
+class XlsxValueReader:
+    """Bare-bones reader for cell values in an xlsx file, bypassing openpyxl.
+
+    Only the workbook's sheet list, the shared strings table and the requested sheet's XML are read; styles,
+    comments and everything else in the package are ignored. Cell values come back as str, float, int or
+    bool--dates are left as Excel serial numbers, since telling a date from a number needs the styles. Pass
+    `dates=True` to read just the number formats out of the styles part and get datetimes back, as openpyxl would
+    (openpyxl's date helpers are only imported then).
+
+    Rows are streamed, and only cells in the requested columns are decoded, so skipping over a large block of
+    rows costs the XML parse and little else. Once a sheet has been read to the end, its merged ranges (e.g.
+    'A2:B2') are in `merged_ranges[sheet_name]`. This is the read path behind QuickCheck and WindowedChecker.
+    """
+
+    _main_ns = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+    _rel_ns = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+    _pkg_rel_ns = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+    _chunk_size = 65536
+    _dimension_bytes = 4096
+
+    def __init__(self, workbook_file, dates: bool = False):
+        self.archive = zipfile.ZipFile(workbook_file)
+        self.sheet_paths: Dict[str, str] = dict()
+        self.merged_ranges: Dict[str, list] = dict()
+        self.date1904: bool = False
+        self.date_styles: Set[int] = set()
+        self._from_excel = None
+        self._from_iso8601 = None
+        self._epoch = None
+        self._styles_path: Optional[str] = None
+        self._shared_strings_path: Optional[str] = None
+        self._shared_strings: Optional[list] = None
+        self._read_workbook()
+        if dates:
+            self._read_date_styles()
+
+    @property
+    def sheetnames(self) -> list:
+        return list(self.sheet_paths)
+
+    def close(self) -> None:
+        self.archive.close()
+
+    def iter_rows(self, sheet_name: str, columns: Optional[Set[int]] = None, min_row: int = 1,
+                  max_row: Optional[int] = None, max_col: Optional[int] = None) -> RowIter:
+        """Yields (row number, {column: value}) for each row in the sheet.
+
+        Args:
+            sheet_name: Name of the sheet to read
+            columns: Column numbers to decode; all columns up to `max_col` if None. The set is checked cell by
+                cell, so a caller can narrow it between rows.
+            min_row: Skip (without decoding) the rows above this one
+            max_row: Stop after this row
+            max_col: Ignore cells to the right of this column
+
+        Returns:
+            A generator of (row number, {column number: value}) tuples. Empty cells are left out.
+        """
+        collector = _RowCollector(self, columns, min_row, max_col)
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        collector.parser = parser
+        parser.StartElementHandler = collector.start
+
+        with self.archive.open(self.sheet_paths[sheet_name]) as sheet_xml:
+            while True:
+                chunk = sheet_xml.read(self._chunk_size)
+                parser.Parse(chunk, not chunk)
+                if not chunk:
+                    collector.finish_row()
+                    self.merged_ranges[sheet_name] = collector.merged_ranges
+                for row_num, values in collector.drain():
+                    if max_row is not None and row_num > max_row:
+                        return
+                    if row_num >= min_row:
+                        yield row_num, values
+                if not chunk:
+                    return
+
+    def dimension(self, sheet_name: str) -> Optional[str]:
+        """The sheet's used range as recorded by whatever saved it (e.g. 'A1:AC2008'), or None if it has none.
+
+        The <dimension> element comes before the cell data, so only the start of the sheet's XML is read.
+        """
+        with self.archive.open(self.sheet_paths[sheet_name]) as sheet_xml:
+            head = sheet_xml.read(self._dimension_bytes).decode('utf-8', errors='replace')
+        match = re.search(r'<(?:\w+:)?dimension\s+ref="([^"]+)"', head)
+        return match.group(1) if match is not None else None
+
+    def _read_workbook(self) -> None:
+        targets = dict()
+        with self.archive.open('xl/_rels/workbook.xml.rels') as rels_xml:
+            for event, element in iterparse(rels_xml):
+                if element.tag == self._pkg_rel_ns + 'Relationship':
+                    target = element.get('Target')
+                    target = target.lstrip('/') if target.startswith('/') else posixpath.join('xl', target)
+                    targets[element.get('Id')] = target
+                    if element.get('Type').endswith('/sharedStrings'):
+                        self._shared_strings_path = target
+                    elif element.get('Type').endswith('/styles'):
+                        self._styles_path = target
+
+        with self.archive.open('xl/workbook.xml') as workbook_xml:
+            for event, element in iterparse(workbook_xml):
+                if element.tag == self._main_ns + 'sheet':
+                    self.sheet_paths[element.get('name')] = targets[element.get(self._rel_ns + 'id')]
+                elif element.tag == self._main_ns + 'workbookPr' and element.get('date1904') in ('1', 'true'):
+                    self.date1904 = True
+
+    def _read_date_styles(self) -> None:
+        # Same rule openpyxl uses: a cell is a date if its style's number format is a date format
+        from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+        from openpyxl.utils.datetime import from_excel, from_ISO8601, CALENDAR_WINDOWS_1900, CALENDAR_MAC_1904
+        self._from_excel = from_excel
+        self._from_iso8601 = from_ISO8601
+        self._epoch = CALENDAR_MAC_1904 if self.date1904 else CALENDAR_WINDOWS_1900
+        if self._styles_path is None:
+            return
+        custom_formats = dict()
+        style_formats = list()
+        with self.archive.open(self._styles_path) as styles_xml:
+            in_cell_xfs = False
+            for event, element in iterparse(styles_xml, events=('start', 'end')):
+                if element.tag == self._main_ns + 'cellXfs':
+                    in_cell_xfs = event == 'start'
+                elif event == 'end' and element.tag == self._main_ns + 'numFmt':
+                    custom_formats[int(element.get('numFmtId'))] = element.get('formatCode')
+                elif event == 'end' and element.tag == self._main_ns + 'xf' and in_cell_xfs:
+                    style_formats.append(int(element.get('numFmtId', 0)))
+        for style_id, format_id in enumerate(style_formats):
+            if is_date_format(custom_formats.get(format_id, BUILTIN_FORMATS.get(format_id))):
+                self.date_styles.add(style_id)
+
+    @property
+    def shared_strings(self) -> list:
+        if self._shared_strings is None:
+            self._shared_strings = list()
+            if self._shared_strings_path is not None:
+                with self.archive.open(self._shared_strings_path) as strings_xml:
+                    for event, element in iterparse(strings_xml):
+                        if element.tag == self._main_ns + 'si':
+                            self._shared_strings.append(self._text(element))
+                            element.clear()
+        return self._shared_strings
+
+    def cell_value(self, data_type: str, raw: str, style: Optional[int] = None):
+        if data_type == 'inlineStr' or data_type == 'str' or data_type == 'e':
+            return raw
+        if data_type == 's':
+            return self.shared_strings[int(raw)]
+        if data_type == 'b':
+            return raw == '1'
+        if raw == '':
+            return None
+        if data_type == 'd':
+            return self._from_iso8601(raw) if self._from_iso8601 is not None else raw
+        number = float(raw)
+        number = int(number) if number.is_integer() and 'E' not in raw and '.' not in raw else number
+        if style in self.date_styles:
+            return self._from_excel(number, self._epoch)
+        return number
+
+    def _text(self, element) -> str:
+        return ''.join(text.text or '' for text in element.iter(self._main_ns + 't'))
+
+
+class _RowCollector:
+    """expat handlers for XlsxValueReader.iter_rows().
+
+    Only the start-element handler is installed for good. A cell or row is finished when the next one starts (the
+    last row when the sheet has been read to the end). The character data and end-element handlers are switched
+    on only inside the <v>/<t> of a cell that is wanted, and off again at its end tag, so cells that are skipped
+    never call back into Python for their contents, and neither does the markup between them.
+    """
+
+    def __init__(self, reader: XlsxValueReader, columns: Optional[Set[int]], min_row: int, max_col: Optional[int]):
+        self.reader = reader
+        self.columns = columns
+        self.min_row = min_row
+        self.max_col = max_col
+        self.dates = bool(reader.date_styles)
+        self.parser = None
+
+        self.rows = list()
+        self.row_num = 0
+        self.values: Optional[RowValues] = None
+        self.col_num = 0
+        self.cell: Optional[Tuple[int, str, Optional[int]]] = None
+        self.text = list()
+        self.capturing = False
+        self.merged_ranges = list()
+
+    def start(self, name: str, attrs: dict) -> None:
+        if name == 'c':
+            self.finish_cell()
+            self.capture(False)
+            ref = attrs.get('r')
+            self.col_num = self.column_number(ref) if ref is not None else self.col_num + 1
+            if (self.columns is None or self.col_num in self.columns) and \
+                    (self.max_col is None or self.col_num <= self.max_col) and self.row_num >= self.min_row:
+                style = int(attrs.get('s', 0)) if self.dates else None
+                self.cell = (self.col_num, attrs.get('t', 'n'), style)
+        elif name == 'v' or name == 't':
+            self.capture(self.cell is not None)
+        elif name == 'row':
+            self.finish_row()
+            self.row_num = int(attrs.get('r', self.row_num + 1))
+            self.values = dict()
+            self.col_num = 0
+        elif name == 'mergeCell':
+            self.merged_ranges.append(attrs.get('ref'))
+        elif ':' in name:
+            self.start(name[name.index(':') + 1:], attrs)      # Prefixed tags, e.g. <x:c>
+        else:
+            self.capture(False)
+
+    def capture(self, on: bool) -> None:
+        if on != self.capturing:
+            self.parser.CharacterDataHandler = self.text.append if on else None
+            self.parser.EndElementHandler = self.end if on else None
+            self.capturing = on
+
+    def end(self, name: str) -> None:
+        # Only installed while capturing, and <v>/<t> have no child elements, so this is their end tag; without it
+        # the whitespace after </t> (e.g. before </is>) would be taken as part of the value
+        self.capture(False)
+
+    def column_number(self, ref: str) -> int:
+        return column_index(ref.rstrip('0123456789'))
+
+    def finish_cell(self) -> None:
+        if self.cell is not None:
+            col_num, data_type, style = self.cell
+            if self.text:
+                value = self.reader.cell_value(data_type, ''.join(self.text), style)
+                if value is not None:
+                    self.values[col_num] = value
+                self.text.clear()
+            self.cell = None
+
+    def finish_row(self) -> None:
+        self.finish_cell()
+        if self.values is not None:
+            self.rows.append((self.row_num, self.values))
+            self.values = None
+
+    def drain(self) -> list:
+        rows, self.rows = self.rows, list()
+        return rows
+